@@ -0,0 +1,82 @@
+"""Benchmark de leitura de planilhas: openpyxl x calamine (tempo e pico de memória).
+
+Cada engine é executado em um processo novo para que o pico de memória (RSS) não seja afetado pela execução anterior.
+
+Uso, a partir do diretório `backend`:
+
+    python -m benchmarks.bench_excel --rows 100000 --columns 12
+"""
+
+import argparse
+import multiprocessing
+import resource
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+
+def build_workbook(path: Path, rows: int, columns: int) -> None:
+    """Gera uma planilha sintética com colunas numéricas, textuais e de datas."""
+    rng = np.random.default_rng(42)
+    data = {f'valor_{i}': rng.normal(1000, 250, rows).round(2) for i in range(columns)}
+    data['cnpj'] = rng.integers(10**13, 10**14, rows).astype(str)
+    data['dhEmi'] = pd.date_range('2025-01-01', periods=rows, freq='min')
+
+    pd.DataFrame(data).to_excel(path, index=False, engine='openpyxl')
+
+
+def _run_engine(path: str, engine: str, usecols: list[str] | None, queue) -> None:
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = perf_counter()
+    df = pd.read_excel(path, engine=engine, usecols=usecols)
+    elapsed = perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss é retornado em KB no Linux
+    queue.put((engine, len(df), elapsed, (peak_rss - base_rss) / 1024))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--columns', type=int, default=12)
+    parser.add_argument(
+        '--usecols',
+        type=str,
+        default=None,
+        help='Colunas separadas por vírgula para medir a leitura com poda de colunas.',
+    )
+    args = parser.parse_args()
+
+    usecols = args.usecols.split(',') if args.usecols else None
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'bench.xlsx'
+        print(f'Generating workbook with {args.rows:,} rows...')
+        build_workbook(path, args.rows, args.columns)
+        print(f'Workbook size: {path.stat().st_size / 1048576:.2f} MB\n')
+
+        for engine in ('openpyxl', 'calamine'):
+            process = context.Process(
+                target=_run_engine, args=(str(path), engine, usecols, queue)
+            )
+            process.start()
+            process.join()
+
+            if process.exitcode != 0:
+                print(f'{engine:>10}: failed (is the engine installed?)')
+                continue
+
+            name, rows, elapsed, memory = queue.get()
+            print(
+                f'{name:>10}: {rows:,} rows in {elapsed:.2f}s, peak memory +{memory:.1f} MB'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark do parser determinístico de NF-e (documentos por segundo).
+
+Uso, a partir do diretório `backend`:
+
+    python -m benchmarks.bench_fiscal_xml --documents 500 --items 30
+"""
+
+import argparse
+from io import BytesIO
+from time import perf_counter
+
+from src.services.fiscal_document_services import parse_fiscal_xml
+
+ITEM_TEMPLATE = """<det nItem="{n}"><prod><xProd>PRODUTO {n}</xProd><NCM>49019900</NCM><CFOP>5102</CFOP><vProd>100.00</vProd><indTot>1</indTot></prod>
+<imposto><ICMS><ICMS00><CST>00</CST><vBC>100.00</vBC><pICMS>18.00</pICMS><vICMS>18.00</vICMS></ICMS00></ICMS>
+<IPI><cEnq>999</cEnq><IPITrib><CST>50</CST><vBC>100.00</vBC><pIPI>5.00</pIPI><vIPI>5.00</vIPI></IPITrib></IPI>
+<PIS><PISAliq><CST>01</CST><vBC>100.00</vBC><pPIS>1.65</pPIS><vPIS>1.65</vPIS></PISAliq></PIS>
+<COFINS><COFINSAliq><CST>01</CST><vBC>100.00</vBC><pCOFINS>7.60</pCOFINS><vCOFINS>7.60</vCOFINS></COFINSAliq></COFINS></imposto></det>"""
+
+DOCUMENT_TEMPLATE = """<NFe><infNFe Id="NFe{key}"><ide><natOp>VENDA</natOp><dhEmi>2025-07-01T10:00:00-03:00</dhEmi></ide>
+<emit><CNPJ>11222333000181</CNPJ><CRT>3</CRT></emit><dest><CNPJ>99888777000100</CNPJ><indIEDest>1</indIEDest></dest>
+{items}<total><ICMSTot><vProd>{total}</vProd><vIPI>{ipi}</vIPI><vNF>{vnf}</vNF></ICMSTot></total></infNFe></NFe>"""
+
+
+def build_xml(documents: int, items: int) -> bytes:
+    """Gera um lote sintético de NF-e com a quantidade de documentos e itens informada."""
+    items_xml = ''.join(ITEM_TEMPLATE.format(n=n) for n in range(1, items + 1))
+    body = ''.join(
+        DOCUMENT_TEMPLATE.format(
+            key=str(doc).zfill(44),
+            items=items_xml,
+            total=f'{items * 100:.2f}',
+            ipi=f'{items * 5:.2f}',
+            vnf=f'{items * 105:.2f}',
+        )
+        for doc in range(documents)
+    )
+
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<enviNFe xmlns="http://www.portalfiscal.inf.br/nfe">{body}</enviNFe>'
+    ).encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--documents', type=int, default=500)
+    parser.add_argument('--items', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    xml = build_xml(args.documents, args.items)
+    print(
+        f'Payload: {len(xml) / 1048576:.2f} MB, {args.documents} documents x {args.items} items'
+    )
+
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = perf_counter()
+        chunks = parse_fiscal_xml(BytesIO(xml))
+        best = min(best, perf_counter() - start)
+
+    print(f'Chunks generated: {len(chunks)}')
+    print(f'Best time: {best:.3f}s -> {args.documents / best:,.0f} documents/s')
+
+
+if __name__ == '__main__':
+    main()
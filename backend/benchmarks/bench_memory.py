@@ -0,0 +1,99 @@
+"""Benchmark da memória de conversa: histórico em arquivo JSON x ConversationStore (buffer em memória com gravação em lotes no SQLite).
+
+Simula turnos de conversa (leitura das mensagens dentro do orçamento de tokens + gravação da interação) e mede o custo por turno conforme o histórico cresce.
+
+Uso, a partir do diretório `backend`:
+
+    python -m benchmarks.bench_memory --turns 500
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+from time import perf_counter
+
+from langchain_community.chat_message_histories import FileChatMessageHistory
+
+from src.agents.memory import TokenBudgetMemory
+from src.services.conversation_services import (
+    ConversationStore,
+    StoreChatMessageHistory,
+)
+from src.services.db_services import init_db
+from src.utils.tokens import warm_up_encoding
+
+SAMPLE_OUTPUT = 'A soma do ICMS das notas do período é R$ 18.540,32. ' * 8
+
+
+async def _run_turns(name: str, memory, turns: int, checkpoints: int = 5) -> None:
+    latencies = []
+    step = max(turns // checkpoints, 1)
+
+    for turn in range(1, turns + 1):
+        start = perf_counter()
+        await memory.aload_memory_variables({})
+        await memory.asave_context(
+            {'input': f'Pergunta {turn}: qual o total de ICMS?'},
+            {'output': SAMPLE_OUTPUT},
+        )
+        latencies.append(perf_counter() - start)
+
+        if turn % step == 0:
+            window = latencies[-step:]
+            print(
+                f'{name:>8} | turn {turn:>5}: '
+                f'mean {statistics.fmean(window) * 1000:.3f}ms, '
+                f'max {max(window) * 1000:.3f}ms'
+            )
+
+
+def _create_memory(history) -> TokenBudgetMemory:
+    # Sem modelo de resumo: mede apenas a leitura do orçamento e a gravação do histórico
+    return TokenBudgetMemory(
+        chat_memory=history,
+        memory_key='chat_history',
+        input_key='input',
+        output_key='output',
+        return_messages=True,
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--turns', type=int, default=500)
+    args = parser.parse_args()
+
+    init_db()
+    # Download do vocabulário do tokenizador fora das medições
+    warm_up_encoding()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        history = FileChatMessageHistory(
+            os.path.join(temp_dir, 'bench_history.json'), encoding='utf-8'
+        )
+        await _run_turns('file', _create_memory(history), args.turns)
+
+    print()
+
+    store = ConversationStore()
+    session_id = 'bench-memory'
+    history = StoreChatMessageHistory(session_id, store=store)
+    history.clear()
+
+    try:
+        await _run_turns('store', _create_memory(history), args.turns)
+
+        start = perf_counter()
+        await store.flush()
+        print(
+            f'\n   store | final flush of pending messages: '
+            f'{(perf_counter() - start) * 1000:.3f}ms'
+        )
+    finally:
+        history.clear()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+"""Benchmark do OCR: leitura direta com pytesseract x pipeline com pré-processamento, pool e cache.
+
+Gera uma imagem sintética no tamanho de uma foto de celular (4000x3000) e mede latência (p50/p95) e vazão com requisições concorrentes.
+
+Uso, a partir do diretório `backend` (requer o binário do tesseract instalado):
+
+    python -m benchmarks.bench_ocr --requests 8 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import statistics
+from io import BytesIO
+from time import perf_counter
+
+import pytesseract
+from PIL import Image, ImageDraw, ImageFont
+
+from src.services.ocr_services import OCR_LANG, OCRService
+
+LINES = [
+    'DANFE - DOCUMENTO AUXILIAR DA NOTA FISCAL ELETRONICA',
+    'CHAVE DE ACESSO 3525 0711 2223 3300 0181 5500 1000 0012 3410 0012 3456',
+    'NATUREZA DA OPERACAO: VENDA DE MERCADORIA',
+    'CNPJ EMITENTE: 11.222.333/0001-81   DATA DE EMISSAO: 01/07/2025',
+    'BASE DE CALCULO DO ICMS 1.000,00   VALOR DO ICMS 180,00',
+    'VALOR TOTAL DOS PRODUTOS 1.000,00   VALOR TOTAL DA NOTA 1.050,00',
+]
+
+
+def build_image(seed: int, width: int = 4000, height: int = 3000) -> bytes:
+    """Gera uma foto sintética de documento, com fundo acinzentado e texto em fonte grande."""
+    image = Image.new('RGB', (width, height), (205, 200, 190))
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=64)
+
+    for index, line in enumerate(LINES):
+        draw.text(
+            (200, 300 + index * 250), f'{line} #{seed}', fill=(40, 40, 40), font=font
+        )
+
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', quality=90)
+
+    return buffer.getvalue()
+
+
+def _baseline_ocr(image_bytes: bytes) -> str:
+    with Image.open(BytesIO(image_bytes)) as img:
+        return pytesseract.image_to_string(img, lang=OCR_LANG)
+
+
+async def _measure(name: str, images: list[bytes], concurrency: int, run) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def timed(image_bytes: bytes):
+        async with semaphore:
+            start = perf_counter()
+            await run(image_bytes)
+            latencies.append(perf_counter() - start)
+
+    start = perf_counter()
+    await asyncio.gather(*(timed(image) for image in images))
+    elapsed = perf_counter() - start
+
+    p95 = (
+        statistics.quantiles(latencies, n=20)[-1]
+        if len(latencies) > 1
+        else latencies[0]
+    )
+    print(
+        f'{name:>18}: {len(images) / elapsed:.2f} images/s, '
+        f'p50 {statistics.median(latencies):.2f}s, p95 {p95:.2f}s'
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=8)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+
+    images = [build_image(seed) for seed in range(args.requests)]
+    print(f'{args.requests} images of 4000x3000, concurrency {args.concurrency}\n')
+
+    await _measure(
+        'baseline (thread)',
+        images,
+        args.concurrency,
+        lambda image: asyncio.to_thread(_baseline_ocr, image),
+    )
+
+    service = OCRService(workers=args.workers, cache_size=args.requests)
+
+    try:
+        await _measure(
+            'pipeline (cold)', images, args.concurrency, service.extract_text
+        )
+        await _measure(
+            'pipeline (cached)', images, args.concurrency, service.extract_text
+        )
+    finally:
+        service.shutdown()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
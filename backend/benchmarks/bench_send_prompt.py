@@ -0,0 +1,107 @@
+"""Benchmark do custo por requisição do `send_prompt` fora da chamada ao LLM.
+
+Compara as etapas antes e depois do reaproveitamento: instruções de formato (parser recriado x cache por esquema), OutputGuard (instância nova x instância da sessão) e mede o `send_prompt` completo com um Supervisor que responde instantaneamente (cache de respostas, validação e conversão do markdown).
+
+Uso, a partir do diretório `backend` (nenhuma chamada é feita aos provedores, a chave é fictícia):
+
+    python -m benchmarks.bench_send_prompt --requests 200
+"""
+
+import argparse
+import asyncio
+import statistics
+from time import perf_counter
+
+from langchain.output_parsers import PydanticOutputParser
+
+from src.agents import OutputGuard
+from src.data import ModelTask
+from src.schemas import JSONOutputModel
+from src.services.chat_model_services import Chat
+
+RESPONSE = '```json\n{"response": "O dataset possui **12 colunas** e 5.000 linhas.", "graph_id": "",}\n```'
+
+
+class InstantSupervisor:
+    """Supervisor com resposta fixa, isolando o custo do serviço de chat."""
+
+    async def arun(self, user_input, config=None, **kwargs):
+        return {'output': RESPONSE, 'intermediate_steps': []}
+
+
+def _measure(name: str, func, repeat: int) -> None:
+    latencies = []
+
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        latencies.append(perf_counter() - start)
+
+    print(
+        f'{name:>32}: mean {statistics.fmean(latencies) * 1000:.3f}ms, '
+        f'max {max(latencies) * 1000:.3f}ms'
+    )
+
+
+async def _measure_async(name: str, func, repeat: int) -> None:
+    latencies = []
+
+    for index in range(repeat):
+        start = perf_counter()
+        await func(index)
+        latencies.append(perf_counter() - start)
+
+    p95 = statistics.quantiles(latencies, n=20)[-1] if repeat > 1 else latencies[0]
+    print(
+        f'{name:>32}: mean {statistics.fmean(latencies) * 1000:.3f}ms, '
+        f'p95 {p95 * 1000:.3f}ms'
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    chat = Chat()
+    session_id = 'bench-send-prompt'
+    current_session = chat._get_session(session_id)
+    current_session['groq_key'] = 'gsk_benchmark'
+    current_session[ModelTask.SUPERVISE] = InstantSupervisor()
+
+    _measure(
+        'format instructions (rebuilt)',
+        lambda: PydanticOutputParser(
+            pydantic_object=JSONOutputModel
+        ).get_format_instructions(),
+        args.requests,
+    )
+    _measure(
+        'format instructions (cached)',
+        lambda: chat.get_format_instructions(JSONOutputModel),
+        args.requests,
+    )
+
+    repeat = min(args.requests, 20)
+    _measure(
+        'output guard (new instance)',
+        lambda: OutputGuard(current_session=current_session),
+        repeat,
+    )
+    await _measure_async(
+        'output guard (session instance)',
+        lambda _: chat._get_output_guard(session_id),
+        repeat,
+    )
+
+    await _measure_async(
+        'send_prompt (instant LLM)',
+        lambda index: chat.send_prompt(
+            session_id, f'Pergunta de benchmark número {index}'
+        ),
+        args.requests,
+    )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,159 @@
+"""Benchmark da validação fiscal: ferramentas por item (`validate_icms` e `validate_federal_taxes`) x motor de regras vetorizado.
+
+Gera notas sintéticas com itens de CSTs variados e uma fração de erros, e mede a vazão (itens e notas por segundo) de cada abordagem, sem chamadas ao LLM.
+
+Uso, a partir do diretório `backend`:
+
+    python -m benchmarks.bench_tax_rules --invoices 2000 --items 10
+"""
+
+import argparse
+import asyncio
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from src.services.tax_rules_services import (
+    check_note_totals,
+    evaluate_items,
+    prepare_items,
+)
+from src.tools.taxes_validation_tools import create_validation_tools
+
+ICMS_CSTS = ['00', '20', '40', '41', '60', '101', '102']
+
+
+def build_items(invoices: int, items: int, error_rate: float, seed: int = 42):
+    """Gera os itens das notas com os campos do payload de NF-e, alíquotas em percentual."""
+    rng = np.random.default_rng(seed)
+    size = invoices * items
+
+    v_prod = rng.uniform(10, 5000, size).round(2)
+    cst_icms = rng.choice(ICMS_CSTS, size)
+    p_icms = rng.choice([7.0, 12.0, 18.0], size)
+    taxed = np.isin(cst_icms, ['00', '20', '101'])
+    v_icms = np.where(taxed, (v_prod * p_icms / 100).round(2), 0.0)
+    # Emitentes do Simples Nacional (CSOSN) não destacam IPI, PIS e COFINS
+    simples_nacional = np.isin(cst_icms, ['101', '102'])
+    v_ipi = np.where(simples_nacional, 0.0, (v_prod * 0.05).round(2))
+    v_pis = np.where(simples_nacional, 0.0, (v_prod * 0.0165).round(2))
+    v_cofins = np.where(simples_nacional, 0.0, (v_prod * 0.076).round(2))
+
+    # Parte dos itens recebe valores divergentes
+    errors = rng.random(size) < error_rate
+    v_icms = np.where(errors, v_icms + 1, v_icms)
+
+    frame = pd.DataFrame(
+        {
+            'chNFe': np.repeat([f'{number:044d}' for number in range(invoices)], items),
+            'nItem': np.tile(np.arange(1, items + 1), invoices),
+            'CRT': np.where(simples_nacional, '1', '3'),
+            'vProd': v_prod,
+            'CST_CSOSN': cst_icms,
+            'vBCICMS': np.where(taxed, v_prod, 0.0),
+            'pICMS': np.where(taxed, p_icms, 0.0),
+            'vICMS': v_icms,
+            'CST_IPI': np.where(simples_nacional, '99', '50'),
+            'vBCIPI': v_prod,
+            'pIPI': 5.0,
+            'vIPI': v_ipi,
+            'CST_PIS': np.where(simples_nacional, '99', '01'),
+            'vBCPIS': v_prod,
+            'pPIS': 1.65,
+            'vPIS': v_pis,
+            'CST_COFINS': np.where(simples_nacional, '99', '01'),
+            'vBCCOFINS': v_prod,
+            'pCOFINS': 7.6,
+            'vCOFINS': v_cofins,
+        }
+    )
+    totals = frame.groupby('chNFe')[['vProd', 'vIPI']].sum().sum(axis=1).round(2)
+    frame['vNF'] = frame['chNFe'].map(totals)
+
+    return frame
+
+
+async def _run_per_call(frame: pd.DataFrame) -> int:
+    tools = {tool.name: tool for tool in create_validation_tools('benchmark')}
+    found = 0
+
+    for item in frame.itertuples():
+        simples_nacional = item.CRT == '1'
+        icms = await tools['validate_icms'].ainvoke(
+            {
+                'item_id': item.nItem,
+                'cst_icms': item.CST_CSOSN,
+                'v_prod': item.vProd,
+                'v_bc_icms': item.vBCICMS,
+                'p_icms': item.pICMS / 100,
+                'v_icms': item.vICMS,
+                'is_simples_nacional': simples_nacional,
+            }
+        )
+        federal = await tools['validate_federal_taxes'].ainvoke(
+            {
+                'item_id': item.nItem,
+                'is_simples_nacional': simples_nacional,
+                'cst_ipi': item.CST_IPI,
+                'v_bc_ipi': item.vBCIPI,
+                'p_ipi': item.pIPI / 100,
+                'v_ipi': item.vIPI,
+                'cst_pis': item.CST_PIS,
+                'v_bc_pis': item.vBCPIS,
+                'p_pis': item.pPIS / 100,
+                'v_pis': item.vPIS,
+                'cst_cofins': item.CST_COFINS,
+                'v_bc_cofins': item.vBCCOFINS,
+                'p_cofins': item.pCOFINS / 100,
+                'v_cofins': item.vCOFINS,
+            }
+        )
+        found += icms['error_type'] is not None
+        found += len(federal['inconsistencies'])
+
+    return found
+
+
+def _report(name: str, frame: pd.DataFrame, elapsed: float, found: int) -> None:
+    invoices = frame['chNFe'].nunique()
+    print(
+        f'{name:>18}: {len(frame) / elapsed:,.0f} items/s, '
+        f'{invoices / elapsed:,.0f} invoices/s, {found} inconsistencies '
+        f'({len(frame)} items in {elapsed:.2f}s)'
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--invoices', type=int, default=2000)
+    parser.add_argument('--items', type=int, default=10)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument(
+        '--per-call-invoices',
+        type=int,
+        default=100,
+        help='Notas validadas pelas ferramentas por item, que são mais lentas.',
+    )
+    args = parser.parse_args()
+
+    frame = build_items(args.invoices, args.items, args.error_rate)
+    print(f'{args.invoices} invoices with {args.items} items each\n')
+
+    sample = frame[
+        frame['chNFe'].isin(frame['chNFe'].unique()[: args.per_call_invoices])
+    ]
+    start = perf_counter()
+    found = await _run_per_call(sample)
+    _report('per-call tools', sample, perf_counter() - start, found)
+
+    start = perf_counter()
+    items = prepare_items(frame)
+    findings = evaluate_items(items)
+    totals = check_note_totals(items)
+    _report('vectorized engine', frame, perf_counter() - start, len(findings))
+    print(f'{"":>18}  {int(totals["is_mismatch"].sum())} note total mismatches')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
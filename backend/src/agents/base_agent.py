@@ -1,20 +1,19 @@
 """Classe base para outros agentes herdarem métodos comuns."""
 
-import os
-import tempfile
-
 from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain.chains.conversation.memory import ConversationBufferWindowMemory
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.tools import BaseTool
-from langchain_community.chat_message_histories import FileChatMessageHistory
 from langchain_core.language_models import BaseChatModel
 from langchain_core.memory import BaseMemory
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.messages import SystemMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_groq import ChatGroq
 from langchain_openai import ChatOpenAI
 
+from src.agents.memory import TokenBudgetMemory
 from src.data import TASK_PREDEFINED_MODELS, ModelTask
+from src.services.conversation_services import StoreChatMessageHistory
+from src.services.llm_client_services import llm_client_pool
 from src.settings import settings
 from src.utils.exceptions import (
     APIKeyNotFoundException,
@@ -42,20 +41,42 @@ class BaseAgent:
 
         self.session_id = session_id
         self.memory_key = memory_key
+        # Retorna as ferramentas usadas na execução junto da resposta
+        self.return_intermediate_steps = False
         self.agent = None
 
-        self.prompt = ChatPromptTemplate(
-            [
-                (
-                    'system',
-                    'You are a helpful agent that answers questions, respond to the questions objectively and only when certain, use the tools available to create better answers',
-                ),
-                MessagesPlaceholder(self.memory_key),
-                ('human', '{input}'),
-                MessagesPlaceholder('agent_scratchpad'),
-            ]
+        self.prompt = self.build_prompt(
+            'You are a helpful agent that answers questions, respond to the questions objectively and only when certain, use the tools available to create better answers',
+            with_history=True,
         )
 
+    def build_prompt(
+        self,
+        system_instructions: str,
+        *static_messages: tuple[str, str],
+        with_history: bool = False,
+    ) -> ChatPromptTemplate:
+        """Monta o prompt do agente com o prefixo estático antes do conteúdo dinâmico.
+
+        Os provedores reaproveitam o processamento do maior prefixo idêntico entre chamadas (cache automático da OpenAI e implícito do Gemini), por isso instruções fixas vêm primeiro e histórico, entrada e scratchpad por último.
+
+        Args:
+            system_instructions (str): Instruções de sistema do agente.
+            static_messages (tuple[str, str]): Mensagens fixas entre chamadas, como as instruções de formato da resposta.
+            with_history (bool, optional): Se o histórico da conversa (memória) é incluído no prompt.
+
+        Returns:
+            ChatPromptTemplate: Template com o prefixo estático seguido do sufixo dinâmico.
+        """
+        messages = [SystemMessage(system_instructions), *static_messages]
+
+        if with_history:
+            messages.append(MessagesPlaceholder(self.memory_key))
+
+        messages += [('human', '{input}'), MessagesPlaceholder('agent_scratchpad')]
+
+        return ChatPromptTemplate(messages)
+
     @property
     def tools(self):
         """Adiciona ferramentas para amplificar as capacidades do agente."""
@@ -80,8 +101,9 @@ class BaseAgent:
             )
 
         try:
-            self._llm = ChatGoogleGenerativeAI(
-                model=model_name, google_api_key=self.gemini_key, **kwargs
+            # Instâncias compartilhadas entre agentes e sessões com a mesma chave
+            self._llm = llm_client_pool.get_gemini_model(
+                self.gemini_key, model_name, **kwargs
             )
             self.model_name, self.provider = model_name, 'google'
         except Exception:
@@ -107,7 +129,12 @@ class BaseAgent:
             )
 
         try:
-            self._llm = ChatGroq(model_name=model_name, api_key=self.groq_key, **kwargs)
+            self._llm = ChatGroq(
+                model_name=model_name,
+                api_key=self.groq_key,
+                **llm_client_pool.get_http_clients('groq', self.groq_key),
+                **kwargs,
+            )
             self.model_name, self.provider = model_name, 'groq'
         except Exception:
             self.groq_key = None
@@ -131,8 +158,16 @@ class BaseAgent:
             )
 
         try:
+            # Agrupa as chamadas do mesmo agente e modelo, aumentando os acertos do cache de prefixo da OpenAI
+            kwargs.setdefault(
+                'model_kwargs',
+                {'prompt_cache_key': f'{type(self).__name__}:{model_name}'},
+            )
             self._llm = ChatOpenAI(
-                model_name=model_name, api_key=self.openai_key, **kwargs
+                model_name=model_name,
+                api_key=self.openai_key,
+                **llm_client_pool.get_http_clients('openai', self.openai_key),
+                **kwargs,
             )
             self.model_name, self.provider = model_name, 'openai'
         except Exception:
@@ -167,24 +202,39 @@ class BaseAgent:
         else:
             raise APIKeyNotFoundException
 
+    def _create_summary_llm(self) -> BaseChatModel | None:
+        """Instancia o modelo barato (`ModelTask.DEFAULT`) usado para resumir o histórico, com as chaves da sessão."""
+        summarizer = BaseAgent(
+            current_session={
+                'gemini_key': self.gemini_key,
+                'groq_key': self.groq_key,
+                'openai_key': self.openai_key,
+            }
+        )
+
+        try:
+            summarizer._init_default_llm(ModelTask.DEFAULT)
+        except APIKeyNotFoundException:
+            return None
+
+        return summarizer._llm
+
     def _get_session_memory(self, session_id: str):
-        """Instancia um armazenamento de memória local para o agente.
+        """Instancia a memória de conversa do agente, limitada pelo orçamento de tokens do modelo.
 
         Args:
-            session_id (str): Identificador para o arquivo de sessão do usuário."""
-        # Criar um arquivo temporário para armazenar a memória de cada sessão, diretório apagado a cada reinício do container ou do sistema.
-        temp = tempfile.gettempdir()
-        history_file = os.path.join(temp, session_id + '_history.json')
-
-        history = FileChatMessageHistory(history_file, encoding='utf-8')
+            session_id (str): Identificador da sessão do usuário."""
+        # Sessões ativas são lidas do buffer em memória, as mensagens são gravadas no SQLite em lotes
+        history = StoreChatMessageHistory(session_id)
 
-        memory = ConversationBufferWindowMemory(
+        memory = TokenBudgetMemory(
             chat_memory=history,
             memory_key=self.memory_key,
             input_key='input',
             output_key='output',
             return_messages=True,
-            k=10,
+            model_name=getattr(self, 'model_name', None),
+            summary_llm=self._create_summary_llm(),
         )
 
         return memory
@@ -207,17 +257,7 @@ class BaseAgent:
             tools (any, optional): Ferramentas para o agente, se for None, o conjunto padrão de ferramentas é usado.
             prompt (ChatPromptTemplate | None, optional): Template de prompt usado no agente, se for None, o template padrão é usado.
             session_id (str | None, optional): Identificador de sessão para separar memória do agente. Necessário ser passado para criar instancia de memória.
-            memory (BaseMemory | None, optional): Instância de memória usada para o agente, se for None, usa a ConversationBufferWindowMemory padrão:
-
-            ```ConversationBufferWindowMemory(
-            chat_memory=history,
-            memory_key=self.memory_key,
-            input_key='input',
-            output_key='output',
-            return_messages=True,
-            k=10,
-        )
-            ```
+            memory (BaseMemory | None, optional): Instância de memória usada para o agente, se for None, usa a `TokenBudgetMemory` da sessão, que envia as mensagens recentes dentro do orçamento de tokens do modelo e resume as antigas.
             verbose (bool, optional): Se o agente imprimirá suas ações no console.
 
         Raises:
@@ -240,6 +280,7 @@ class BaseAgent:
             tools=tools or self.tools,
             memory=memory,
             max_iterations=7,
+            return_intermediate_steps=self.return_intermediate_steps,
             verbose=verbose,
         )
 
@@ -255,8 +296,8 @@ class BaseAgent:
 
         return self.agent.invoke({'input': user_input, **kwargs})
 
-    async def arun(self, user_input, **kwargs):
+    async def arun(self, user_input, config: RunnableConfig | None = None, **kwargs):
         if not self.agent:
             raise ExecutorNotFoundException()
 
-        return await self.agent.ainvoke({'input': user_input, **kwargs})
+        return await self.agent.ainvoke({'input': user_input, **kwargs}, config=config)
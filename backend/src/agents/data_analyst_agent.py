@@ -1,9 +1,8 @@
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.tools import BaseTool
-from langchain_core.messages import SystemMessage
 
 from src.data import ModelTask
 from src.tools.data_analysis_tool import get_analysis_tools
+from src.tools.statistics_tool import get_statistics_tools
 
 from .base_agent import BaseAgent
 
@@ -26,6 +25,7 @@ Follow these rules strictly:
     a. **Explore:** First, use the `get_data_summary` tool to understand the data's structure, columns, data types, and basic statistics. This is your first step in almost every analysis, as the user may not know the actual column names.
     b. **Plan:** Formulate a plan on how to approach the user's request.
     c. **Choose the Right Tool:** Based on the data types you discovered, choose the most appropriate tool. For example, use `create_histogram` for numerical columns and a bar chart tool for categorical columns.
+       For aggregations by groups, pivot tables, totals by period (daily/monthly), moving averages and percentiles use the statistics tools (`group_aggregate`, `pivot_table`, `resample_time_series`, `rolling_window`, `compute_percentiles`), they are vectorized and handle large datasets.
     d. **Execute:** Use your tools to execute the plan.
     e. **Last Resort:** The `Python_code` tool is powerful for complex data manipulation and analysis with the libraries pandas & plotly. Use it only as a last resort if no other specific tool can solve the problem. Using this tool for file manipulation is not allowed!
 4.  **Graph Generation:** 
@@ -34,18 +34,13 @@ Follow these rules strictly:
         * After the graph generation you **can** receive the field 'metadata' in the response, that can be used to provide more explanations about the graph and data used.
         * Your final response should **always** include the identifier for the generated graph and an explanation if provided with metadata (the graph will be rendered by other internal function using the graph_id). 
         * If needed, ask the user to be more specific about the columns used in the requested graph.
-5.  **Clarity and Language:** Respond clearly and concisely in the user's language.
-6.  **Honesty:** If you cannot fulfill a request with your tools, state that you are unable to do so. Do not invent information.
+5.  **Large Outputs:** Tool outputs are limited in size. When an output is truncated you receive a preview and a handle, use `read_tool_output` with that handle only if the preview is not enough to answer.
+6.  **Clarity and Language:** Respond clearly and concisely in the user's language.
+7.  **Honesty:** If you cannot fulfill a request with your tools, state that you are unable to do so. Do not invent information.
 """
 
         # Agent configuration
-        self.prompt = ChatPromptTemplate.from_messages(
-            [
-                SystemMessage(system_instructions),
-                ('human', '{input}'),
-                MessagesPlaceholder('agent_scratchpad'),
-            ]
-        )
+        self.prompt = self.build_prompt(system_instructions)
         self.initialize_agent(
             task_type=ModelTask.DATA_ANALYSIS, tools=self.tools, prompt=self.prompt
         )
@@ -54,7 +49,10 @@ Follow these rules strictly:
     def tools(self):
         """Retorna as ferramentas disponíveis para o agente."""
 
-        tools: list[BaseTool] = [*get_analysis_tools(self.session_id)]
+        tools: list[BaseTool] = [
+            *get_analysis_tools(self.session_id),
+            *get_statistics_tools(self.session_id),
+        ]
 
         return tools
 
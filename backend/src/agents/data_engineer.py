@@ -1,6 +1,4 @@
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.tools import BaseTool
-from langchain_core.messages import SystemMessage
 
 from src.data import ModelTask
 from src.tools.data_extraction_tool import DataExtractionTools
@@ -87,13 +85,7 @@ vCOFINS (Item),Valor Final do COFINS Destacado,SIM
 """
 
         # Agent configuration
-        self.prompt = ChatPromptTemplate(
-            [
-                SystemMessage(system_instructions),
-                ('human', '{input}'),
-                MessagesPlaceholder('agent_scratchpad'),
-            ]
-        )
+        self.prompt = self.build_prompt(system_instructions)
         self.initialize_agent(
             task_type=ModelTask.DATA_TREATMENT,
             tools=self.tools,
@@ -0,0 +1,183 @@
+"""Memórias de conversa usadas pelos agentes."""
+
+import asyncio
+from typing import Any
+
+from langchain.memory.chat_memory import BaseChatMemory
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    get_buffer_string,
+)
+from pydantic import PrivateAttr
+
+from src.data import MEMORY_TOKEN_BUDGETS
+from src.settings import settings
+from src.utils.tokens import count_message_tokens, count_tokens, truncate_to_tokens
+
+SUMMARY_PROMPT = """Progressively summarize the conversation below, adding onto the previous summary and returning a new summary.
+Keep user goals, decisions, loaded datasets, column names, numbers and conclusions. Drop raw tool outputs, tables and code.
+Answer only with the summary, in the same language as the conversation.
+
+Current summary:
+{summary}
+
+New lines of conversation:
+{new_lines}
+
+New summary:"""
+
+
+class TokenBudgetMemory(BaseChatMemory):
+    """Memória limitada pelo orçamento de tokens do modelo, com resumo contínuo das mensagens antigas.
+
+    As mensagens mais recentes que cabem no orçamento são enviadas ao modelo (cada uma limitada a `max_message_tokens`), as que ficam de fora são resumidas em segundo plano por um modelo barato e enviadas como uma única mensagem de sistema.
+    """
+
+    memory_key: str = 'history'
+    model_name: str | None = None
+    max_token_limit: int = 0
+    max_message_tokens: int = 0
+    summary_llm: BaseChatModel | None = None
+    summary: str = ''
+
+    # Identificador da última mensagem incorporada ao resumo
+    _summarized_id: str | None = PrivateAttr(default=None)
+    _summary_task: asyncio.Task | None = PrivateAttr(default=None)
+
+    def model_post_init(self, context: Any) -> None:
+        super().model_post_init(context)
+
+        if not self.max_token_limit:
+            self.max_token_limit = MEMORY_TOKEN_BUDGETS.get(
+                self.model_name, settings.memory_token_budget
+            )
+
+        if not self.max_message_tokens:
+            self.max_message_tokens = settings.memory_message_max_tokens
+
+    @property
+    def memory_variables(self) -> list[str]:
+        return [self.memory_key]
+
+    def _unsummarized(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        """Retorna as mensagens posteriores à última mensagem já resumida."""
+        if self._summarized_id is None:
+            return messages
+
+        for index in range(len(messages) - 1, -1, -1):
+            if messages[index].id == self._summarized_id:
+                return messages[index + 1 :]
+
+        # A mensagem marcada saiu do buffer, todas as mensagens restantes são mais novas
+        return messages
+
+    def _truncate(self, message: BaseMessage) -> BaseMessage:
+        if not isinstance(message.content, str):
+            return message
+
+        content = truncate_to_tokens(
+            message.content, self.max_message_tokens, self.model_name
+        )
+
+        if content is message.content:
+            return message
+
+        return message.model_copy(update={'content': content})
+
+    def _split(
+        self, messages: list[BaseMessage]
+    ) -> tuple[list[BaseMessage], list[BaseMessage]]:
+        """Separa as mensagens em antigas (fora do orçamento) e recentes (enviadas ao modelo).
+
+        Returns:
+            tuple[list[BaseMessage], list[BaseMessage]]: Mensagens fora do orçamento e mensagens mantidas, ambas em ordem cronológica.
+        """
+        budget = self.max_token_limit
+
+        if self.summary:
+            budget -= count_tokens(self.summary, self.model_name)
+
+        kept = []
+
+        for message in reversed(self._unsummarized(messages)):
+            message = self._truncate(message)
+            budget -= count_message_tokens([message], self.model_name)
+
+            if budget < 0:
+                break
+
+            kept.append(message)
+
+        kept.reverse()
+        unsummarized = self._unsummarized(messages)
+        old = unsummarized[: len(unsummarized) - len(kept)]
+
+        # O histórico deve começar pela pergunta do usuário, não pela resposta de um turno cortado
+        while kept and not isinstance(kept[0], HumanMessage):
+            old.append(unsummarized[len(old)])
+            kept.pop(0)
+
+        return old, kept
+
+    def _build_variables(self, messages: list[BaseMessage]) -> dict[str, Any]:
+        _, kept = self._split(messages)
+
+        if self.summary:
+            kept = [
+                SystemMessage(f'Summary of the earlier conversation:\n{self.summary}'),
+                *kept,
+            ]
+
+        if not self.return_messages:
+            return {self.memory_key: get_buffer_string(kept)}
+
+        return {self.memory_key: kept}
+
+    def load_memory_variables(self, inputs: dict[str, Any]) -> dict[str, Any]:
+        return self._build_variables(self.chat_memory.messages)
+
+    async def aload_memory_variables(self, inputs: dict[str, Any]) -> dict[str, Any]:
+        return self._build_variables(await self.chat_memory.aget_messages())
+
+    async def asave_context(
+        self, inputs: dict[str, Any], outputs: dict[str, str]
+    ) -> None:
+        await super().asave_context(inputs, outputs)
+
+        if self.summary_llm is None:
+            return
+
+        old, _ = self._split(await self.chat_memory.aget_messages())
+
+        # Apenas um resumo por vez, mensagens novas fora do orçamento entram no próximo
+        if old and (self._summary_task is None or self._summary_task.done()):
+            self._summary_task = asyncio.create_task(self._summarize(old))
+
+    async def _summarize(self, messages: list[BaseMessage]) -> None:
+        """Incorpora as mensagens ao resumo usando o modelo de resumo, fora do caminho da resposta."""
+        new_lines = get_buffer_string([self._truncate(message) for message in messages])
+
+        try:
+            response = await self.summary_llm.ainvoke(
+                SUMMARY_PROMPT.format(summary=self.summary, new_lines=new_lines)
+            )
+        except Exception as exc:
+            print(f'\t>> Failed to summarize conversation history: {exc}')
+
+            return
+
+        self.summary = response.text().strip()
+        self._summarized_id = messages[-1].id
+
+    def clear(self) -> None:
+        super().clear()
+        self.summary = ''
+        self._summarized_id = None
+
+    async def aclear(self) -> None:
+        await super().aclear()
+        self.summary = ''
+        self._summarized_id = None
@@ -1,7 +1,9 @@
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import SystemMessage
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel
 
 from src.data import ModelTask
+from src.utils.json_repair import repair_json
 
 from .base_agent import BaseAgent
 
@@ -34,17 +36,60 @@ Olá! 😊 Tudo bem por aqui. Como posso te ajudar hoje? Se precisar de análise
 
 """
 
-        self.prompt = ChatPromptTemplate(
-            [
-                SystemMessage(system_instructions),
-                ('system', '{format_instructions}'),
-                ('human', '{input}'),
-                MessagesPlaceholder('agent_scratchpad'),
-            ]
+        self.prompt = self.build_prompt(
+            system_instructions, ('system', '{format_instructions}')
         )
 
+        self.system_instructions = system_instructions
+        # Modelos com saída estruturada nativa, um por esquema
+        self._structured_llms: dict[type[BaseModel], Runnable | None] = {}
+
         self.initialize_agent(
             task_type=ModelTask.DEFAULT,
             prompt=self.prompt,
             session_id=self.session_id,
         )
+
+    def _get_structured_llm(self, output_schema: type[BaseModel]) -> Runnable | None:
+        if output_schema not in self._structured_llms:
+            try:
+                # JSON schema ou tool calling, conforme o suporte do provedor
+                self._structured_llms[output_schema] = self._llm.with_structured_output(
+                    output_schema
+                )
+            except NotImplementedError:
+                self._structured_llms[output_schema] = None
+
+        return self._structured_llms[output_schema]
+
+    async def aparse(
+        self, content: str, output_schema: type[BaseModel], format_instructions: str
+    ) -> dict:
+        """Converte a resposta de outro agente para o esquema, usando a saída estruturada nativa do provedor quando disponível.
+
+        Args:
+            content (str): Resposta original do agente.
+            output_schema (type[BaseModel]): Esquema esperado para a resposta.
+            format_instructions (str): Instruções de formato com o erro de validação encontrado.
+
+        Returns:
+            dict: Resposta convertida para o esquema.
+        """
+        structured_llm = self._get_structured_llm(output_schema)
+
+        if structured_llm is None:
+            response = await self.arun(
+                content, **{'format_instructions': format_instructions}
+            )
+
+            return repair_json(response['output'])
+
+        result = await structured_llm.ainvoke(
+            [
+                SystemMessage(self.system_instructions),
+                SystemMessage(format_instructions),
+                HumanMessage(content),
+            ]
+        )
+
+        return result.model_dump()
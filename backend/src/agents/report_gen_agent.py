@@ -1,6 +1,3 @@
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import SystemMessage
-
 from src.agents import BaseAgent
 from src.data import ModelTask
 from src.tools.report_gen_tool import create_report_tools
@@ -21,6 +18,7 @@ You will receive a detailed request in the 'input' that contains the report type
 1.  **Analyze Input:** Carefully read the entire input string to identify the core data, the report type specifies your writing style (analysis_results is the default, validation_audit is for writing reports with formality and quoting Brazil's laws when necessary, justifying the provided data).
 2.  **Draft Report:** Draft the professional report (as a markdown string) based on the supplied data, finding key points, action items, and clear insights. Follow the report markdown template, you can modify the layout as long as it follows the rules listed.
     * Revise it for inconsistencies before sending the final result.
+    * For validation_audit reports of the user's uploaded data, use the `get_tax_audit_results` tool to get the stored bulk tax audit summary and flagged rows.
 3.  **Use Tool:** Use the `create_and_send_report` tool for PDF generation and email sending, passing a **file name** in lowercase and the **entire drafted report string**. The tool can get the user email automatically, if no email is available you can return the draft directly as response instead.
 4.  **Final Response:** Your final response to the user is the output returned by the tool, if successful or else the report draft string.
 
@@ -46,13 +44,7 @@ You should not use horizontal dividers from markdown, separate sections with one
 * Create the report using Brazilian Portuguese language.
 * For errors with valid emails, prompts the user to register a valid one.
 """
-        self.prompt = ChatPromptTemplate(
-            [
-                SystemMessage(system_instructions),
-                ('human', '{input}'),
-                MessagesPlaceholder('agent_scratchpad'),
-            ]
-        )
+        self.prompt = self.build_prompt(system_instructions)
 
         self.initialize_agent(
             task_type=ModelTask.REPORT_GENERATION, tools=self.tools, prompt=self.prompt
@@ -61,7 +53,7 @@ You should not use horizontal dividers from markdown, separate sections with one
     @property
     def tools(self):
         """Adiciona ferramentas para amplificar as capacidades do agente."""
-        tools = [*create_report_tools(self.current_session)]
+        tools = [*create_report_tools(self.current_session, self.session_id)]
 
         return tools
 
@@ -1,5 +1,4 @@
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import SystemMessage
+from collections.abc import Awaitable, Callable
 
 from src.data import ModelTask
 from src.tools.use_agent_tool import create_agent_tools
@@ -16,15 +15,19 @@ class SupervisorAgent(BaseAgent):
         session_id: str,
         *,
         current_session: dict[str, BaseAgent | str],
+        agent_loader: Callable[[ModelTask], Awaitable[BaseAgent]],
         memory_key: str = 'chat_history',
     ):
         self.current_session = current_session
+        self.agent_loader = agent_loader
 
         super().__init__(
             current_session=current_session,
             memory_key=memory_key,
             session_id=session_id,
         )
+        # Ferramentas usadas definem se a resposta pode ser reaproveitada pelo cache
+        self.return_intermediate_steps = True
 
         system_instructions = """You are the agent supervisor and your name is Smartie.
 Your primary responsibility is to assign work for other agents according to the request, your second responsibility is to generate valid responses to the user, primarily focusing in data analysis, fiscal documents or related. 
@@ -40,7 +43,7 @@ Each agent has its description with capabilities, choose the best agent for each
 
 * data_engineer: **data extraction and treatment** tasks, mainly used for extracting valid info in texts (invoice or tax data returned by the user or other tools, generally from Brazil's tax documents XML file or images) and storing in the vector store for later use. Used for extracting invoice documents fields from the vector store through semantic search too, limited by 10.
 
-* tax_specialist: **tax calculation and validation** tasks, used for analyzing the data from vector store, calculating taxes and pointing inconsistencies in Brazilian fiscal documents. The agent already has a tool for extracting the data, only a user request is necessary.
+* tax_specialist: **tax calculation and validation** tasks, used for analyzing the data from vector store, calculating taxes and pointing inconsistencies in Brazilian fiscal documents. The agent already has a tool for extracting the data, only a user request is necessary. It can also audit the taxes of all rows of the user's uploaded spreadsheet at once, storing the results for report_gen.
 
 * report_gen: **report generation and email sender** tasks. Used only when asked for generation of reports. Needs to **include all the relevant data** received from other tools (analysis, graph ids, ...) to create the report as best as possible. If the report draft is returned, that is because the user didn't register an email, alert the user.
 
@@ -48,7 +51,7 @@ Each agent has its description with capabilities, choose the best agent for each
 
 1. Received input from user.
 2. Analyzed the request and planned a course of action.
-3. Called the necessary tools or agents (if needed).
+3. Called the necessary tools or agents (if needed). Independent tasks MUST be requested together in the same step, as multiple tool calls, they run in parallel (e.g.: a data analysis with charts and a tax validation of invoices already stored). Tasks that depend on another agent's response wait for it in the next step (e.g.: tax_specialist after data_engineer extracts new invoices, report_gen after the analysis results).
 4. Received the response from tools, then validated if more steps are needed.
 5. If finished, return the response to the user following the provided schema. 
 
@@ -61,14 +64,11 @@ Each agent has its description with capabilities, choose the best agent for each
 * Always return responses to the user with the data received from tools, insights and next steps. Do not generate partial responses (e.g.: "I have started the data analysis tool, wait till its complete"), wait for the tool's response before returning to the user.
 """
 
-        self.prompt = ChatPromptTemplate(
-            [
-                SystemMessage(system_instructions),
-                MessagesPlaceholder(self.memory_key),
-                ('system', '{format_instructions}'),
-                ('human', '{input}'),
-                MessagesPlaceholder('agent_scratchpad'),
-            ]
+        # Instruções de formato são fixas e ficam no prefixo, antes do histórico da conversa
+        self.prompt = self.build_prompt(
+            system_instructions,
+            ('system', '{format_instructions}'),
+            with_history=True,
         )
 
         self.initialize_agent(
@@ -84,7 +84,7 @@ Each agent has its description with capabilities, choose the best agent for each
 
         tools = [
             get_current_datetime,
-            *create_agent_tools(self.session_id, self.current_session),
+            *create_agent_tools(self.session_id, self.agent_loader),
         ]
 
         return tools
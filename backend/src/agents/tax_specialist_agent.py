@@ -1,6 +1,3 @@
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import SystemMessage
-
 from src.data import ModelTask
 from src.tools.taxes_validation_tools import create_validation_tools
 
@@ -29,10 +26,12 @@ Follow these 4 sequential steps to analyze the fiscal document data. If any step
 1.  **Integrity Check (Step 1):**
     * Verify **Access Key** (44 digits) and **Issuer's CNPJ** (14 digits, determine Tax Regime).
 2.  **Item-Level Compliance (Step 2):**
-    * For each item, call the relevant validation tools (e.g., `validate_icms_compliance`, `validate_federal_taxes`) to check if the highlighted tax values ($vICMS$, $vIPI$, $vPIS$, $vCOFINS$) conform to the respective CST/CSOSN, Tax Base, and Rates.
+    * Call `validate_invoice_items` ONCE for the whole invoice, with the access key of a stored invoice or with all the item rows, to check if the highlighted tax values ($vICMS$, $vIPI$, $vPIS$, $vCOFINS$) conform to the respective CST/CSOSN, Tax Base, and Rates. Only non-compliant items are returned.
+    * Use the per-item tools (`validate_icms`, `validate_federal_taxes`) only to re-check a single item.
+    * For the user's uploaded spreadsheet (CSV/XLSX with one invoice item per row), call `audit_session_data` ONCE to audit all rows, it returns a summary and the first flagged rows.
     * Collect all item-specific inconsistencies.
 3.  **Final Total Check (Step 3):**
-    * Call the `validate_total_note_value` tool to confirm that the declared Total Note Value ($vNF$) matches the sum of all components:
+    * The `validate_invoice_items` report includes the total check when the declared Total Note Value ($vNF$) is available. Otherwise, call the `validate_total_note_value` tool to confirm that $vNF$ matches the sum of all components.
 4.  **Final Verdict (Step 4):**
     * Consolidate all errors (from Steps 1 to 3).
     * If any critical fiscal failure or mismatch is found, the **General Status** is `NON_COMPLIANT`.
@@ -63,13 +62,7 @@ VALIDATION DETAILS:
         DETAIL: IPI highlighted (R$ 5.00) is forbidden for Simples Nacional issuer."
 ---
 """
-        self.prompt = ChatPromptTemplate(
-            [
-                SystemMessage(system_instructions),
-                ('human', '{input}'),
-                MessagesPlaceholder('agent_scratchpad'),
-            ]
-        )
+        self.prompt = self.build_prompt(system_instructions)
         self.initialize_agent(
             task_type=ModelTask.INVOICE_VALIDATION,
             tools=self.tools,
@@ -1,11 +1,18 @@
 """Rotas para serviços relacionados ao agente"""
 
-from fastapi import APIRouter, Form, UploadFile
-from typing_extensions import Annotated
-
-from src.schemas import ApiKeyInput, ModelChangeInput, UserEmailInput, UserInput
+from fastapi import APIRouter, Form, Header, Request, UploadFile
+from typing_extensions import Annotated, Literal
+
+from src.schemas import (
+    ApiKeyInput,
+    ChunkedUploadInput,
+    ModelChangeInput,
+    UserEmailInput,
+    UserInput,
+)
 from src.services.chat_model_services import Chat
 from src.services.data_processing_services import DataHandler
+from src.services.upload_services import upload_manager
 
 router = APIRouter()
 data_handler = DataHandler()
@@ -21,23 +28,106 @@ async def get_agent_info(tasks: bool = False, defaults: bool = False):
 
 @router.post('/upload', status_code=201)
 async def file_input(
-    separator: str, file: UploadFile, session_id: Annotated[str, Form()]
+    file: UploadFile,
+    session_id: Annotated[str, Form()],
+    separator: str | None = None,
+    sheet_name: str | None = None,
+    columns: str | None = None,
+):
+    response = await data_handler.load_data(
+        session_id,
+        file,
+        separator,
+        sheet_name=sheet_name,
+        columns=_split_columns(columns),
+    )
+
+    return await _upload_response(session_id, response)
+
+
+@router.post('/upload/chunked', status_code=201)
+async def init_chunked_upload(input: ChunkedUploadInput):
+    response = await upload_manager.init_upload(
+        input.session_id,
+        input.filename,
+        input.content_type,
+        input.size,
+        read_options={
+            'separator': input.separator,
+            'sheet_name': input.sheet_name,
+            'columns': _split_columns(input.columns),
+        },
+    )
+
+    return response
+
+
+@router.put('/upload/chunked/{upload_id}', status_code=200)
+async def append_chunk(
+    upload_id: str,
+    offset: int,
+    request: Request,
+    x_chunk_checksum: Annotated[str, Header()],
 ):
-    response = await data_handler.load_data(session_id, file, separator)
+    # O corpo é gravado em disco conforme chega, sem ser carregado em memória
+    response = await upload_manager.append_chunk(
+        upload_id, offset, x_chunk_checksum, request.stream()
+    )
+
+    return response
+
+
+@router.get('/upload/chunked/{upload_id}', status_code=200)
+async def get_chunked_upload(upload_id: str):
+    response = await upload_manager.get_status(upload_id)
 
+    return response
+
+
+@router.post('/upload/chunked/{upload_id}/finalize', status_code=201)
+async def finalize_chunked_upload(upload_id: str):
+    upload = await upload_manager.finalize(upload_id)
+
+    response = await data_handler.load_chunked_upload(upload)
+
+    return await _upload_response(upload.session_id, response)
+
+
+@router.delete('/upload/chunked/{upload_id}', status_code=204)
+async def cancel_chunked_upload(upload_id: str):
+    await upload_manager.discard(upload_id)
+
+
+def _split_columns(columns: str | None) -> list[str] | None:
+    # Colunas recebidas separadas por vírgula, usadas para descartar colunas na leitura
+    return [col.strip() for col in columns.split(',')] if columns else None
+
+
+async def _upload_response(session_id: str, response):
     if isinstance(response, dict) and response.get('process'):
         user_input = f'The following data was extracted from a XML file and possibly contain valid data to store, identify its context to understand if its useful to store and use the tools necessary, return a response in Portuguese Brazilian: \n\n{response.get("results")}'
 
+        batch_summary = response.get('batch_summary')
         response = await chat.extract_data(session_id, user_input)
 
+        # Lotes mistos: as linhas e os documentos fiscais do ZIP já foram carregados antes da extração pelo agente
+        if batch_summary:
+            response['response'] = (
+                f'{batch_summary["results"]}\n\n{response["response"]}'
+            )
+
         return response
 
     return {'data': response}
 
 
 @router.post('/upload/image', status_code=201)
-async def image_processing(file: UploadFile, session_id: Annotated[str, Form()]):
-    image_text = await data_handler.read_uploaded_image(session_id, file)
+async def image_processing(
+    file: UploadFile,
+    session_id: Annotated[str, Form()],
+    mode: Literal['text', 'danfe'] = 'text',
+):
+    image_text = await data_handler.read_uploaded_image(session_id, file, mode)
 
     response = await chat.send_prompt(session_id, image_text)
 
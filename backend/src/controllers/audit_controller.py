@@ -0,0 +1,34 @@
+"""Rotas para a auditoria fiscal em lote dos dados da sessão"""
+
+from fastapi import APIRouter, Query
+
+from src.schemas import TaxAuditInput
+from src.services.tax_audit_services import tax_audit_service
+from src.utils.exceptions import AuditNotFoundException
+
+router = APIRouter()
+
+
+@router.post('/audit/taxes', status_code=201)
+async def run_tax_audit(input: TaxAuditInput):
+    response = await tax_audit_service.audit_session(
+        input.session_id,
+        is_simples_nacional=input.is_simples_nacional,
+        rates_as_percentage=input.rates_as_percentage,
+    )
+
+    return response
+
+
+@router.get('/audit/taxes/{session_id}', status_code=200)
+async def get_tax_audit(
+    session_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, gt=0),
+):
+    response = tax_audit_service.get_results(session_id, offset, limit)
+
+    if response is None:
+        raise AuditNotFoundException
+
+    return response
@@ -0,0 +1,20 @@
+"""Rotas para métricas de uso da aplicação"""
+
+from fastapi import APIRouter
+
+from src.services.metrics_services import metrics
+
+router = APIRouter()
+
+
+@router.get('/metrics', status_code=200)
+async def get_metrics():
+    response = metrics.snapshot()
+    response['response_cache_hit_rate'] = metrics.ratio(
+        'response_cache.hits', 'response_cache.misses'
+    )
+    response['llm_cached_input_ratio'] = metrics.ratio(
+        'llm.cached_input_tokens', 'llm.uncached_input_tokens'
+    )
+
+    return response
@@ -1,4 +1,10 @@
-from .models import MODELS, TASK_PREDEFINED_MODELS, ModelTask
+from .models import MEMORY_TOKEN_BUDGETS, MODELS, TASK_PREDEFINED_MODELS, ModelTask
 from .workflow_steps import StatusUpdate
 
-__all__ = ['StatusUpdate', 'MODELS', 'ModelTask', 'TASK_PREDEFINED_MODELS']
+__all__ = [
+    'StatusUpdate',
+    'MODELS',
+    'ModelTask',
+    'TASK_PREDEFINED_MODELS',
+    'MEMORY_TOKEN_BUDGETS',
+]
@@ -54,3 +54,20 @@ TASK_PREDEFINED_MODELS = {
         ModelTask.DEFAULT: 'gpt-4o-mini',
     },
 }
+
+
+# Orçamento de tokens do histórico de conversa enviado em cada chamada, por modelo.
+# Modelos com limites baixos de tokens por minuto (Groq) recebem históricos menores.
+MEMORY_TOKEN_BUDGETS = {
+    'qwen/qwen3-32b': 3000,
+    'llama-3.1-8b-instant': 2000,
+    'llama-3.3-70b-versatile': 3000,
+    'meta-llama/llama-4-maverick-17b-128e-instruct': 3000,
+    'meta-llama/llama-4-scout-17b-16e-instruct': 3000,
+    'openai/gpt-oss-20b': 3000,
+    'openai/gpt-oss-120b': 3000,
+    'gemini-2.5-flash': 8000,
+    'gemini-2.5-pro': 8000,
+    'gpt-4o': 6000,
+    'gpt-4o-mini': 6000,
+}
@@ -9,7 +9,7 @@ from typing_extensions import Literal
 class StatusDetail:
     name: str
     desc: str
-    status: Literal['pending', 'in-progress', 'complete']
+    status: Literal['pending', 'in-progress', 'complete', 'error']
 
     def to_dict(self):
         return {'name': self.name, 'desc': self.desc, 'status': self.status}
@@ -29,6 +29,24 @@ class StatusUpdate:
         status='in-progress',
     ).to_dict()
 
+    @staticmethod
+    def upload_progress(processed: int, total: int, filename: str) -> dict:
+        """Status dinâmico para o progresso de cada arquivo em uploads em lote."""
+        return StatusDetail(
+            name='Upload Service',
+            desc=f'Arquivo {processed}/{total} processado: {filename}',
+            status='in-progress',
+        ).to_dict()
+
+    @staticmethod
+    def upload_error(processed: int, total: int, filename: str, error: str) -> dict:
+        """Status dinâmico para arquivos que falharam em uploads em lote, o processamento segue com os demais."""
+        return StatusDetail(
+            name='Upload Service',
+            desc=f'Arquivo {processed}/{total} ignorado: {filename} ({error})',
+            status='error',
+        ).to_dict()
+
     UPLOAD_CSV = StatusDetail(
         name='Upload Service',
         desc='CSV detectado, começando leitura',
@@ -47,6 +65,12 @@ class StatusUpdate:
         status='in-progress',
     ).to_dict()
 
+    UPLOAD_XML_STORE = StatusDetail(
+        name='Upload Service',
+        desc='Documentos fiscais identificados, armazenando no Vector Store',
+        status='in-progress',
+    ).to_dict()
+
     UPLOAD_IMAGE = StatusDetail(
         name='Upload Service',
         desc='Escaneando texto da imagem',
@@ -102,6 +126,18 @@ class StatusUpdate:
         status='in-progress',
     ).to_dict()
 
+    TAX_AUDIT_INIT = StatusDetail(
+        name='Tax Audit',
+        desc='Auditando os tributos de todos os itens dos dados',
+        status='in-progress',
+    ).to_dict()
+
+    TAX_AUDIT_FINISH = StatusDetail(
+        name='Tax Audit',
+        desc='Auditoria fiscal concluída',
+        status='complete',
+    ).to_dict()
+
     # --- Etapa: Finalização ---
     SUPERVISOR_RESPONSE = StatusDetail(
         name='Supervisor',
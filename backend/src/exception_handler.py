@@ -14,11 +14,19 @@ from starlette.middleware.base import BaseHTTPMiddleware
 
 from src.utils.exceptions import (
     APIKeyNotFoundException,
+    AuditColumnsNotFoundException,
+    AuditNotFoundException,
+    ChunkChecksumException,
+    DataNotFoundException,
     InvalidEmailTypeException,
+    InvalidFileOptionsException,
     MaxFileSizeException,
     ModelNotFoundException,
     ModelResponseValidationException,
     SessionNotFoundException,
+    UploadNotFoundException,
+    UploadOffsetMismatchException,
+    VectorStoreConnectionException,
     WrongFileTypeError,
 )
 
@@ -35,12 +43,20 @@ class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
             WrongFileTypeError,
             ModelNotFoundException,
             InvalidEmailTypeException,
+            InvalidFileOptionsException,
             SessionNotFoundException,
             MaxFileSizeException,
+            ChunkChecksumException,
+            DataNotFoundException,
+            AuditColumnsNotFoundException,
         ) as exc:
             return JSONResponse(
                 content=exc.msg, status_code=status.HTTP_400_BAD_REQUEST
             )
+        except (UploadNotFoundException, AuditNotFoundException) as exc:
+            return JSONResponse(content=exc.msg, status_code=status.HTTP_404_NOT_FOUND)
+        except UploadOffsetMismatchException as exc:
+            return JSONResponse(content=exc.msg, status_code=status.HTTP_409_CONFLICT)
         except BadZipFile:
             return JSONResponse(
                 content='Bad zip file sent, maybe the file is corrupted or empty.',
@@ -67,6 +83,10 @@ class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
                 content='Failed to create a new OpenAI model chat, check if your API key is correct or try sending it again.',
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
+        except VectorStoreConnectionException as exc:
+            return JSONResponse(
+                content=exc.msg, status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
         except ModelResponseValidationException as exc:
             return JSONResponse(
                 content=exc.msg, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
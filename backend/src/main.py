@@ -4,12 +4,27 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .controllers import agent_controller, db_controller, websocket_controller
+from .controllers import (
+    agent_controller,
+    audit_controller,
+    db_controller,
+    metrics_controller,
+    websocket_controller,
+)
 from .exception_handler import ExceptionHandlerMiddleware
+from .services.compute_services import compute_pool
+from .services.conversation_services import conversation_store
 from .services.data_processing_services import session_manager
 from .services.db_services import init_db
+from .services.file_reader_services import shutdown_ingestion_pool
+from .services.llm_client_services import llm_client_pool
+from .services.ocr_services import ocr_service
+from .services.sandbox_services import sandbox_pool
+from .services.shared_memory_services import shared_frames
+from .services.upload_services import upload_manager
 from .tools.data_extraction_tool import qdrant_store
 from .utils.exceptions import VectorStoreConnectionException
+from .utils.tokens import warm_up_encoding
 
 cleanup_task = None
 
@@ -23,16 +38,36 @@ async def lifespan(app: FastAPI):
     except VectorStoreConnectionException:
         print('\t>> \033[31mVector Store could not be initialized!\033[m')
 
+    # Workers de execução de código iniciados antes do primeiro uso
+    sandbox_pool.start()
+
+    # Vocabulário do tokenizador baixado fora do event loop, antes da primeira contagem de tokens da memória
+    await asyncio.to_thread(warm_up_encoding)
+
     # Criação de tarefas de limpeza
     agent_cleanup_task = asyncio.create_task(agent_controller.chat.cleanup_agents())
     data_cleanup_task = asyncio.create_task(session_manager.cleanup_task())
+    upload_cleanup_task = asyncio.create_task(upload_manager.cleanup_task())
+    history_flush_task = asyncio.create_task(conversation_store.flush_task())
 
     yield
 
-    for task in (agent_cleanup_task, data_cleanup_task):
+    for task in (
+        agent_cleanup_task,
+        data_cleanup_task,
+        upload_cleanup_task,
+        history_flush_task,
+    ):
         if task:
             task.cancel()
 
+    shutdown_ingestion_pool()
+    ocr_service.shutdown()
+    sandbox_pool.shutdown()
+    compute_pool.shutdown()
+    shared_frames.close()
+    await llm_client_pool.close()
+
 
 app = FastAPI(
     title='Smart Financial Solutions API',
@@ -70,5 +105,7 @@ async def ping():
 
 
 app.include_router(agent_controller.router)
+app.include_router(audit_controller.router)
 app.include_router(db_controller.router)
+app.include_router(metrics_controller.router)
 app.include_router(websocket_controller.router)
@@ -1,12 +1,21 @@
 from .model_schemas import JSONOutputModel, PayloadDataModel, QueryOutputModel
 from .status_schemas import StatusOutput
-from .user_schemas import ApiKeyInput, ModelChangeInput, UserEmailInput, UserInput
+from .user_schemas import (
+    ApiKeyInput,
+    ChunkedUploadInput,
+    ModelChangeInput,
+    TaxAuditInput,
+    UserEmailInput,
+    UserInput,
+)
 
 __all__ = [
     'UserInput',
     'ApiKeyInput',
     'ModelChangeInput',
     'UserEmailInput',
+    'ChunkedUploadInput',
+    'TaxAuditInput',
     'JSONOutputModel',
     'QueryOutputModel',
     'PayloadDataModel',
@@ -1,6 +1,6 @@
 """Esquemas para validação da entrada e saída do usuário."""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class UserInput(BaseModel):
@@ -23,3 +23,19 @@ class ModelChangeInput(BaseModel):
     agent_task: str
     model_name: str
     session_id: str
+
+
+class ChunkedUploadInput(BaseModel):
+    filename: str
+    size: int = Field(gt=0)
+    session_id: str
+    content_type: str | None = None
+    separator: str | None = None
+    sheet_name: str | None = None
+    columns: str | None = None
+
+
+class TaxAuditInput(BaseModel):
+    session_id: str
+    is_simples_nacional: bool = False
+    rates_as_percentage: bool = True
@@ -0,0 +1,645 @@
+"""Análises e gráficos sobre o DataFrame da sessão, executados nos workers de cálculo ou em threads do processo da API."""
+
+import io
+import threading
+import tracemalloc
+import uuid
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from plotly.basedatatypes import BaseFigure
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+
+from src.services.db_services import insert_graphs_db
+
+# Categorias descritas nos metadados do gráfico de barras
+BAR_CHART_TOP_CATEGORIES = 20
+# Agrupamento: acima do limite, o ajuste usa o MiniBatchKMeans em uma amostra e a predição é feita em blocos
+CLUSTER_FULL_FIT_ROWS = 100_000
+CLUSTER_FIT_SAMPLE_ROWS = 100_000
+CLUSTER_PREDICT_CHUNK_ROWS = 500_000
+# Escolha automática do número de clusters pela silhueta, de custo quadrático no tamanho da amostra
+CLUSTER_SILHOUETTE_SAMPLE_ROWS = 2_000
+CLUSTER_MAX_AUTO_K = 10
+# Pontos do gráfico de clusters, amostrados por cluster
+CLUSTER_PLOT_MAX_POINTS = 5_000
+CLUSTER_PLOT_MIN_POINTS = 50
+
+# O tracemalloc é global no processo: as medições simultâneas (threads da API) compartilham o rastreamento,
+# que só é encerrado pela última medição e apenas quando foi iniciado por este módulo
+_tracing_lock = threading.Lock()
+_tracing_calls = 0
+_tracing_started = False
+
+
+def _start_memory_tracing() -> None:
+    """Inicia a medição de memória, zerando o pico apenas quando não há outra medição em andamento."""
+    global _tracing_calls, _tracing_started
+
+    with _tracing_lock:
+        if _tracing_calls == 0:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _tracing_started = True
+
+            tracemalloc.reset_peak()
+
+        _tracing_calls += 1
+
+
+def _stop_memory_tracing() -> float:
+    """
+    Encerra a medição de memória.
+
+    Returns:
+        float: Pico de memória em MB desde o início da medição (com medições simultâneas, inclui as demais).
+    """
+    global _tracing_calls, _tracing_started
+
+    with _tracing_lock:
+        peak_memory_mb = tracemalloc.get_traced_memory()[1] / 1024**2
+        _tracing_calls -= 1
+
+        if _tracing_calls == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+    return peak_memory_mb
+
+
+def save_graph_to_db(fig: BaseFigure, metadata: str) -> str:
+    """
+    Função para salvar o JSON gerado por ferramentas no banco de dados.
+    """
+    graph_id = str(uuid.uuid4())
+    graph_json = fig.to_json()
+    insert_graphs_db(graph_id, graph_json, metadata)
+
+    return graph_id
+
+
+def get_data_summary(df: pd.DataFrame) -> str:
+    if df is None or df.empty:
+        return 'DataFrame empty, no data to analyse.'
+
+    info_buffer = io.StringIO()
+    df.info(buf=info_buffer)
+    info_str = info_buffer.getvalue()
+
+    desc_str = df.describe(include='all').to_string()
+
+    return f'Data Summary:\n\n{info_str}\n\nDescriptive Statistics:\n{desc_str}'
+
+
+def get_data_rows(
+    df: pd.DataFrame, n_rows: int = 10, sample_method: str = 'head'
+) -> pd.DataFrame | str:
+    if df is None or df.empty:
+        return 'DataFrame empty, no data to analyse.'
+
+    if not isinstance(n_rows, int) or n_rows <= 0:
+        return 'Error: Number of rows (n_rows) must be a positive integer.'
+
+    if sample_method == 'head':
+        return df.head(n_rows)
+    elif sample_method == 'tail':
+        return df.tail(n_rows)
+    elif sample_method == 'random':
+        return df.sample(n=min(n_rows, len(df)))
+
+    return "Error: Invalid sample_method. Choose from 'head', 'tail', or 'random'."
+
+
+def get_correlation_matrix(df: pd.DataFrame) -> pd.DataFrame | str:
+    if df is None or df.empty:
+        return 'DataFrame empty, no data to analyse.'
+
+    numeric_df = df.select_dtypes(include='number')
+
+    if numeric_df.empty:
+        return 'No numeric columns found to calculate correlation.'
+
+    return numeric_df.corr().round(4)
+
+
+def detect_outliers_iqr(df: pd.DataFrame, column: str) -> dict | str:
+    if df is None or df.empty:
+        return 'DataFrame empty, no data to analyse.'
+
+    if column not in df.columns:
+        return f'Error: Column "{column}" not found in the dataset.'
+
+    if not pd.api.types.is_numeric_dtype(df[column]):
+        return f'Error: Column "{column}" is not numeric.'
+
+    q1 = df[column].quantile(0.25)
+    q3 = df[column].quantile(0.75)
+    iqr = q3 - q1
+    lower_bound = q1 - 1.5 * iqr
+    upper_bound = q3 + 1.5 * iqr
+
+    outliers = df[(df[column] < lower_bound) | (df[column] > upper_bound)]
+
+    if outliers.empty:
+        return f'No outliers detected in column "{column}".'
+
+    return {
+        'response': (
+            f'Detected {len(outliers)} outliers in column "{column}" '
+            f'({len(outliers) / len(df):.2%} of the rows). '
+            f'Bounds: lower={lower_bound:.4g}, upper={upper_bound:.4g}. '
+            f'Outlier range: min={outliers[column].min():.4g}, max={outliers[column].max():.4g}.'
+        ),
+        'outliers': outliers,
+    }
+
+
+def create_histogram(df: pd.DataFrame, column: str) -> dict:
+    if df is None or df.empty:
+        return 'DataFrame empty, no data to analyse.'
+
+    if column not in df.columns:
+        return f'Error: Column "{column}" not found in the dataset.'
+
+    if not pd.api.types.is_numeric_dtype(df[column]):
+        return f'Error: Column "{column}" is not numeric. Use create_bar_chart for categorical columns.'
+
+    stats = df[column].describe()
+    metadata = (
+        f"Graph Type: Histogram for the '{column}' column. "
+        f'Visualizes the frequency distribution of the column. '
+        f'Key statistics: Mean={stats.get("mean", "N/A"):.2f}, '
+        f'Median={stats.get("50%", "N/A"):.2f}, '
+        f'Max={stats.get("max", "N/A"):.2f}, '
+        f'Min={stats.get("min", "N/A"):.2f}. '
+        f"The X-axis is '{column}' and the Y-axis is the count of occurrences."
+    )
+
+    fig = px.histogram(df, x=column)
+    graph_id = save_graph_to_db(fig, metadata)
+
+    return {
+        'response': f'Histogram for "{column}" created successfully.',
+        'graph_id': graph_id,
+        'metadata': metadata,
+    }
+
+
+def create_scatter_plot(df: pd.DataFrame, x_column: str, y_column: str) -> dict:
+    if df is None or df.empty:
+        return 'DataFrame empty, no data to analyse.'
+
+    if x_column not in df.columns or y_column not in df.columns:
+        return 'Error: One or both columns not found in the dataset.'
+
+    correlation_value = df[x_column].corr(df[y_column])
+
+    abs_corr = abs(correlation_value)
+    if abs_corr >= 0.7:
+        strength = 'Strong Linear Relationship'
+    elif abs_corr >= 0.3:
+        strength = 'Moderate Linear Relationship'
+    else:
+        strength = 'Weak or No Linear Relationship'
+
+    direction = (
+        'Positive'
+        if correlation_value > 0
+        else ('Negative' if correlation_value < 0 else 'Neutral')
+    )
+    relationship_summary = f'{strength}, Direction: {direction}'
+
+    metadata = (
+        'chart_type: scatter_plot\n'
+        'analysis_method: bivariate_relationship_analysis\n'
+        f'x_variable: {x_column}\n'
+        f'y_variable: {y_column}\n'
+        f'correlation_coefficient: {round(correlation_value, 4)}\n'
+        f'relationship_summary: {relationship_summary}\n'
+        f'x_min_max: {round(df[x_column].min(), 2), round(df[x_column].max(), 2)}\n'
+        f'y_min_max: {round(df[y_column].min(), 2), round(df[y_column].max(), 2)}\n'
+        'agent_instruction: The agent must report the "relationship_summary" and the "correlation_coefficient" to the user to explain the pattern observed in the plot.'
+    )
+
+    fig = px.scatter(df, x=x_column, y=y_column)
+    graph_id = save_graph_to_db(fig, metadata)
+    return {
+        'response': f'Scatter plot for "{x_column}" vs "{y_column}" created successfully.',
+        'graph_id': graph_id,
+        'metadata': metadata,
+    }
+
+
+def create_bar_chart(df: pd.DataFrame, column: str) -> dict:
+    if df is None or df.empty:
+        return 'DataFrame empty, no data to analyse.'
+
+    if column not in df.columns:
+        return f'Error: Column "{column}" not found in the dataset.'
+
+    if pd.api.types.is_numeric_dtype(df[column]):
+        return f'Error: Column "{column}" is numeric. Use create_histogram for numeric columns.'
+
+    counts = df[column].value_counts().reset_index()
+    counts.columns = [column, 'count']
+    fig = px.bar(counts, x=column, y='count', title=f'Distribution of {column}')
+
+    # Apenas as categorias mais frequentes entram nos metadados enviados ao agente
+    top_counts = counts.head(BAR_CHART_TOP_CATEGORIES)
+    remaining = counts['count'].iloc[BAR_CHART_TOP_CATEGORIES:].sum()
+
+    metadata = (
+        f"Graph Type: Bar Chart for the '{column}' column. "
+        f'Visualizes the count of each category in the column ({len(counts)} categories). '
+        f"The X-axis represents the categories of '{column}' and the Y-axis represents the frequency "
+        f'(top {len(top_counts)} categories): \n{top_counts.to_string(index=False)}'
+    )
+
+    if remaining:
+        metadata += (
+            f'\nOther {len(counts) - len(top_counts)} categories: {remaining} rows.'
+        )
+
+    graph_id = save_graph_to_db(fig, metadata)
+
+    return {
+        'response': f'Bar chart for "{column}" created successfully.',
+        'graph_id': graph_id,
+        'metadata': metadata,
+    }
+
+
+def create_line_plot(df: pd.DataFrame, x_column: str, y_column: str) -> dict:
+    if df is None or df.empty:
+        return 'DataFrame empty, no data to analyse.'
+
+    if x_column not in df.columns or y_column not in df.columns:
+        return 'Error: One or both columns not found in the dataset.'
+
+    fig = px.line(
+        df, x=x_column, y=y_column, title=f'Trend of {y_column} over {x_column}'
+    )
+
+    df_sorted = df.sort_values(by=x_column)
+
+    start_value = df_sorted[y_column].iloc[0]
+    end_value = df_sorted[y_column].iloc[-1]
+    overall_change_percentage = (
+        ((end_value - start_value) / start_value) * 100
+        if start_value != 0
+        else float('inf')
+    )
+
+    x_indices = np.arange(len(df_sorted))
+    slope, _ = np.polyfit(x_indices, df_sorted[y_column], 1)
+
+    if slope > 0.05 * np.mean(df_sorted[y_column]):
+        trend_summary = 'Strongly Increasing'
+    elif slope < -0.05 * np.mean(df_sorted[y_column]):
+        trend_summary = 'Strongly Decreasing'
+    else:
+        trend_summary = 'Stable/Weak Trend'
+
+    metadata = (
+        'chart_type: line_plot_trend\n'
+        'analysis_method: time_series_trend_analysis\n'
+        f'x_variable: {x_column}\n'
+        f'y_variable: {y_column}\n'
+        f'start_value: {round(start_value, 2)}\n'
+        f'end_value: {round(end_value, 2)}\n'
+        f'overall_change_percentage: {round(overall_change_percentage, 2)}\n'
+        f'trend_summary: {trend_summary}\n'
+        'agent_instruction: Describe the overall direction based on "trend_summary" and quantify the total change using "overall_change_percentage".'
+    )
+
+    graph_id = save_graph_to_db(fig, metadata)
+
+    return {
+        'response': f'Line plot for "{y_column}" over "{x_column}" created successfully.',
+        'graph_id': graph_id,
+        'metadata': metadata,
+    }
+
+
+def create_box_plot(df: pd.DataFrame, y_column: str, x_column: str = None) -> dict:
+    if df is None or df.empty:
+        return 'DataFrame empty, no data to analyse.'
+
+    if y_column not in df.columns:
+        return f'Error: Column "{y_column}" not found in the dataset.'
+    if not pd.api.types.is_numeric_dtype(df[y_column]):
+        return f'Error: Column "{y_column}" must be numeric for a box plot.'
+
+    stats = df[y_column].describe()
+    metadata = (
+        f"Graph Type: Box Plot for the '{y_column}' column.\n"
+        f'Visualizes the distribution and identifies outliers.\n'
+        f'Key statistics: Mean={stats.get("mean", "N/A"):.2f}, '
+        f'Q1={stats.get("25%", "N/A"):.2f}, Median={stats.get("50%", "N/A"):.2f}, '
+        f'Q3={stats.get("75%", "N/A"):.2f}, Max={stats.get("max", "N/A"):.2f}, '
+        f'Min={stats.get("min", "N/A"):.2f}.'
+    )
+
+    title = f'Box Plot for {y_column}'
+    if x_column:
+        if x_column not in df.columns:
+            return f'Error: Grouping column "{x_column}" not found in the dataset.'
+        title += f' grouped by {x_column}'
+        metadata += (
+            f" Optionally grouped by the categorical column '{x_column}' on the X-axis."
+        )
+
+    fig = px.box(df, y=y_column, x=x_column, title=title)
+
+    graph_id = save_graph_to_db(fig, metadata)
+
+    return {
+        'response': f'Box plot for "{y_column}" created successfully.',
+        'graph_id': graph_id,
+        'metadata': metadata,
+    }
+
+
+def create_correlation_heatmap(df: pd.DataFrame) -> dict:
+    if df is None or df.empty:
+        return 'DataFrame empty, no data to analyse.'
+
+    numeric_df = df.select_dtypes(include='number')
+
+    if numeric_df.shape[1] < 2:
+        return 'Error: At least two numeric columns are required to create a correlation heatmap.'
+
+    corr_matrix = numeric_df.corr()
+    fig = px.imshow(corr_matrix, text_auto=True, title='Correlation Heatmap')
+
+    corr_unstacked = corr_matrix.abs().unstack()
+    corr_sorted = corr_unstacked.sort_values(kind='quicksort', ascending=False)
+    unique_pairs = corr_sorted[corr_sorted < 1.0]
+    unique_pairs = unique_pairs[~unique_pairs.index.duplicated()].head(5)
+
+    top_correlations = []
+    for (var1, var2), abs_corr in unique_pairs.items():
+        original_corr = corr_matrix.loc[var1, var2]
+        top_correlations.append(
+            {
+                'variable_1': var1,
+                'variable_2': var2,
+                'correlation_value': round(original_corr, 4),
+                'strength': 'Strong'
+                if abs_corr >= 0.7
+                else ('Moderate' if abs_corr >= 0.3 else 'Weak'),
+                'direction': 'Positive' if original_corr > 0 else 'Negative',
+            }
+        )
+
+    metadata = (
+        'chart_type: correlation_heatmap\n'
+        'analysis_method: bivariate_correlation_analysis\n'
+        'plot_purpose: Visualization of Linear Relationships between all Numeric Variables'
+        'metric_calculated: Pearson Correlation Coefficient (r)\n'
+        f'variable_scope: {numeric_df.columns.tolist()}\n'
+        'interpretation_key: Values near +1 indicate strong positive correlation (ambas variáveis aumentam juntas); Values near -1 indicate strong negative correlation (uma variável aumenta, a outra diminui); Values near 0 indicate no linear relationship.'
+        f'top_correlation_pairs: {top_correlations}\n'
+        'agent_instruction: Describe the relationship between the strongest pairs listed in "top_correlation_pairs".'
+    )
+    graph_id = save_graph_to_db(fig, metadata)
+
+    return {
+        'response': 'Correlation heatmap created successfully.',
+        'graph_id': graph_id,
+        'metadata': metadata,
+    }
+
+
+def _select_n_clusters(sample: np.ndarray) -> tuple[int, dict[int, float]]:
+    """Escolhe o número de clusters pelo maior coeficiente de silhueta na amostra."""
+    scores = {}
+
+    for n_clusters in range(2, min(CLUSTER_MAX_AUTO_K, len(sample) - 1) + 1):
+        labels = KMeans(n_clusters=n_clusters, random_state=42, n_init=3).fit_predict(
+            sample
+        )
+
+        if len(np.unique(labels)) > 1:
+            scores[n_clusters] = round(float(silhouette_score(sample, labels)), 4)
+
+    if not scores:
+        return 1, scores
+
+    return max(scores, key=scores.get), scores
+
+
+def _stratified_sample(labels: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Seleciona os pontos do gráfico proporcionalmente a cada cluster, com um mínimo por cluster para que grupos pequenos continuem visíveis."""
+    if len(labels) <= CLUSTER_PLOT_MAX_POINTS:
+        return np.arange(len(labels))
+
+    indices = []
+
+    for cluster, count in enumerate(np.bincount(labels)):
+        if not count:
+            continue
+
+        n_points = min(
+            count,
+            max(
+                CLUSTER_PLOT_MIN_POINTS,
+                round(CLUSTER_PLOT_MAX_POINTS * count / len(labels)),
+            ),
+        )
+        indices.append(
+            rng.choice(np.flatnonzero(labels == cluster), n_points, replace=False)
+        )
+
+    return np.sort(np.concatenate(indices))
+
+
+def _fit_clusters(
+    cluster_data: pd.DataFrame,
+    n_clusters: int | None,
+    scale_features: bool,
+    rng: np.random.Generator,
+) -> tuple[np.ndarray, int, dict[int, float] | None, dict]:
+    """Ajusta o K-Means e retorna o cluster de todas as linhas.
+
+    Em grandes volumes o modelo é ajustado com o MiniBatchKMeans em uma amostra e aplicado a todas as linhas em blocos, sem copiar os dados inteiros para o modelo.
+
+    Returns:
+        tuple: Clusters das linhas, número de clusters usado, silhueta por número de clusters (se escolhido automaticamente) e informações do ajuste.
+    """
+    start = perf_counter()
+    total_points = len(cluster_data)
+    is_sampled = total_points > CLUSTER_FULL_FIT_ROWS
+
+    if is_sampled:
+        fit_rows = rng.choice(total_points, CLUSTER_FIT_SAMPLE_ROWS, replace=False)
+        fit_values = cluster_data.iloc[fit_rows].to_numpy(dtype=float)
+    else:
+        fit_values = cluster_data.to_numpy(dtype=float)
+
+    scaler = StandardScaler().fit(fit_values) if scale_features else None
+
+    if scaler is not None:
+        fit_values = scaler.transform(fit_values)
+
+    silhouette_scores = None
+
+    if n_clusters is None:
+        sample_rows = rng.choice(
+            len(fit_values),
+            min(CLUSTER_SILHOUETTE_SAMPLE_ROWS, len(fit_values)),
+            replace=False,
+        )
+        n_clusters, silhouette_scores = _select_n_clusters(fit_values[sample_rows])
+
+    if is_sampled:
+        model = MiniBatchKMeans(
+            n_clusters=n_clusters, random_state=42, n_init=3, batch_size=4096
+        ).fit(fit_values)
+        fit_seconds = perf_counter() - start
+        chunks = []
+
+        for chunk_start in range(0, total_points, CLUSTER_PREDICT_CHUNK_ROWS):
+            chunk = cluster_data.iloc[
+                chunk_start : chunk_start + CLUSTER_PREDICT_CHUNK_ROWS
+            ].to_numpy(dtype=float)
+            chunks.append(
+                model.predict(scaler.transform(chunk) if scaler is not None else chunk)
+            )
+
+        labels = np.concatenate(chunks)
+    else:
+        model = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+        labels = model.fit_predict(fit_values)
+        fit_seconds = perf_counter() - start
+
+    fit_info = {
+        'fit_method': 'MiniBatchKMeans' if is_sampled else 'KMeans',
+        'fit_rows': len(fit_values),
+        'fit_seconds': round(fit_seconds, 3),
+    }
+
+    return labels, n_clusters, silhouette_scores, fit_info
+
+
+def find_clusters_and_plot(
+    df: pd.DataFrame,
+    x_column: str,
+    y_column: str,
+    n_clusters: int | None = None,
+    scale_features: bool = False,
+) -> dict:
+    if df is None or df.empty:
+        return 'DataFrame empty, no data to analyse.'
+
+    if x_column not in df.columns or y_column not in df.columns:
+        return 'Error: One or both columns not found in the dataset.'
+
+    if not pd.api.types.is_numeric_dtype(
+        df[x_column]
+    ) or not pd.api.types.is_numeric_dtype(df[y_column]):
+        return f'Error: Columns "{x_column}" and "{y_column}" must be numeric for clustering.'
+
+    if n_clusters is not None and n_clusters <= 0:
+        return f'Error: Non-positive clusters value received! n_clusters: {n_clusters}'
+
+    cluster_data = df[[x_column, y_column]].dropna()
+    total_points = len(cluster_data)
+
+    if total_points < 2:
+        return f'Error: At least 2 rows with values in both columns are required for clustering (found {total_points}).'
+
+    if n_clusters is not None and n_clusters > total_points:
+        return f'Error: n_clusters ({n_clusters}) is greater than the number of rows with values in both columns ({total_points}).'
+
+    rng = np.random.default_rng(42)
+    _start_memory_tracing()
+    start = perf_counter()
+
+    try:
+        labels, n_clusters, silhouette_scores, performance = _fit_clusters(
+            cluster_data, n_clusters, scale_features, rng
+        )
+        elapsed = perf_counter() - start
+    finally:
+        peak_memory_mb = _stop_memory_tracing()
+
+    cluster_summary = (
+        cluster_data.groupby(labels.astype(str))[[x_column, y_column]]
+        .agg(['mean', 'std', 'size'])
+        .rename_axis('cluster')
+        .reset_index()
+    )
+
+    cluster_summary.columns = [
+        '_'.join(filter(None, col)) if isinstance(col, tuple) else col
+        for col in cluster_summary.columns
+    ]
+
+    size_col_name = f'{x_column}_size'
+    cluster_summary.rename(columns={size_col_name: 'cluster_size'}, inplace=True)
+    cluster_summary.drop(columns=f'{y_column}_size', inplace=True, errors='ignore')
+
+    cluster_summary['cluster_percentage'] = (
+        cluster_summary['cluster_size'] / total_points
+    ) * 100
+
+    plot_rows = _stratified_sample(labels, rng)
+    plot_data = cluster_data.iloc[plot_rows].assign(
+        cluster=labels[plot_rows].astype(str)
+    )
+
+    fig = px.scatter(
+        plot_data,
+        x=x_column,
+        y=y_column,
+        color='cluster',
+        title=f'Clusters in {x_column} vs {y_column}',
+        category_orders={'cluster': sorted(plot_data['cluster'].unique(), key=int)},
+    )
+
+    performance.update(
+        total_seconds=round(elapsed, 3),
+        peak_memory_mb=round(peak_memory_mb, 1),
+        plotted_points=len(plot_rows),
+    )
+
+    metadata = (
+        'chart_type: scatter_plot_with_clusters\n'
+        'analysis_method: clustering_kmeans_result\n'
+        f'plot_purpose: Visualização da Segmentação de Dados ({n_clusters} clusters) baseada em {x_column} e {y_column}\n'
+        f'x_axis_variable: {x_column}\n'
+        f'y_axis_variable: {y_column}\n'
+        f'number_of_clusters: {n_clusters}\n'
+        f'total_data_points: {total_points}\n'
+        f'feature_scaling: {"standard" if scale_features else "none"}\n'
+        f'fit_method: {performance["fit_method"]} fitted on {performance["fit_rows"]} rows\n'
+    )
+
+    if silhouette_scores is not None:
+        metadata += (
+            f'k_selection: silhouette score by number of clusters {silhouette_scores}\n'
+        )
+
+    if len(plot_rows) < total_points:
+        metadata += (
+            f'plotted_points: {len(plot_rows)} (stratified sample per cluster)\n'
+        )
+
+    metadata += (
+        'interpretation_guide O agente deve usar as "Cluster Summaries" para descrever a localização, a característica central e a importância relativa (tamanho/porcentagem) de cada grupo no plano X-Y ao usuário.\n'
+        f'cluster_summaries:\n {cluster_summary}'
+    )
+
+    graph_id = save_graph_to_db(fig, metadata)
+
+    return {
+        'response': f'Cluster plot for "{x_column}" vs "{y_column}" with {n_clusters} clusters created successfully in {elapsed:.2f}s (peak memory {peak_memory_mb:.1f} MB). 📊',
+        'graph_id': graph_id,
+        'metadata': metadata,
+        'performance': performance,
+    }
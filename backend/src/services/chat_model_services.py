@@ -1,13 +1,15 @@
 """Serviço para instanciação do agente supervisor e funções de chat."""
 
 import asyncio
-import json
+import copy
 import re
 from collections import defaultdict
-from time import time
+from functools import lru_cache, partial
+from time import perf_counter, time
 
 import mistune
 from langchain.output_parsers import PydanticOutputParser
+from langchain_core.messages import AIMessage, HumanMessage
 from pydantic import BaseModel
 from pydantic_core import ValidationError
 
@@ -23,12 +25,43 @@ from src.agents import (
 from src.controllers.websocket_controller import manager
 from src.data import MODELS, TASK_PREDEFINED_MODELS, ModelTask, StatusUpdate
 from src.schemas import JSONOutputModel
+from src.services.conversation_services import StoreChatMessageHistory
+from src.services.data_processing_services import session_manager
+from src.services.llm_client_services import llm_client_pool
+from src.services.metrics_services import LLMUsageCallback, metrics
+from src.services.response_cache_services import response_cache
+from src.services.tool_output_services import tool_output_governor
 from src.utils.exceptions import (
     APIKeyNotFoundException,
     InvalidEmailTypeException,
     ModelNotFoundException,
     ModelResponseValidationException,
 )
+from src.utils.json_repair import recover_json, strip_wrappers
+
+# Tarefas com agentes mantidos na sessão
+AGENT_TASKS = (
+    ModelTask.SUPERVISE,
+    ModelTask.DATA_ANALYSIS,
+    ModelTask.DATA_TREATMENT,
+    ModelTask.REPORT_GENERATION,
+    ModelTask.INVOICE_VALIDATION,
+)
+# Chave do OutputGuard mantido na sessão, descartado junto dos agentes
+OUTPUT_GUARD_KEY = 'output_guard'
+# Ferramentas do Supervisor sem efeitos colaterais e sem dependência do horário, respostas podem ser reaproveitadas
+CACHEABLE_TOOLS = frozenset({'data_analyst', 'tax_specialist'})
+# Ferramentas que podem armazenar novos documentos no Vector Store da sessão
+DATA_CHANGING_TOOLS = frozenset({'data_engineer'})
+
+
+@lru_cache(maxsize=None)
+def _get_format_instructions(output_schema: type[BaseModel]) -> str:
+    return PydanticOutputParser(pydantic_object=output_schema).get_format_instructions()
+
+
+# Instruções do esquema de resposta do Supervisor geradas na importação, fora do caminho das requisições
+_get_format_instructions(JSONOutputModel)
 
 
 class Chat:
@@ -39,6 +72,8 @@ class Chat:
     def __init__(self):
         self.active_sessions: dict[str, dict[str, BaseAgent | str]] = defaultdict(dict)
         self.agents_timestamp: dict[str, float] = {}
+        # Evita que chamadas simultâneas instanciem o mesmo agente duas vezes na sessão
+        self.session_locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
 
     def _get_session(self, session_id: str) -> dict[str, BaseAgent | str] | None:
         return self.active_sessions[session_id]
@@ -47,10 +82,14 @@ class Chat:
         current_session = self._get_session(session_id)
 
         if current_session:
-            # Limpeza de collections e conexões do agente de dados
+            # Limpeza de collections e conexões do agente de dados, se instanciado na sessão
             try:
-                agent: DataEngineerAgent = current_session[ModelTask.DATA_TREATMENT]
-                await agent.cleanup()
+                agent: DataEngineerAgent | None = current_session.get(
+                    ModelTask.DATA_TREATMENT
+                )
+
+                if agent:
+                    await agent.cleanup()
             except Exception as exc:
                 print(
                     f'Failed to cleanup Qdrant collection in session: {session_id}\nError: {exc}'
@@ -58,7 +97,81 @@ class Chat:
 
             del self.active_sessions[session_id]
 
-        del self.agents_timestamp[session_id]
+        # Fecha os clientes HTTP que não são usados por outras sessões
+        await llm_client_pool.release_owner(session_id)
+        tool_output_governor.release_session(session_id)
+        response_cache.release_session(session_id)
+        self.agents_timestamp.pop(session_id, None)
+        self.session_locks.pop(session_id, None)
+
+    async def _build_agent(
+        self,
+        session_id: str,
+        agent_task: str,
+        current_session: dict[str, BaseAgent | str],
+    ) -> BaseAgent | None:
+        """Instancia o agente da tarefa informada, com o seu LLM, prompt e ferramentas."""
+        match agent_task:
+            case ModelTask.DATA_ANALYSIS:
+                return DataAnalystAgent(session_id, current_session=current_session)
+            case ModelTask.DATA_TREATMENT:
+                # Agentes com métodos assíncronos usam métodos de classe para instancia
+                return await DataEngineerAgent.create(
+                    session_id, current_session=current_session
+                )
+            case ModelTask.REPORT_GENERATION:
+                return ReportGenAgent(session_id, current_session=current_session)
+            case ModelTask.INVOICE_VALIDATION:
+                return TaxSpecialistAgent(session_id, current_session=current_session)
+            case ModelTask.SUPERVISE:
+                # O Supervisor recebe um carregador para instanciar os sub-agentes apenas quando usados
+                return SupervisorAgent(
+                    session_id,
+                    current_session=current_session,
+                    agent_loader=partial(self._get_or_create_agent, session_id),
+                )
+
+        return None
+
+    @staticmethod
+    def _check_api_key(current_session: dict[str, BaseAgent | str]) -> None:
+        has_api_key = 'gemini_key' in current_session or 'groq_key' in current_session or 'openai_key' in current_session
+
+        if not has_api_key:
+            raise APIKeyNotFoundException(
+                "Your current session doesn't have an API key, please add an API key before proceeding."
+            )
+
+    @staticmethod
+    def _get_models_key(current_session: dict[str, BaseAgent | str]) -> str:
+        """Identifica os modelos dos agentes da sessão, sem instanciá-los.
+
+        Agentes ainda não instanciados usam o modelo predefinido da tarefa para o provedor escolhido em `BaseAgent._init_default_llm`.
+        """
+        provider = next(
+            (
+                provider
+                for provider, key in (
+                    ('groq', 'groq_key'),
+                    ('google', 'gemini_key'),
+                    ('openai', 'openai_key'),
+                )
+                if current_session.get(key)
+            ),
+            None,
+        )
+        models = []
+
+        for task in AGENT_TASKS:
+            agent = current_session.get(task)
+            model_name = getattr(agent, 'model_name', None)
+
+            if model_name is None and provider:
+                model_name = TASK_PREDEFINED_MODELS[provider].get(task)
+
+            models.append(f'{task}={model_name}')
+
+        return ';'.join(models)
 
     async def _get_or_create_agent(
         self,
@@ -69,6 +182,7 @@ class Chat:
     ) -> BaseAgent:
         """Função para instanciação e inserção de agentes no pool de sessões. Se invocada em uma sessão ativa, retorna o agente ativo ou instancia um novo caso contrário.
 
+        Os agentes são instanciados sob demanda, apenas a tarefa solicitada é criada e mantida na sessão para as próximas chamadas.
         Agentes ativos são mantidos vivos enquanto o Supervisor estiver em uso.
         Os agentes são guardados em um dicionário de sessões no formato:
         `{ session_id: { agent_task: BaseAgent } }`
@@ -76,51 +190,34 @@ class Chat:
         Args:
             session_id (str): Identificador da sessão para instancia do agente.
             agent_task (str, optional): Constante de ModelTask para identificação do agente a ser recuperado. Por padrão, retorna o Supervisor.
-            force_recreate (bool, optional): Se os agentes devem ser instanciados novamente na sessão.
+            force_recreate (bool, optional): Se os agentes da sessão devem ser descartados e instanciados novamente no próximo uso.
 
         Returns:
             agent (BaseAgent): Agente identificado por sessão e tipo de tarefa
         """
 
         current_session = self._get_session(session_id)
+        self._check_api_key(current_session)
 
-        has_api_key = 'gemini_key' in current_session or 'groq_key' in current_session or 'openai_key' in current_session
+        async with self.session_locks[session_id]:
+            if force_recreate:
+                # Os dados do Vector Store são mantidos, apenas as instancias são descartadas
+                for task in AGENT_TASKS:
+                    current_session.pop(task, None)
 
-        if not has_api_key:
-            raise APIKeyNotFoundException(
-                "Your current session doesn't have an API key, please add an API key before proceeding."
-            )
+                current_session.pop(OUTPUT_GUARD_KEY, None)
 
-        no_agent_instance = ModelTask.SUPERVISE not in current_session
+            agent = current_session.get(agent_task)
 
-        if no_agent_instance or force_recreate:
-            # Instanciando todos os agentes que serão utilizados e passando o objeto da sessão
-            current_session[ModelTask.DATA_ANALYSIS] = DataAnalystAgent(
-                session_id,
-                current_session=current_session,
-            )
-            # Agentes com métodos assíncronos usam métodos de classe para instancia
-            current_session[ModelTask.DATA_TREATMENT] = await DataEngineerAgent.create(
-                session_id,
-                current_session=current_session,
-            )
-            current_session[ModelTask.REPORT_GENERATION] = ReportGenAgent(
-                session_id,
-                current_session=current_session,
-            )
-            current_session[ModelTask.INVOICE_VALIDATION] = TaxSpecialistAgent(
-                session_id,
-                current_session=current_session,
-            )
-            # Supervisor por último para receber os agentes anteriores
-            current_session[ModelTask.SUPERVISE] = SupervisorAgent(
-                session_id,
-                current_session=current_session,
-            )
+            if agent is None:
+                agent = await self._build_agent(session_id, agent_task, current_session)
+
+                if agent is not None:
+                    current_session[agent_task] = agent
 
         self.agents_timestamp[session_id] = time()
 
-        return current_session.get(agent_task)
+        return agent
 
     async def get_agent_info(
         self, is_tasks: bool, is_default_models: bool
@@ -144,16 +241,28 @@ class Chat:
 
         return result
 
-    def get_format_instructions(self, output_schema: BaseModel) -> str:
-        """Retorna as instruções para saída do agente com o esquema atual."""
+    def get_format_instructions(self, output_schema: type[BaseModel]) -> str:
+        """Retorna as instruções para saída do agente com o esquema atual, geradas uma única vez por esquema."""
+
+        return _get_format_instructions(output_schema)
+
+    async def _get_output_guard(self, session_id: str) -> OutputGuard:
+        """Retorna o OutputGuard da sessão, instanciado na primeira validação que precisar dele."""
+        current_session = self._get_session(session_id)
 
-        parser = PydanticOutputParser(pydantic_object=output_schema)
-        return parser.get_format_instructions()
+        async with self.session_locks[session_id]:
+            output_guard = current_session.get(OUTPUT_GUARD_KEY)
+
+            if output_guard is None:
+                output_guard = OutputGuard(current_session=current_session)
+                current_session[OUTPUT_GUARD_KEY] = output_guard
+
+        return output_guard
 
     async def validate_agent_output(
         self, session_id: str, response: str, output_schema: BaseModel
-    ):
-        """Valida a resposta do agente com base no esquema recebido, utiliza um agente OutputGuard para validar a resposta (máximo de 3 iterações antes de levantar uma exceção).
+    ) -> tuple[dict, bool]:
+        """Valida a resposta do agente com base no esquema recebido. Erros comuns de formatação são corrigidos sem LLM, apenas respostas irrecuperáveis passam pelo OutputGuard (máximo de 3 iterações antes de levantar uma exceção).
 
         Args:
             session_id (str): Identificador da sessão atual.
@@ -161,48 +270,68 @@ class Chat:
             output_schema (str): Esquema para validar a resposta
         Returns:
             response: dict[str, str]
+            truncated: bool, se a resposta estava truncada e foi fechada pelo reparo (conteúdo possivelmente incompleto)
 
         Raises:
             ModelResponseValidationException: Exceção para tentativas máximas de validação excedidas.
         """
 
-        format_instructions = self.get_format_instructions(output_schema)
-        content = response.strip('`').replace('json', '', 1)
-
-        max_iterations = 3
+        start = perf_counter()
         last_exc = None
+        truncated = False
 
+        # Reparo determinístico (cercas, raciocínio, vírgulas finais e JSON truncado) antes de recorrer ao LLM
         try:
-            response = json.loads(content)
-            JSONOutputModel.model_validate(response)
-
-            return response
-        except (ValidationError, json.JSONDecodeError) as exc:
+            content, truncated = recover_json(response)
+        except ValueError as exc:
             last_exc = exc
-            # Utilizando um agente para correção do erro de validação.
-            current_session = self._get_session(session_id)
-            output_guard = OutputGuard(current_session=current_session)
-
-            for i in range(max_iterations):
-                response = await output_guard.arun(
-                    content,
-                    **{
-                        'format_instructions': format_instructions
-                        + f'\n\nError encountered in response: {last_exc}'
-                    },
+            # Respostas em texto simples são a própria mensagem ao usuário
+            content = (
+                {'response': strip_wrappers(response), 'graph_id': ''}
+                if output_schema is JSONOutputModel
+                else None
+            )
+
+        if truncated:
+            metrics.increment('output_validation.truncated')
+
+        if content is not None:
+            try:
+                output_schema.model_validate(content)
+                metrics.increment('output_validation.deterministic')
+
+                return content, truncated
+            except ValidationError as exc:
+                last_exc = exc
+
+        format_instructions = self.get_format_instructions(output_schema)
+        max_iterations = 3
+
+        # Utilizando um agente para correção do erro de validação, reaproveitado na sessão.
+        output_guard = await self._get_output_guard(session_id)
+
+        for _ in range(max_iterations):
+            metrics.increment('output_guard.invocations')
+
+            try:
+                content = await output_guard.aparse(
+                    response,
+                    output_schema,
+                    format_instructions
+                    + f'\n\nError encountered in response: {last_exc}',
                 )
-                response = response['output'].strip('-`')
+                output_schema.model_validate(content)
+                metrics.observe('output_guard.latency', perf_counter() - start)
 
-                try:
-                    response = json.loads(response)
-                    JSONOutputModel.model_validate(response)
+                return content, truncated
+            except Exception as exc:
+                last_exc = exc
 
-                    return response
-                except Exception as e:
-                    last_exc = e
+        metrics.increment('output_guard.failures')
+        metrics.observe('output_guard.latency', perf_counter() - start)
 
-            # Se após três tentativas não validar, retorna um erro.
-            raise ModelResponseValidationException
+        # Se após três tentativas não validar, retorna um erro.
+        raise ModelResponseValidationException
 
     async def send_prompt(self, session_id: str, user_input: str) -> dict[str, str]:
         """
@@ -216,20 +345,73 @@ class Chat:
             response (dict[str, str]): Dicionário com a resposta do modelo e IDs para gráficos, se gerado.
         """
         await manager.send_status_update(session_id, StatusUpdate.SUPERVISOR_INIT)
-        agent = await self._get_or_create_agent(session_id, ModelTask.SUPERVISE)
+        current_session = self._get_session(session_id)
+        self._check_api_key(current_session)
+
+        # Perguntas equivalentes sobre os mesmos dados e com os mesmos modelos reaproveitam a resposta sem instanciar o Supervisor ou chamar o LLM
+        fingerprint = session_manager.get_fingerprint(session_id)
+        models_key = self._get_models_key(current_session)
+        df = await session_manager.get_df(session_id)
+        cached, query = await response_cache.lookup(
+            session_id,
+            fingerprint,
+            models_key,
+            user_input,
+            columns=() if df is None else df.columns,
+        )
+
+        if cached:
+            # O turno é registrado no histórico para manter o contexto das próximas perguntas
+            await StoreChatMessageHistory(session_id).aadd_messages(
+                [HumanMessage(user_input), AIMessage(cached.output)]
+            )
+            await manager.send_status_update(
+                session_id, StatusUpdate.SUPERVISOR_RESPONSE
+            )
 
+            self.agents_timestamp[session_id] = time()
+
+            return copy.deepcopy(cached.content)
+
+        agent = await self._get_or_create_agent(session_id, ModelTask.SUPERVISE)
         json_output = self.get_format_instructions(JSONOutputModel)
         # Execução do agente
         await manager.send_status_update(session_id, StatusUpdate.SUPERVISOR_PROCESS)
 
-        response = await agent.arun(user_input, **{'format_instructions': json_output})
+        # Uso de tokens da requisição, incluindo as chamadas dos sub-agentes
+        usage = LLMUsageCallback()
+        response = await agent.arun(
+            user_input,
+            config={'callbacks': [usage]},
+            **{'format_instructions': json_output},
+        )
+        usage.report(session_id)
 
         # Validação da resposta
-        content = await self.validate_agent_output(
+        content, truncated = await self.validate_agent_output(
             session_id, response['output'], JSONOutputModel
         )
         content['response'] = mistune.html(content['response'])
 
+        tools_used = {
+            action.tool for action, _ in response.get('intermediate_steps', [])
+        }
+
+        if tools_used & DATA_CHANGING_TOOLS:
+            session_manager.mark_documents_changed(session_id)
+
+        # Respostas sem sub-agentes dependem do histórico da conversa (ex.: "e para SP?") e não são reaproveitadas,
+        # assim como respostas truncadas, que podem estar incompletas
+        if not truncated and tools_used and tools_used <= CACHEABLE_TOOLS:
+            await response_cache.store(
+                session_id,
+                fingerprint,
+                models_key,
+                query,
+                response['output'],
+                content,
+            )
+
         await manager.send_status_update(session_id, StatusUpdate.SUPERVISOR_RESPONSE)
 
         return content
@@ -252,7 +434,10 @@ class Chat:
         await manager.send_status_update(
             session_id, StatusUpdate.DATA_ENGINEER_EXTRACTION
         )
-        response = await data_engineer.arun(user_input)
+        usage = LLMUsageCallback()
+        response = await data_engineer.arun(user_input, config={'callbacks': [usage]})
+        usage.report(session_id)
+        session_manager.mark_documents_changed(session_id)
         await manager.send_status_update(session_id, StatusUpdate.UPLOAD_FINISH)
 
         return {'response': response['output'], 'graph_id': ''}
@@ -352,6 +537,8 @@ class Chat:
                 'Wrong model name received, try again with a valid model.'
             )
 
+        # Clientes compartilhados pela chave, a chave anterior do provedor é liberada
+        await llm_client_pool.acquire(session_id, provider, api_key)
         await self._get_or_create_agent(session_id, force_recreate=True)
 
         return {
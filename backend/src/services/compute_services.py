@@ -0,0 +1,84 @@
+"""Pool de processos de cálculo para as ferramentas de análise, que leem o DataFrame da sessão da memória compartilhada."""
+
+import asyncio
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from src.services.shared_memory_services import (
+    WORKER_FRAME_CACHE,
+    AttachedFrames,
+    SharedFrame,
+    enable_copy_on_write,
+)
+from src.settings import settings
+
+# DataFrames anexados no processo worker
+_attached_frames: AttachedFrames | None = None
+
+
+def _init_compute_worker() -> None:
+    global _attached_frames
+
+    enable_copy_on_write()
+    _attached_frames = AttachedFrames(WORKER_FRAME_CACHE)
+
+
+def _run_on_frame(frame: SharedFrame, func: Callable, args: tuple, kwargs: dict):
+    """Executa a função no worker, recebendo o DataFrame anexado como primeiro argumento."""
+    return func(_attached_frames.get(frame), *args, **kwargs)
+
+
+class ComputePool:
+    """Executa análises do pandas e scikit-learn fora do processo da API, sem disputar o GIL com o loop de eventos.
+
+    Apenas a referência ao segmento de memória compartilhada e os argumentos são enviados a cada chamada, os dados não são serializados.
+    """
+
+    def __init__(self, workers: int | None = None):
+        self.workers = workers or settings.compute_workers
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_compute_worker,
+            )
+
+        return self._pool
+
+    async def run(self, frame: SharedFrame, func: Callable, *args, **kwargs):
+        """Executa `func(df, *args, **kwargs)` em um worker.
+
+        Args:
+            frame (SharedFrame): DataFrame da sessão publicado na memória compartilhada.
+            func (Callable): Função de nível de módulo (serializável), que recebe o DataFrame como primeiro argumento.
+
+        Raises:
+            BrokenProcessPool: Quando um worker é finalizado durante a execução (ex.: por falta de memória), o pool é recriado na próxima chamada.
+
+        Returns:
+            Any: Retorno da função.
+        """
+        loop = asyncio.get_running_loop()
+
+        try:
+            return await loop.run_in_executor(
+                self._get_pool(), partial(_run_on_frame, frame, func, args, kwargs)
+            )
+        except BrokenProcessPool:
+            self.shutdown()
+            raise
+
+    def shutdown(self) -> None:
+        """Finaliza o pool de processos de cálculo, se criado."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+compute_pool = ComputePool()
@@ -0,0 +1,212 @@
+"""Armazenamento do histórico de conversas: buffer circular em memória para sessões ativas, persistido em lotes no SQLite."""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict, deque
+from collections.abc import Sequence
+from time import time
+from uuid import uuid4
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.services.db_services import engine, execute_query
+from src.settings import settings
+
+
+class ConversationStore:
+    """Mantém as últimas mensagens de cada sessão em memória e grava as novas mensagens no banco em lotes.
+
+    Leituras de sessões ativas não acessam o disco, apenas sessões frias (após reinício ou expiração) são carregadas do SQLite.
+    """
+
+    def __init__(self, buffer_size: int | None = None):
+        self.buffer_size = buffer_size or settings.conversation_buffer_size
+        self._buffers: dict[str, deque[BaseMessage]] = {}
+        self._last_access: dict[str, float] = {}
+        self._pending: dict[str, list[BaseMessage]] = defaultdict(list)
+        # Acesso também ocorre a partir de threads (métodos síncronos do LangChain)
+        self._lock = threading.Lock()
+
+    def _load(self, session_id: str) -> deque[BaseMessage]:
+        """Carrega as últimas mensagens da sessão do banco, mantendo-as no buffer."""
+        query = text(
+            'SELECT message FROM chat_messages WHERE session_id = :session_id '
+            'ORDER BY id DESC LIMIT :limit'
+        )
+
+        try:
+            with engine.connect() as conn:
+                rows = conn.execute(
+                    query, {'session_id': session_id, 'limit': self.buffer_size}
+                ).all()
+        except SQLAlchemyError as exc:
+            print(f'\t>> Failed to load chat history for session {session_id}: {exc}')
+            rows = []
+
+        messages = messages_from_dict([json.loads(row[0]) for row in reversed(rows)])
+
+        with self._lock:
+            # Outra chamada pode ter carregado a sessão enquanto a consulta era executada
+            buffer = self._buffers.setdefault(
+                session_id, deque(messages, maxlen=self.buffer_size)
+            )
+            self._last_access[session_id] = time()
+
+        return buffer
+
+    def get_messages_sync(self, session_id: str) -> list[BaseMessage]:
+        buffer = self._buffers.get(session_id)
+
+        if buffer is None:
+            buffer = self._load(session_id)
+
+        self._last_access[session_id] = time()
+
+        return list(buffer)
+
+    async def get_messages(self, session_id: str) -> list[BaseMessage]:
+        """Retorna as mensagens da sessão, a leitura do banco em sessões frias é feita em uma thread."""
+        buffer = self._buffers.get(session_id)
+
+        if buffer is None:
+            buffer = await asyncio.to_thread(self._load, session_id)
+
+        self._last_access[session_id] = time()
+
+        return list(buffer)
+
+    def add_messages(self, session_id: str, messages: Sequence[BaseMessage]) -> None:
+        """Adiciona mensagens ao buffer da sessão e à fila de gravação, sem acessar o disco."""
+        if session_id not in self._buffers:
+            self._load(session_id)
+
+        # Identificadores estáveis permitem que a memória marque até onde o histórico já foi resumido
+        for message in messages:
+            if message.id is None:
+                message.id = uuid4().hex
+
+        with self._lock:
+            self._buffers[session_id].extend(messages)
+            self._pending[session_id].extend(messages)
+            self._last_access[session_id] = time()
+
+    async def aadd_messages(
+        self, session_id: str, messages: Sequence[BaseMessage]
+    ) -> None:
+        """Versão assíncrona de `add_messages`, carregando sessões frias em uma thread."""
+        if session_id not in self._buffers:
+            await asyncio.to_thread(self._load, session_id)
+
+        self.add_messages(session_id, messages)
+
+    def clear(self, session_id: str) -> None:
+        with self._lock:
+            self._buffers[session_id] = deque(maxlen=self.buffer_size)
+            self._pending.pop(session_id, None)
+
+        execute_query(
+            'DELETE FROM chat_messages WHERE session_id = :session_id',
+            {'session_id': session_id},
+            commit=True,
+        )
+
+    def _write_batch(self, batch: dict[str, list[BaseMessage]]) -> None:
+        rows = [
+            {'session_id': session_id, 'message': json.dumps(message)}
+            for session_id, messages in batch.items()
+            for message in messages_to_dict(messages)
+        ]
+
+        execute_query(
+            'INSERT INTO chat_messages (session_id, message) VALUES (:session_id, :message)',
+            rows,
+            commit=True,
+        )
+
+    async def flush(self) -> None:
+        """Grava em uma única transação todas as mensagens pendentes desde o último lote."""
+        with self._lock:
+            if not self._pending:
+                return
+
+            batch, self._pending = self._pending, defaultdict(list)
+
+        try:
+            await asyncio.to_thread(self._write_batch, batch)
+        except SQLAlchemyError as exc:
+            print(f'\t>> Failed to persist chat history batch: {exc}')
+
+            # Mantém as mensagens na fila para a próxima tentativa
+            with self._lock:
+                for session_id, messages in batch.items():
+                    self._pending[session_id][:0] = messages
+
+    def _evict_idle(self, ttl: int) -> None:
+        """Remove da memória sessões sem acesso recente e sem mensagens pendentes, elas continuam no banco."""
+        time_now = time()
+
+        with self._lock:
+            for session_id, last_access in list(self._last_access.items()):
+                if time_now - last_access > ttl and session_id not in self._pending:
+                    self._buffers.pop(session_id, None)
+                    del self._last_access[session_id]
+
+    async def flush_task(self, interval: float | None = None, ttl: int = 1800):
+        """Tarefa em segundo plano que persiste os lotes de mensagens e libera sessões inativas da memória.
+
+        Args:
+            interval (float | None, optional): Intervalo entre gravações, em segundos. Padrão é `settings.conversation_flush_interval`.
+            ttl (int, optional): Tempo sem acesso antes de remover a sessão da memória, em segundos.
+        """
+        interval = interval or settings.conversation_flush_interval
+
+        print(
+            f'\t>> Initializing flush task for chat history. Persisting messages with intervals of {interval}s.'
+        )
+
+        try:
+            while True:
+                await asyncio.sleep(interval)
+
+                try:
+                    await self.flush()
+                    self._evict_idle(ttl)
+                except Exception as exc:
+                    print(f'\t>> Error in chat history flush task: {exc}')
+        finally:
+            # Garante a gravação das últimas mensagens no encerramento da aplicação
+            await self.flush()
+
+
+class StoreChatMessageHistory(BaseChatMessageHistory):
+    """Histórico de mensagens do LangChain apoiado no ConversationStore, com métodos assíncronos nativos."""
+
+    def __init__(self, session_id: str, store: ConversationStore | None = None):
+        self.session_id = session_id
+        self.store = store or conversation_store
+
+    @property
+    def messages(self) -> list[BaseMessage]:
+        return self.store.get_messages_sync(self.session_id)
+
+    async def aget_messages(self) -> list[BaseMessage]:
+        return await self.store.get_messages(self.session_id)
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self.store.add_messages(self.session_id, messages)
+
+    async def aadd_messages(self, messages: Sequence[BaseMessage]) -> None:
+        await self.store.aadd_messages(self.session_id, messages)
+
+    def clear(self) -> None:
+        self.store.clear(self.session_id)
+
+    async def aclear(self) -> None:
+        await asyncio.to_thread(self.store.clear, self.session_id)
+
+
+conversation_store = ConversationStore()
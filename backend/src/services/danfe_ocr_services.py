@@ -0,0 +1,417 @@
+"""Serviço de OCR orientado ao layout do DANFE, reconhecendo cada bloco em paralelo e extraindo campos estruturados."""
+
+import asyncio
+import hashlib
+import re
+import unicodedata
+from io import BytesIO
+
+import pytesseract
+from PIL import Image
+
+from src.services.ocr_services import OCR_LANG, ocr_service, preprocess_image
+
+# Blocos do DANFE na ordem em que aparecem, com a palavra-chave do título e a posição vertical padrão (fração da página)
+ANCHORS = (
+    ('recipient', 'DESTINATARIO', 0.20),
+    ('taxes', 'CALCULO DO IMPOSTO', 0.31),
+    ('transport', 'TRANSPORTADOR', 0.40),
+    ('items', 'DADOS DOS PRODUTOS', 0.49),
+    ('additional', 'DADOS ADICIONAIS', 0.86),
+)
+# Maior lado da imagem usada apenas para localizar os títulos dos blocos
+ANCHOR_MAX_SIDE = 1600
+ANCHOR_MARGIN = 0.005
+
+ANCHOR_CONFIG = '--oem 1 --psm 11'
+BLOCK_CONFIG = '--oem 1 --psm 6'
+TABLE_CONFIG = '--oem 1 --psm 6 -c preserve_interword_spaces=1'
+DIGITS_CONFIG = '--oem 1 --psm 6 -c tessedit_char_whitelist=0123456789'
+VALUE_CONFIG = '--oem 1 --psm 7 -c tessedit_char_whitelist=0123456789.,'
+
+# Rótulos do quadro de cálculo do imposto, variantes de substituição tributária antes das gerais
+TOTAL_LABELS = (
+    ('vBCST', r'BASE DE CALC\w*\.? (?:DO )?ICMS (?:S\.? ?T\.?|SUBST\w*)'),
+    ('vBC', r'BASE DE CALC\w*\.? (?:DO )?ICMS'),
+    ('vST', r'VALOR DO ICMS (?:S\.? ?T\.?|SUBST\w*)'),
+    ('vICMS', r'VALOR DO ICMS'),
+    ('vProdTotal', r'V(?:ALOR|\.) ?TOTAL (?:DOS )?PRODUTOS'),
+    ('vFrete', r'VALOR DO FRETE'),
+    ('vSeg', r'VALOR DO SEGURO'),
+    ('vDesc', r'DESCONTO'),
+    ('vOutro', r'OUTRAS DESPESAS'),
+    ('vIPITotal', r'VALOR (?:TOTAL )?DO IPI'),
+    ('vNF', r'V(?:ALOR|\.) ?TOTAL DA NOTA'),
+)
+
+CNPJ_PATTERN = re.compile(
+    r'\b\d{2}\.?\d{3}\.?\d{3}/?\d{4}-?\d{2}\b|\b\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b'
+)
+DATE_PATTERN = re.compile(r'\b(\d{2})/(\d{2})/(\d{4})\b')
+VALUE_PATTERN = re.compile(r'^\d{1,3}(?:\.?\d{3})*(?:,\d{2,4})?$')
+ITEM_PATTERN = re.compile(
+    r'^(?:(?P<cProd>\S+)\s+)?(?P<xProd>.+?)\s+(?P<NCM>\d{8})\s+(?P<CST>\d{3,4})\s+'
+    r'(?P<CFOP>[1-7]\d{3})\s+(?P<uCom>[A-Za-z]{1,6})\s+(?P<qCom>[\d.,]+)\s+'
+    r'(?P<vUnCom>[\d.,]+)\s+(?P<vProd>[\d.,]+)'
+)
+
+
+def _normalize(text: str) -> str:
+    """Remove acentos e padroniza a caixa para comparar títulos e rótulos do DANFE."""
+    decomposed = unicodedata.normalize('NFKD', text)
+
+    return ''.join(
+        char for char in decomposed if not unicodedata.combining(char)
+    ).upper()
+
+
+def _to_decimal(value: str) -> str | None:
+    """Converte valores no padrão brasileiro (1.234,56) para o padrão do XML (1234.56)."""
+    value = value.strip()
+
+    if not VALUE_PATTERN.match(value):
+        return None
+
+    return value.replace('.', '').replace(',', '.')
+
+
+def _group_lines(data: dict) -> list[dict]:
+    """Agrupa as palavras do `image_to_data` em linhas, ordenadas de cima para baixo."""
+    lines: dict[tuple, dict] = {}
+
+    for index, word in enumerate(data['text']):
+        if not word.strip() or float(data['conf'][index]) < 0:
+            continue
+
+        key = (
+            data['block_num'][index],
+            data['par_num'][index],
+            data['line_num'][index],
+        )
+        left, top = data['left'][index], data['top'][index]
+        line = lines.setdefault(key, {'top': top, 'words': []})
+        line['top'] = min(line['top'], top)
+        line['words'].append(
+            {
+                'text': word.strip(),
+                'left': left,
+                'right': left + data['width'][index],
+                'top': top,
+                'bottom': top + data['height'][index],
+            }
+        )
+
+    for line in lines.values():
+        line['words'].sort(key=lambda word: word['left'])
+        line['text'] = ' '.join(word['text'] for word in line['words'])
+
+    return sorted(lines.values(), key=lambda line: line['top'])
+
+
+def _locate_regions(lines: list[dict], height: int) -> tuple[dict, bool]:
+    """Calcula os limites verticais de cada bloco a partir dos títulos encontrados, usando as posições padrão como fallback."""
+    found = []
+    previous = 0.0
+
+    for _, keyword, _ in ANCHORS:
+        position = next(
+            (
+                line['top'] / height - ANCHOR_MARGIN
+                for line in lines
+                if line['top'] / height > previous
+                and keyword in _normalize(line['text'])
+            ),
+            None,
+        )
+        found.append(position)
+        previous = position if position is not None else previous
+
+    # Títulos não encontrados usam a posição padrão, limitada pelos títulos vizinhos encontrados
+    boundaries = []
+    previous = 0.0
+
+    for index, (name, _, default) in enumerate(ANCHORS):
+        position = found[index]
+
+        if position is None:
+            following = next(
+                (pos for pos in found[index + 1 :] if pos is not None), 1.0
+            )
+            position = min(max(default, previous), following)
+
+        boundaries.append((name, max(position, 0.0)))
+        previous = position
+
+    regions = {}
+    top = 0.0
+
+    for index, (name, bottom) in enumerate(boundaries):
+        region = 'header' if index == 0 else boundaries[index - 1][0]
+        regions[region] = (top, bottom)
+        top = bottom
+
+    regions[boundaries[-1][0]] = (top, 1.0)
+    # O bloco da transportadora é usado apenas como limite dos demais
+    regions.pop('transport', None)
+
+    return regions, None not in found
+
+
+def detect_regions(image_bytes: bytes) -> dict:
+    """Ponto de entrada dos workers: pré-processa a primeira página e recorta os blocos do DANFE.
+
+    Args:
+        image_bytes (bytes): Conteúdo do arquivo de imagem.
+
+    Returns:
+        dict: Recortes em PNG de cada bloco (`regions`) e se o layout foi localizado pelos títulos (`layout`).
+    """
+    with Image.open(BytesIO(image_bytes)) as image:
+        page = preprocess_image(image)
+
+    width, height = page.size
+    scale = min(1.0, ANCHOR_MAX_SIDE / max(page.size))
+    small = (
+        page.resize((round(width * scale), round(height * scale)))
+        if scale < 1
+        else page
+    )
+
+    data = pytesseract.image_to_data(
+        small,
+        lang=OCR_LANG,
+        config=ANCHOR_CONFIG,
+        output_type=pytesseract.Output.DICT,
+    )
+    bounds, found_all = _locate_regions(_group_lines(data), small.height)
+
+    regions = {}
+    for name, (top, bottom) in bounds.items():
+        buffer = BytesIO()
+        page.crop((0, round(top * height), width, round(bottom * height))).save(
+            buffer, format='PNG'
+        )
+        regions[name] = buffer.getvalue()
+
+    return {'regions': regions, 'layout': 'anchors' if found_all else 'fallback'}
+
+
+def _label_spans(line: dict) -> list[tuple[str, int, int]]:
+    """Localiza os rótulos de totais em uma linha, retornando o campo e o intervalo horizontal do rótulo."""
+    normalized = [_normalize(word['text']) for word in line['words']]
+    starts, offset = [], 0
+
+    for word in normalized:
+        starts.append(offset)
+        offset += len(word) + 1
+
+    text = ' '.join(normalized)
+    taken: list[tuple[int, int]] = []
+    spans = []
+
+    for field, pattern in TOTAL_LABELS:
+        for match in re.finditer(pattern, text):
+            if any(match.start() < end and start < match.end() for start, end in taken):
+                continue
+
+            taken.append(match.span())
+            words = [
+                line['words'][index]
+                for index, start in enumerate(starts)
+                if start < match.end()
+                and start + len(normalized[index]) > match.start()
+            ]
+            spans.append(
+                (field, min(w['left'] for w in words), max(w['right'] for w in words))
+            )
+
+    return spans
+
+
+def _read_totals(image: Image.Image) -> tuple[dict[str, str], str]:
+    """Associa cada rótulo do quadro de impostos ao valor logo abaixo e relê o valor com whitelist de dígitos."""
+    data = pytesseract.image_to_data(
+        image, lang=OCR_LANG, config=BLOCK_CONFIG, output_type=pytesseract.Output.DICT
+    )
+    lines = _group_lines(data)
+    values = {}
+
+    for index, line in enumerate(lines):
+        spans = _label_spans(line)
+
+        if not spans:
+            continue
+
+        # Valores ficam na primeira linha abaixo com números
+        value_words = next(
+            (
+                [w for w in below['words'] if _to_decimal(w['text'])]
+                for below in lines[index + 1 :]
+                if any(_to_decimal(w['text']) for w in below['words'])
+            ),
+            [],
+        )
+
+        for field, left, right in spans:
+            center = (left + right) / 2
+            candidates = [
+                w
+                for w in value_words
+                if left - 20 <= (w['left'] + w['right']) / 2 <= right + 20
+            ]
+
+            if not candidates or field in values:
+                continue
+
+            word = min(
+                candidates, key=lambda w: abs((w['left'] + w['right']) / 2 - center)
+            )
+            crop = image.crop(
+                (
+                    word['left'] - 4,
+                    word['top'] - 4,
+                    word['right'] + 4,
+                    word['bottom'] + 4,
+                )
+            )
+            digits = pytesseract.image_to_string(crop, config=VALUE_CONFIG).strip()
+
+            values[field] = _to_decimal(digits) or _to_decimal(word['text'])
+
+    return values, '\n'.join(line['text'] for line in lines)
+
+
+def ocr_region(name: str, region_bytes: bytes) -> dict:
+    """Ponto de entrada dos workers: reconhece um bloco do DANFE com a segmentação adequada ao seu conteúdo.
+
+    Args:
+        name (str): Nome do bloco ('header', 'recipient', 'taxes', 'items' ou 'additional').
+        region_bytes (bytes): Recorte do bloco em PNG.
+
+    Returns:
+        dict: Texto do bloco (`text`), valores do quadro de impostos (`values`) e a leitura apenas de dígitos do cabeçalho (`digits`).
+    """
+    with Image.open(BytesIO(region_bytes)) as image:
+        image.load()
+
+    if name == 'taxes':
+        values, text = _read_totals(image)
+
+        return {'text': text, 'values': values}
+
+    config = TABLE_CONFIG if name == 'items' else BLOCK_CONFIG
+    result = {'text': pytesseract.image_to_string(image, lang=OCR_LANG, config=config)}
+
+    if name == 'header':
+        # A chave de acesso é lida novamente apenas com dígitos para evitar trocas como O/0 e l/1
+        result['digits'] = pytesseract.image_to_string(image, config=DIGITS_CONFIG)
+
+    return result
+
+
+def _only_digits(value: str) -> str:
+    return re.sub(r'\D', '', value)
+
+
+def _line_after(text: str, label: str) -> str | None:
+    """Retorna o conteúdo após um rótulo, na mesma linha ou na próxima linha não vazia."""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+
+    for index, line in enumerate(lines):
+        normalized = _normalize(line)
+
+        if label in normalized:
+            rest = line[normalized.index(label) + len(label) :].strip(' :-')
+
+            if rest:
+                return rest
+            if index + 1 < len(lines):
+                return lines[index + 1]
+
+    return None
+
+
+def _parse_items(text: str) -> list[dict[str, str]]:
+    """Extrai os itens do quadro de produtos, linhas fora do padrão de colunas do DANFE são ignoradas."""
+    items = []
+
+    for line in text.splitlines():
+        match = ITEM_PATTERN.match(re.sub(r'\s{2,}', ' ', line.strip()))
+
+        if not match:
+            continue
+
+        item = match.groupdict()
+        for field in ('qCom', 'vUnCom', 'vProd'):
+            item[field] = _to_decimal(item[field]) or item[field]
+
+        items.append({key: value for key, value in item.items() if value})
+
+    return items
+
+
+def build_fields(regions: dict[str, dict]) -> dict:
+    """Monta os campos estruturados do DANFE com os mesmos nomes usados na leitura de XMLs de NF-e."""
+    header = regions.get('header', {})
+    recipient_text = regions.get('recipient', {}).get('text', '')
+    header_text = header.get('text', '')
+
+    access_key = re.search(
+        r'\d{44}', _only_digits(header.get('digits', ''))
+    ) or re.search(r'\d{44}', re.sub(r'(?<=\d)\s+(?=\d)', '', header_text))
+    issuer = CNPJ_PATTERN.search(header_text)
+    recipient = CNPJ_PATTERN.search(recipient_text)
+    issue_date = DATE_PATTERN.search(recipient_text)
+
+    fields = {
+        'document_type': 'NF-e',
+        'chNFe': access_key.group() if access_key else None,
+        'CNPJ_Emitente': _only_digits(issuer.group()) if issuer else None,
+        'CNPJ_Destinatario': _only_digits(recipient.group()) if recipient else None,
+        'dhEmi': '-'.join(reversed(issue_date.groups())) if issue_date else None,
+        'natOp': _line_after(header_text, 'NATUREZA DA OPERACAO'),
+        **regions.get('taxes', {}).get('values', {}),
+    }
+
+    return {key: value for key, value in fields.items() if value}
+
+
+class DanfeOCRService:
+    """Lê imagens de DANFE por blocos: localiza o layout, reconhece os blocos em paralelo no pool de OCR e extrai os campos."""
+
+    async def _extract(self, image_bytes: bytes) -> dict:
+        layout = await ocr_service.submit(detect_regions, image_bytes)
+        names = list(layout['regions'])
+
+        results = await asyncio.gather(
+            *(
+                ocr_service.submit(ocr_region, name, layout['regions'][name])
+                for name in names
+            )
+        )
+        regions = dict(zip(names, results))
+
+        return {
+            'layout': layout['layout'],
+            'fields': build_fields(regions),
+            'items': _parse_items(regions.get('items', {}).get('text', '')),
+            'regions': {
+                name: result['text'].strip() for name, result in regions.items()
+            },
+        }
+
+    async def extract(self, image_bytes: bytes) -> dict:
+        """Extrai os campos estruturados de uma imagem de DANFE, reaproveitando o cache do serviço de OCR.
+
+        Args:
+            image_bytes (bytes): Conteúdo do arquivo de imagem.
+
+        Returns:
+            dict: Campos do documento (`fields`), itens reconhecidos (`items`), texto de cada bloco (`regions`) e como o layout foi localizado (`layout`).
+        """
+        key = 'danfe:' + hashlib.sha256(image_bytes).hexdigest()
+
+        return await ocr_service.run_cached(key, lambda: self._extract(image_bytes))
+
+
+danfe_ocr_service = DanfeOCRService()
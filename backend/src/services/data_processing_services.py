@@ -1,17 +1,31 @@
 """Serviço para processamento de dados recebidos via upload."""
 
 import asyncio
+import hashlib
+import json
 import zipfile
 from io import BytesIO
+from pathlib import Path
 from time import time
+from uuid import uuid4
 
 import pandas as pd
-import pytesseract
 from fastapi import UploadFile
-from PIL import Image
 
 from src.controllers.websocket_controller import manager
 from src.data import StatusUpdate
+from src.services.danfe_ocr_services import danfe_ocr_service
+from src.services.file_reader_services import (
+    SUPPORTED_EXTENSIONS,
+    get_ingestion_pool,
+    parse_archive_member,
+    read_file,
+)
+from src.services.ocr_services import ocr_service
+from src.services.shared_memory_services import SharedFrame, shared_frames
+from src.services.upload_services import ChunkedUpload, upload_manager
+from src.settings import settings
+from src.tools.data_extraction_tool import DataExtractionTools
 from src.utils.exceptions import MaxFileSizeException, WrongFileTypeError
 
 
@@ -20,6 +34,46 @@ class SessionManager:
 
     def __init__(self):
         self.dataframes: dict[str, dict[str, pd.DataFrame | int]] = {}
+        # Contador de inserções no Vector Store por sessão, parte da identidade dos dados
+        self.document_versions: dict[str, int] = {}
+        # Resultado da última auditoria fiscal do DataFrame de cada sessão
+        self.audits: dict[str, dict] = {}
+
+    @staticmethod
+    def _hash_df(df: pd.DataFrame) -> str:
+        """Gera o hash do conteúdo do DataFrame (colunas, tipos e valores), igual para arquivos reenviados."""
+        digest = hashlib.sha256()
+        digest.update(repr((list(df.columns), df.dtypes.astype(str).tolist())).encode())
+
+        try:
+            digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+        except TypeError:
+            # Colunas com valores não hasheáveis (listas, dicionários), o DataFrame é tratado como novo
+            digest.update(uuid4().bytes)
+
+        return digest.hexdigest()
+
+    def get_fingerprint(self, session_id: str) -> str:
+        """Retorna a identidade dos dados da sessão, alterada a cada novo DataFrame ou documento armazenado.
+
+        Args:
+            session_id (str): Identificador da sessão atual.
+
+        Returns:
+            str: Hash do DataFrame ativo combinado com a versão dos documentos da sessão.
+        """
+        dataframe = self.dataframes.get(session_id) or {}
+
+        return (
+            f'{dataframe.get("fingerprint", "no-data")}:'
+            f'{self.document_versions.get(session_id, 0)}'
+        )
+
+    def mark_documents_changed(self, session_id: str) -> None:
+        """Registra uma alteração nos documentos da sessão armazenados no Vector Store."""
+        self.document_versions[session_id] = (
+            self.document_versions.get(session_id, 0) + 1
+        )
 
     async def get_df(self, session_id: str) -> pd.DataFrame | None:
         """Recupera um DataFrame do Pandas na sessão atual.
@@ -47,7 +101,58 @@ class SessionManager:
             df (pd.DataFrame): DataFrame para inserção na sessão.
         """
 
-        self.dataframes[session_id] = {'df': df, 'timestamp': time()}
+        fingerprint = await asyncio.to_thread(self._hash_df, df)
+
+        # Publicado uma única vez para os workers de cálculo e de execução de código
+        try:
+            frame = await asyncio.to_thread(
+                shared_frames.publish, session_id, fingerprint, df
+            )
+        except OSError as exc:
+            print(f'\t>> Failed to publish the DataFrame to shared memory: {exc}')
+            shared_frames.release(session_id)
+            frame = None
+
+        self.dataframes[session_id] = {
+            'df': df,
+            'timestamp': time(),
+            'fingerprint': fingerprint,
+            'frame': frame,
+        }
+
+    def get_shared_frame(self, session_id: str) -> SharedFrame | None:
+        """Recupera a referência ao DataFrame da sessão publicado na memória compartilhada.
+
+        Args:
+            session_id (str): Identificador da sessão atual.
+
+        Returns:
+            SharedFrame | None: Referência enviada aos workers, None sem DataFrame ou quando a publicação falhou.
+        """
+        dataframe = self.dataframes.get(session_id)
+
+        if dataframe:
+            dataframe['timestamp'] = time()
+
+            return dataframe.get('frame')
+
+        return None
+
+    def insert_audit(self, session_id: str, audit: dict) -> None:
+        """Armazena o resultado da auditoria fiscal da sessão, vinculado à identidade dos dados auditados.
+
+        Args:
+            session_id (str): Identificador da sessão atual.
+            audit (dict): Resumo, linhas sinalizadas e notas com total divergente.
+        """
+        self.audits[session_id] = {
+            **audit,
+            'fingerprint': self.get_fingerprint(session_id),
+        }
+
+    def get_audit(self, session_id: str) -> dict | None:
+        """Recupera o resultado da última auditoria fiscal da sessão, se existir."""
+        return self.audits.get(session_id)
 
     async def cleanup_task(self, interval: int = 300, ttl: int = 600):
         """Função de limpeza para dados, removendo DataFrames não mais utilizados.
@@ -77,6 +182,8 @@ class SessionManager:
 
                     for session_id in delete_list:
                         del self.dataframes[session_id]
+                        self.audits.pop(session_id, None)
+                        shared_frames.release(session_id)
                     else:
                         delete_list = []
 
@@ -103,8 +210,10 @@ class DataHandler:
         self,
         session_id: str,
         data: UploadFile,
-        separator: str = ',',
+        separator: str | None = None,
         header: int = 0,
+        sheet_name: str | None = None,
+        columns: list[str] | None = None,
     ) -> dict[str, str]:
         """
         Carrega dados de um arquivo enviado (XLSX, CSV ou ZIP contendo um CSV)
@@ -112,8 +221,10 @@ class DataHandler:
 
         Args:
             data (UploadFile): Arquivo a ser lido.
-            separator (str, optional): Separador do CSV. Padrão é ','.
+            separator (str | None, optional): Separador do CSV. Padrão é None, detectado a partir do conteúdo.
             header (int, optional): Linha dos cabeçalhos. Padrão é 0.
+            sheet_name (str | None, optional): Nome ou índice da aba em planilhas. Padrão é a primeira aba.
+            columns (list[str] | None, optional): Colunas a serem carregadas, as demais são descartadas na leitura.
 
         Raises:
             WrongFileTypeError: Quando o tipo de arquivo recebido não é suportado.
@@ -132,10 +243,67 @@ class DataHandler:
             )
 
         file = await data.read()
-        file_bytes = BytesIO(file)
 
-        match data.content_type:
-            case 'application/zip':
+        return await self._process_source(
+            session_id,
+            BytesIO(file),
+            data.filename,
+            data.content_type,
+            separator=separator,
+            header=header,
+            sheet_name=sheet_name,
+            columns=columns,
+        )
+
+    async def load_chunked_upload(self, upload: ChunkedUpload) -> dict[str, str]:
+        """Lê um arquivo recebido em partes diretamente do disco, sem carregá-lo inteiro em memória.
+
+        CSVs são lidos do caminho pelo engine configurado, XMLs em streaming (iterparse) e ZIPs descompactados membro a membro.
+
+        Args:
+            upload (ChunkedUpload): Upload finalizado, com o caminho do arquivo e as opções de leitura.
+
+        Returns:
+            dict[str, str]: Mesmo retorno de `load_data`.
+        """
+        await manager.send_status_update(upload.session_id, StatusUpdate.UPLOAD_INIT)
+
+        try:
+            return await self._process_source(
+                upload.session_id,
+                upload.path,
+                upload.filename,
+                upload.content_type,
+                **upload.read_options,
+            )
+        finally:
+            await upload_manager.discard(upload)
+
+    async def _process_source(
+        self,
+        session_id: str,
+        source: BytesIO | Path,
+        filename: str,
+        content_type: str,
+        **read_options,
+    ) -> dict[str, str]:
+        """Identifica o tipo do arquivo, realiza a leitura e injeta o resultado na sessão atual.
+
+        Args:
+            session_id (str): Identificador da sessão atual.
+            source (BytesIO | Path): Arquivo em memória ou caminho no disco.
+            filename (str): Nome do arquivo enviado.
+            content_type (str): Tipo MIME do arquivo.
+            read_options (dict): Opções de leitura (separador, cabeçalho, aba e colunas).
+
+        Raises:
+            WrongFileTypeError: Quando o tipo de arquivo recebido não é suportado.
+
+        Returns:
+            dict[str, str]: Pré-visualização do DataFrame, resumo dos documentos fiscais ou o XML para o agente.
+        """
+        match content_type:
+            case 'application/zip' | 'application/x-zip-compressed':
                 await manager.send_status_update(session_id, StatusUpdate.UPLOAD_ZIP)
                 func = self._load_zip
             case 'text/csv':
@@ -148,25 +316,25 @@ class DataHandler:
                 await manager.send_status_update(session_id, StatusUpdate.UPLOAD_XLSX)
                 func = self._read_file
             case 'application/xml' | 'text/xml':
-                # XML deve ser processado por agente para flexibilidade
+                # NF-e e CT-e são lidos diretamente, outros XMLs são processados por agente
                 await manager.send_status_update(session_id, StatusUpdate.UPLOAD_XML)
                 func = self._read_file
             case _:
-                file_type = data.content_type.split('/')[1]
+                file_type = content_type.split('/')[1]
 
                 raise WrongFileTypeError(
                     f'Unsupported file type: {file_type}. '
                     'Please upload a XLSX, CSV or ZIP file containing one of them.'
                 )
 
-        # Recursos síncronos são executados em Thread separada para manter assincronia
-        results = await asyncio.to_thread(
-            func,
-            filename=data.filename,
-            file_bytes=file_bytes,
-            separator=separator,
-            header=header,
-        )
+        if func == self._load_zip:
+            # ZIPs são processados em lote no pool de processos
+            results = await func(session_id, source=source, **read_options)
+        else:
+            # Recursos síncronos são executados em Thread separada para manter assincronia
+            results = await asyncio.to_thread(
+                func, filename=filename, source=source, **read_options
+            )
 
         if isinstance(results, pd.DataFrame):
             await session_manager.insert_df(session_id, results)
@@ -174,74 +342,220 @@ class DataHandler:
 
             # Retorna as primeiras linhas do DataFrame em formato JSON para pré-visualização
             return results.head().to_json()
+        elif isinstance(results, dict) and results.get('chunks'):
+            return await self._store_fiscal_chunks(session_id, results['chunks'])
         else:
-            # XMLs são processados pelo agente para flexibilidade
+            # XMLs sem layout fiscal conhecido são processados pelo agente para flexibilidade
             return results
 
-    def _load_zip(self, file_bytes: BytesIO, separator: str, header: int, **kwargs):
+    async def _store_fiscal_chunks(
+        self, session_id: str, chunks: list[dict]
+    ) -> dict[str, str | int]:
+        """Armazena no Vector Store os chunks extraídos de documentos fiscais, sem passar pelo LLM.
+
+        Args:
+            session_id (str): Identificador da sessão atual.
+            chunks (list[dict]): Chunks gerados pelo parser de documentos fiscais.
+
+        Returns:
+            dict[str, str | int]: Resumo da inserção com totais de documentos e chunks.
         """
-        Função auxiliar para ler arquivos ZIP, descompactar e retornar o DataFrame resultante.
+        await manager.send_status_update(session_id, StatusUpdate.UPLOAD_XML_STORE)
+
+        inserted_ids = await DataExtractionTools(session_id).insert_chunks(chunks)
+
+        if inserted_ids:
+            session_manager.mark_documents_changed(session_id)
+
+        total_documents = sum(
+            1 for chunk in chunks if chunk['metadata'].get('chunk_type') == 'header'
+        )
+
+        await manager.send_status_update(session_id, StatusUpdate.UPLOAD_FINISH)
+
+        return {
+            'results': f'{total_documents} documentos fiscais processados, {len(inserted_ids)} novos registros armazenados.',
+            'documents': total_documents,
+            'stored_chunks': len(inserted_ids),
+        }
+
+    async def _load_zip(
+        self,
+        session_id: str,
+        source: BytesIO | Path,
+        **read_options,
+    ) -> pd.DataFrame | dict:
+        """
+        Função auxiliar para ler arquivos ZIP em lote. Todos os arquivos suportados são descompactados um a um e lidos em paralelo no pool de processos de ingestão.
+
+        Partições CSV/XLSX são concatenadas em um único DataFrame da sessão e XMLs fiscais são enviados em conjunto para o Vector Store. O progresso de cada arquivo é enviado pelo WebSocket.
 
         Args:
-            file_bytes (BytesIO): O arquivo ZIP em memória.
-            separator (str): Separador do CSV.
-            header (int): Linha dos cabeçalhos.
+            session_id (str): Identificador da sessão atual.
+            source (BytesIO | Path): O arquivo ZIP em memória ou o caminho no disco.
+            read_options (dict): Opções de leitura repassadas para cada arquivo (separador, cabeçalho, aba e colunas).
 
         Raises:
-            FileNotFoundError: Quando nenhum arquivo CSV é encontrado após a descompactação.
+            FileNotFoundError: Quando nenhum arquivo suportado é encontrado após a descompactação.
 
         Returns:
-            df (DataFrame): O DataFrame resultante da leitura.
+            pd.DataFrame | dict: DataFrame concatenado, chunks fiscais ou o resumo do processamento em lotes mistos.
         """
-        with zipfile.ZipFile(file_bytes) as zip_file:
-            # Encontra o primeiro arquivo que termina com '.csv', '.xml' ou '.xlsx' dentro do zip
-            filename = next(
-                (
-                    name
-                    for name in zip_file.namelist()
-                    if name.endswith(('.csv', '.xlsx', '.xml'))
-                ),
-                None,
-            )
-
-            if not filename:
+        loop = asyncio.get_running_loop()
+        pool = get_ingestion_pool()
+        # Limita os arquivos descompactados em memória aguardando processamento
+        max_in_flight = settings.ingestion_workers * 2
+
+        with zipfile.ZipFile(source) as zip_file:
+            members = [
+                info
+                for info in zip_file.infolist()
+                if not info.is_dir()
+                and not info.filename.startswith('__MACOSX/')
+                and info.filename.endswith(SUPPORTED_EXTENSIONS)
+            ]
+
+            if not members:
                 raise FileNotFoundError(
                     'No CSV, XML or XLSX file found in the zip archive.'
                 )
 
-            with zip_file.open(filename) as uncomp_file:
-                return self._read_file(uncomp_file, filename, separator, header)
+            results: list[pd.DataFrame | dict | None] = [None] * len(members)
+            pending: dict[asyncio.Future, int] = {}
+            processed = 0
+
+            async def collect(return_when: str):
+                nonlocal processed
+
+                done, _ = await asyncio.wait(pending, return_when=return_when)
+
+                for future in done:
+                    index = pending.pop(future)
+                    filename = members[index].filename
+                    processed += 1
+
+                    try:
+                        results[index] = future.result()
+                        status = StatusUpdate.upload_progress(
+                            processed, len(members), filename
+                        )
+                    except Exception as exc:
+                        print(f'\t>> Failed to read {filename} from zip archive: {exc}')
+                        status = StatusUpdate.upload_error(
+                            processed, len(members), filename, str(exc)
+                        )
+
+                    await manager.send_status_update(session_id, status)
+
+            for index, info in enumerate(members):
+                if len(pending) >= max_in_flight:
+                    await collect(asyncio.FIRST_COMPLETED)
+
+                # Descompactação sob demanda, apenas do arquivo enviado ao worker
+                content = await asyncio.to_thread(zip_file.read, info)
+                future = loop.run_in_executor(
+                    pool,
+                    parse_archive_member,
+                    info.filename,
+                    content,
+                    read_options,
+                )
+                pending[future] = index
 
-    def _read_file(
-        self,
-        file_bytes: BytesIO,
-        filename: str,
-        separator: str = ',',
-        header: int = 0,
-        **kwargs,
-    ):
-        if filename.endswith('.csv'):
-            return pd.read_csv(file_bytes, sep=separator, header=header)
+            while pending:
+                await collect(asyncio.ALL_COMPLETED)
 
-        elif filename.endswith('.xlsx'):
-            return pd.read_excel(file_bytes, header=header)
+        return await self._merge_batch_results(session_id, results)
 
-        elif filename.endswith('.xml'):
-            xml_file = file_bytes.read().decode('utf-8')
+    async def _merge_batch_results(
+        self, session_id: str, results: list[pd.DataFrame | dict | None]
+    ) -> pd.DataFrame | dict:
+        """Combina os resultados de um lote, mantendo o retorno de arquivo único quando o lote é homogêneo.
+
+        Args:
+            session_id (str): Identificador da sessão atual.
+            results (list[pd.DataFrame | dict | None]): Resultados de cada arquivo do lote, na ordem do ZIP.
 
-            return {'results': xml_file, 'process': True}
+        Raises:
+            WrongFileTypeError: Quando nenhum arquivo do lote pôde ser lido.
 
-        else:
+        Returns:
+            pd.DataFrame | dict: DataFrame concatenado, chunks fiscais, textos XML para o agente (com o resumo do lote em `batch_summary` nos lotes mistos) ou o resumo do lote.
+        """
+        frames = [result for result in results if isinstance(result, pd.DataFrame)]
+        chunks = [
+            chunk
+            for result in results
+            if isinstance(result, dict)
+            for chunk in result.get('chunks', [])
+        ]
+        xml_texts = [
+            result['results']
+            for result in results
+            if isinstance(result, dict) and result.get('process')
+        ]
+        failed_files = sum(1 for result in results if result is None)
+
+        if not (frames or chunks or xml_texts):
             raise WrongFileTypeError(
-                f'Unsupported file type: {filename}. '
-                'Please upload a XLSX, CSV or ZIP file containing one of them.'
+                'None of the files in the zip archive could be read, please check their contents.'
             )
 
-    async def read_uploaded_image(self, session_id: str, image_file: UploadFile):
+        df = pd.concat(frames, ignore_index=True) if frames else None
+        xml_results = (
+            {'results': '\n\n'.join(xml_texts), 'process': True} if xml_texts else None
+        )
+
+        # Lotes homogêneos seguem o mesmo fluxo de um arquivo único
+        if sum(bool(part) for part in (frames, chunks, xml_texts)) == 1:
+            if df is not None:
+                return df
+            if chunks:
+                return {'chunks': chunks}
+            return xml_results
+
+        summary = {'files': len(results), 'failed_files': failed_files}
+
+        if df is not None:
+            await session_manager.insert_df(session_id, df)
+            summary['rows'] = len(df)
+
+        if chunks:
+            summary.update(await self._store_fiscal_chunks(session_id, chunks))
+
+        summary['results'] = (
+            f'{summary["files"]} arquivos processados em lote, '
+            f'{summary.get("rows", 0)} linhas carregadas e '
+            f'{summary.get("documents", 0)} documentos fiscais armazenados.'
+        )
+
+        if failed_files:
+            summary['results'] += f' {failed_files} arquivos não puderam ser lidos.'
+
+        if xml_results:
+            # Documentos livres ainda dependem do agente para extração, o resumo do que já foi carregado segue junto
+            return {**xml_results, 'batch_summary': summary}
+
+        await manager.send_status_update(session_id, StatusUpdate.UPLOAD_FINISH)
+
+        return summary
+
+    def _read_file(
+        self,
+        source: BytesIO | Path,
+        filename: str,
+        **read_options,
+    ):
+        return read_file(source, filename, **read_options)
+
+    async def read_uploaded_image(
+        self, session_id: str, image_file: UploadFile, mode: str = 'text'
+    ):
         """Realiza a leitura de imagens utilizando a OCR open-source Tesseract.
 
         Args:
             image_file (UploadFile): arquivo com a imagem para realizar a leitura.
+            mode (str, optional): 'text' para o texto completo da imagem ou 'danfe' para a leitura por blocos do DANFE com campos estruturados. Padrão é 'text'.
 
         Raises:
             WrongFileTypeError: levantada quando o arquivo recebido não é compatível.
@@ -268,18 +582,34 @@ class DataHandler:
                     f'Unsupported file type received: .{file_type}! Supported file types: {" ".join([f".{type}" for type in supported_types])}'
                 )
 
-            text = 'The following text was extracted from an image, try to identify its context and return a response in Brazilian Portuguese, including parts of the text when applicable. If its related to invoice data, create an analysis about it (e.g.: extract the fields received and pass to the Data Engineer to store), if not return a simple response.\n\n'
-
             await manager.send_status_update(session_id, StatusUpdate.UPLOAD_IMAGE)
 
             image = await image_file.read()
-            image_bytes = BytesIO(image)
 
-            def sync_read_img():
-                with Image.open(image_bytes) as img:
-                    return pytesseract.image_to_string(img, lang='por+eng')
+            if mode == 'danfe':
+                danfe = await danfe_ocr_service.extract(image)
+
+                # Sem a chave de acesso ou valores, a imagem provavelmente não é um DANFE
+                if danfe['fields'].keys() - {'document_type'}:
+                    return (
+                        'The following fields were extracted by OCR from a DANFE (Brazilian invoice) image, '
+                        'using the same field names as the NF-e XML. Analyze them and return a response in Brazilian Portuguese, '
+                        'pass the fields to the Data Engineer to store when they are consistent.\n\n'
+                        + json.dumps(
+                            {
+                                'fields': danfe['fields'],
+                                'items': danfe['items']
+                                or danfe['regions'].get('items'),
+                                'additional_info': danfe['regions'].get('additional'),
+                            },
+                            ensure_ascii=False,
+                        )
+                    )
+
+            text = 'The following text was extracted from an image, try to identify its context and return a response in Brazilian Portuguese, including parts of the text when applicable. If its related to invoice data, create an analysis about it (e.g.: extract the fields received and pass to the Data Engineer to store), if not return a simple response.\n\n'
 
-            text += await asyncio.to_thread(sync_read_img)
+            # Pré-processamento e OCR no pool dedicado, imagens repetidas vêm do cache
+            text += await ocr_service.extract_text(image)
 
         except Exception as exc:
             print(exc)
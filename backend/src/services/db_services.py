@@ -14,7 +14,7 @@ engine = create_engine(settings.database_uri)
 
 def execute_query(
     user_query: str,
-    parameters: dict[str, any] | None = None,
+    parameters: dict[str, any] | list[dict[str, any]] | None = None,
     commit: bool = False,
 ) -> Result:
     """
@@ -22,7 +22,7 @@ def execute_query(
 
     Args:
         user_query: A string da consulta SQL a ser executada.
-        parameters: Um dicionário de parâmetros para ligar (bind) à consulta.
+        parameters: Um dicionário de parâmetros para ligar (bind) à consulta, ou uma lista de dicionários para inserções em lote.
         commit: Se True, efetua o commit da transação após a execução.
 
     Returns:
@@ -47,19 +47,31 @@ def execute_query(
 
 
 def init_db() -> None:
-    """Inicializa o banco de dados criando a tabela 'charts' se ela não existir."""
+    """Inicializa o banco de dados criando as tabelas 'charts' e 'chat_messages' se elas não existirem."""
 
-    query = """\
+    queries = (
+        """\
     CREATE TABLE IF NOT EXISTS charts(
     uuid VARCHAR(36) PRIMARY KEY,
     graph_json JSON,
     metadata VARCHAR(500),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
-    """
+    """,
+        # Histórico de conversas persistido em lotes pelo ConversationStore
+        """\
+    CREATE TABLE IF NOT EXISTS chat_messages(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id VARCHAR(64) NOT NULL,
+    message JSON NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    """,
+        'CREATE INDEX IF NOT EXISTS idx_chat_messages_session ON chat_messages(session_id, id);',
+    )
 
     try:
-        # Executa a query de criação da tabela
-        execute_query(query)
+        # Executa as queries de criação das tabelas
+        for query in queries:
+            execute_query(query, commit=True)
         print('\t>> Database initialized successfully.')
     except SQLAlchemyError as e:
         # Captura e relança exceção de falha na inicialização
@@ -0,0 +1,271 @@
+"""Funções de leitura de arquivos, executadas em threads ou no pool de processos de ingestão."""
+
+import csv
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+import pandas as pd
+
+from src.services.fiscal_document_services import parse_fiscal_xml
+from src.settings import settings
+from src.utils.exceptions import InvalidFileOptionsException, WrongFileTypeError
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls', '.xlsb', '.ods')
+SUPPORTED_EXTENSIONS = ('.csv', '.xml', *EXCEL_EXTENSIONS)
+
+# Amostra do início do arquivo usada para detectar o formato do CSV
+CSV_SNIFF_BYTES = 64 * 1024
+CSV_DELIMITERS = ',;\t|'
+# Valores como 1.234,56 (padrão brasileiro) ou 1,234.56 (padrão americano)
+BR_NUMBER_PATTERN = re.compile(r'(?<![\d.,])\d{1,3}(?:\.\d{3})+,\d+(?![\d.,])')
+US_NUMBER_PATTERN = re.compile(r'(?<![\d.,])\d{1,3}(?:,\d{3})+\.\d+(?![\d.,])')
+DECIMAL_COMMA_PATTERN = re.compile(r'(?<![\d.,])-?\d+,\d+(?![\d.,])')
+
+_ingestion_pool: ProcessPoolExecutor | None = None
+
+
+def get_ingestion_pool() -> ProcessPoolExecutor:
+    """Retorna o pool de processos de ingestão, criado no primeiro uso e mantido vivo entre requisições.
+
+    O contexto 'spawn' evita copiar o estado do processo da API (threads, modelos carregados) para os workers.
+    """
+    global _ingestion_pool
+
+    if _ingestion_pool is None:
+        _ingestion_pool = ProcessPoolExecutor(
+            max_workers=settings.ingestion_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+
+    return _ingestion_pool
+
+
+def shutdown_ingestion_pool() -> None:
+    """Finaliza o pool de processos de ingestão, se criado."""
+    global _ingestion_pool
+
+    if _ingestion_pool is not None:
+        _ingestion_pool.shutdown(wait=False, cancel_futures=True)
+        _ingestion_pool = None
+
+
+def _decode_sample(sample: bytes) -> tuple[str, str]:
+    """Identifica o encoding da amostra, retornando o encoding e o texto decodificado.
+
+    Arquivos exportados pelo Excel no Brasil costumam vir em latin-1 (cp1252), que aceita qualquer sequência de bytes.
+    """
+    if sample.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig', sample[3:].decode('utf-8', errors='ignore')
+
+    try:
+        return 'utf-8', sample.decode('utf-8')
+    except UnicodeDecodeError as exc:
+        # A amostra pode terminar no meio de um caractere multibyte
+        if exc.start >= len(sample) - 3:
+            return 'utf-8', sample[: exc.start].decode('utf-8')
+
+    return 'latin-1', sample.decode('latin-1')
+
+
+def sniff_csv(sample: bytes) -> dict[str, str | None]:
+    """Detecta encoding, delimitador, separador decimal e de milhar a partir do início do arquivo.
+
+    Args:
+        sample (bytes): Primeiros bytes do arquivo CSV.
+
+    Returns:
+        dict: Opções de leitura (`encoding`, `sep`, `decimal`, `thousands`) para o pandas.
+    """
+    encoding, text = _decode_sample(sample)
+    lines = text.splitlines()
+    # Descarta a última linha, possivelmente cortada pela amostra
+    text = '\n'.join(lines[:-1] if len(lines) > 1 else lines)
+
+    try:
+        separator = csv.Sniffer().sniff(text, delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        header_line = lines[0] if lines else ''
+        separator = max(CSV_DELIMITERS, key=header_line.count)
+
+        if not header_line.count(separator):
+            separator = ','
+
+    decimal, thousands = '.', None
+
+    if separator != ',':
+        if BR_NUMBER_PATTERN.search(text):
+            decimal, thousands = ',', '.'
+        elif DECIMAL_COMMA_PATTERN.search(text):
+            decimal = ','
+        elif US_NUMBER_PATTERN.search(text):
+            thousands = ','
+
+    return {
+        'encoding': encoding,
+        'sep': separator,
+        'decimal': decimal,
+        'thousands': thousands,
+    }
+
+
+def _rewind(source: BytesIO | Path) -> None:
+    """Volta ao início de arquivos em memória, caminhos no disco são reabertos a cada leitura."""
+    if isinstance(source, BytesIO):
+        source.seek(0)
+
+
+def _read_sample(source: BytesIO | Path) -> bytes:
+    """Lê o início do arquivo para detecção do formato, sem carregar o restante em memória."""
+    if isinstance(source, BytesIO):
+        sample = source.read(CSV_SNIFF_BYTES)
+        source.seek(0)
+
+        return sample
+
+    with open(source, 'rb') as file:
+        return file.read(CSV_SNIFF_BYTES)
+
+
+def _read_csv(
+    source: BytesIO | Path,
+    filename: str,
+    separator: str | None,
+    header: int,
+    columns: list[str] | None,
+) -> pd.DataFrame:
+    """Lê arquivos CSV com o engine configurado (pyarrow por padrão) e colunas com tipos do Arrow.
+
+    O engine pyarrow faz a leitura em múltiplas threads, e as strings do Arrow ocupam bem menos memória que objetos Python.
+    """
+    options = sniff_csv(_read_sample(source))
+
+    # O separador informado pelo usuário tem prioridade sobre o detectado
+    if separator and separator != 'auto':
+        options['sep'] = '\t' if separator == '\\t' else separator
+
+    engine = settings.csv_engine
+    # O engine pyarrow não suporta separador de milhar, o engine C mantém os tipos do Arrow
+    if options['thousands'] and engine == 'pyarrow':
+        engine = 'c'
+
+    print(
+        f'\t>> Reading {filename} with engine "{engine}", '
+        f'sep={options["sep"]!r}, decimal={options["decimal"]!r}, encoding={options["encoding"]}'
+    )
+
+    options.update(
+        {'header': header, 'usecols': columns or None, 'dtype_backend': 'pyarrow'}
+    )
+
+    try:
+        return pd.read_csv(source, engine=engine, **options)
+    except ImportError:
+        print('\t>> pyarrow not available, falling back to the "c" engine.')
+        _rewind(source)
+        options.pop('dtype_backend')
+
+        return pd.read_csv(source, engine='c', **options)
+    except (ValueError, KeyError) as exc:
+        # Colunas inexistentes no arquivo
+        raise InvalidFileOptionsException(
+            f'Could not read {filename} with the options received: {exc}'
+        )
+
+
+def _read_excel(
+    source: BytesIO | Path,
+    filename: str,
+    header: int,
+    sheet_name: str | int | None,
+    columns: list[str] | None,
+) -> pd.DataFrame:
+    """Lê planilhas com o engine configurado (calamine por padrão), com seleção de aba e colunas.
+
+    O engine calamine lê o arquivo em Rust sem criar objetos de célula, sendo bem mais rápido que o openpyxl em planilhas grandes.
+    """
+    sheet = 0 if sheet_name is None else sheet_name
+    # Abas podem ser selecionadas pelo índice, recebido como texto na query
+    if isinstance(sheet, str) and sheet.isdigit():
+        sheet = int(sheet)
+
+    options = {'header': header, 'sheet_name': sheet, 'usecols': columns or None}
+
+    try:
+        return pd.read_excel(source, engine=settings.excel_engine, **options)
+    except ImportError:
+        if settings.excel_engine == 'openpyxl':
+            raise
+
+        print(
+            f'\t>> Excel engine "{settings.excel_engine}" not available, falling back to openpyxl.'
+        )
+        _rewind(source)
+
+        return pd.read_excel(source, engine='openpyxl', **options)
+    except (ValueError, KeyError) as exc:
+        # Aba ou colunas inexistentes na planilha
+        raise InvalidFileOptionsException(
+            f'Could not read {filename} with the options received: {exc}'
+        )
+
+
+def read_file(
+    source: BytesIO | Path,
+    filename: str,
+    separator: str | None = None,
+    header: int = 0,
+    sheet_name: str | int | None = None,
+    columns: list[str] | None = None,
+    **kwargs,
+) -> pd.DataFrame | dict:
+    """Lê um arquivo suportado e retorna o DataFrame ou o resultado do processamento do XML.
+
+    Args:
+        source (BytesIO | Path): Arquivo em memória ou caminho no disco, lido em streaming quando possível.
+        filename (str): Nome do arquivo, usado para identificar o formato.
+        separator (str | None, optional): Separador do CSV. Padrão é None, detectado a partir do conteúdo.
+        header (int, optional): Linha dos cabeçalhos. Padrão é 0.
+        sheet_name (str | int | None, optional): Nome ou índice da aba em planilhas. Padrão é a primeira aba.
+        columns (list[str] | None, optional): Colunas a serem carregadas, as demais são descartadas na leitura.
+
+    Raises:
+        WrongFileTypeError: Quando o formato do arquivo não é suportado.
+        InvalidFileOptionsException: Quando a aba ou as colunas solicitadas não existem no arquivo.
+
+    Returns:
+        pd.DataFrame | dict: DataFrame para CSV/XLSX, chunks fiscais (`{'chunks': [...]}`) ou o texto do XML para processamento pelo agente (`{'results': ..., 'process': True}`).
+    """
+    if filename.endswith('.csv'):
+        return _read_csv(source, filename, separator, header, columns)
+
+    elif filename.endswith(EXCEL_EXTENSIONS):
+        return _read_excel(source, filename, header, sheet_name, columns)
+
+    elif filename.endswith('.xml'):
+        # Leitura determinística de NF-e/CT-e, o LLM é usado apenas em documentos livres
+        chunks = parse_fiscal_xml(source)
+
+        if chunks:
+            return {'chunks': chunks}
+
+        xml_file = (
+            source.getvalue() if isinstance(source, BytesIO) else source.read_bytes()
+        )
+
+        return {'results': xml_file.decode('utf-8'), 'process': True}
+
+    else:
+        raise WrongFileTypeError(
+            f'Unsupported file type: {filename}. '
+            'Please upload a XLSX, CSV or ZIP file containing one of them.'
+        )
+
+
+def parse_archive_member(
+    filename: str, content: bytes, read_options: dict
+) -> pd.DataFrame | dict:
+    """Ponto de entrada dos workers para ler um arquivo extraído de um ZIP."""
+    return read_file(BytesIO(content), filename, **read_options)
@@ -0,0 +1,236 @@
+"""Serviço para leitura determinística de documentos fiscais em XML (NF-e e CT-e), sem uso de LLM."""
+
+import xml.etree.ElementTree as ET
+from collections.abc import Iterator
+from io import BytesIO
+from pathlib import Path
+
+from src.schemas import PayloadDataModel
+
+# Elementos raiz de cada documento fiscal, o conteúdo é processado ao final de cada um
+NFE_ROOT = 'infNFe'
+CTE_ROOT = 'infCte'
+
+
+def _path(path: str) -> str:
+    """Converte um caminho simples ('emit/CNPJ') em um caminho independente de namespace."""
+    return '/'.join(f'{{*}}{tag}' for tag in path.split('/'))
+
+
+def _text(element: ET.Element | None, path: str) -> str | None:
+    """Retorna o texto do primeiro elemento encontrado no caminho, ou None se ausente."""
+    if element is None:
+        return None
+
+    found = element.find(_path(path))
+
+    if found is None or found.text is None:
+        return None
+
+    return found.text.strip()
+
+
+def _first_child(element: ET.Element | None, path: str) -> ET.Element | None:
+    """Retorna o primeiro filho do grupo indicado, usado em grupos com variantes (ICMS00, PISAliq, ...)."""
+    group = element.find(_path(path)) if element is not None else None
+
+    if group is None:
+        return None
+
+    return next(iter(group), None)
+
+
+def _compact(fields: dict[str, str | None]) -> dict[str, str]:
+    """Remove campos ausentes, o payload do Vector Store aceita apenas strings."""
+    return {key: value for key, value in fields.items() if value not in (None, '')}
+
+
+def _access_key(element: ET.Element, prefix: str) -> str | None:
+    """Extrai a chave de acesso de 44 dígitos do atributo Id (ex.: 'NFe3519...')."""
+    element_id = element.get('Id', '')
+
+    return element_id.removeprefix(prefix) or None
+
+
+def _parse_nfe(inf_nfe: ET.Element) -> list[PayloadDataModel]:
+    """Mapeia um elemento infNFe para um chunk de cabeçalho e um chunk por item."""
+    total = inf_nfe.find(_path('total/ICMSTot'))
+
+    header = _compact(
+        {
+            'document_type': 'NF-e',
+            'chunk_type': 'header',
+            'chNFe': _access_key(inf_nfe, 'NFe'),
+            'CNPJ_Emitente': _text(inf_nfe, 'emit/CNPJ') or _text(inf_nfe, 'emit/CPF'),
+            'CRT': _text(inf_nfe, 'emit/CRT'),
+            'CNPJ_Destinatario': _text(inf_nfe, 'dest/CNPJ')
+            or _text(inf_nfe, 'dest/CPF'),
+            'dhEmi': _text(inf_nfe, 'ide/dhEmi') or _text(inf_nfe, 'ide/dEmi'),
+            'natOp': _text(inf_nfe, 'ide/natOp'),
+            'indIEDest': _text(inf_nfe, 'dest/indIEDest'),
+            'infCpl': _text(inf_nfe, 'infAdic/infCpl'),
+            'vNF': _text(total, 'vNF'),
+            'vProdTotal': _text(total, 'vProd'),
+            'vIPITotal': _text(total, 'vIPI'),
+            'vST': _text(total, 'vST'),
+            'vFrete': _text(total, 'vFrete'),
+            'vSeg': _text(total, 'vSeg'),
+            'vOutro': _text(total, 'vOutro'),
+            'vDesc': _text(total, 'vDesc'),
+        }
+    )
+
+    header_text = (
+        f'Nota fiscal {header.get("chNFe", "sem chave")} emitida em {header.get("dhEmi", "data não informada")} '
+        f'pelo CNPJ {header.get("CNPJ_Emitente", "não informado")} para o CNPJ {header.get("CNPJ_Destinatario", "não informado")}, '
+        f'natureza da operação {header.get("natOp", "não informada")}, com valor total de {header.get("vNF", "0.00")}.'
+    )
+    if header.get('infCpl'):
+        header_text += f' Informações complementares: {header["infCpl"]}'
+
+    chunks = [PayloadDataModel(text=header_text, metadata=header).model_dump()]
+
+    # Campos do cabeçalho repetidos nos itens para filtros e rastreabilidade
+    shared_fields = {
+        key: header[key]
+        for key in ('chNFe', 'CNPJ_Emitente', 'CNPJ_Destinatario', 'dhEmi', 'CRT')
+        if key in header
+    }
+
+    for det in inf_nfe.iterfind(_path('det')):
+        prod = det.find(_path('prod'))
+        imposto = det.find(_path('imposto'))
+        icms = _first_child(imposto, 'ICMS')
+        ipi = imposto.find(_path('IPI')) if imposto is not None else None
+        ipi_group = ipi.find(_path('IPITrib')) if ipi is not None else None
+        pis = _first_child(imposto, 'PIS')
+        cofins = _first_child(imposto, 'COFINS')
+
+        item = _compact(
+            {
+                'document_type': 'NF-e',
+                'chunk_type': 'item',
+                **shared_fields,
+                'nItem': det.get('nItem'),
+                'xProd': _text(prod, 'xProd'),
+                'vProd': _text(prod, 'vProd'),
+                'indTot': _text(prod, 'indTot'),
+                'NCM': _text(prod, 'NCM'),
+                'CFOP': _text(prod, 'CFOP'),
+                'CST_CSOSN': _text(icms, 'CST') or _text(icms, 'CSOSN'),
+                'vBCICMS': _text(icms, 'vBC'),
+                'pICMS': _text(icms, 'pICMS'),
+                'vICMS': _text(icms, 'vICMS'),
+                'vBCST': _text(icms, 'vBCST'),
+                'pICMSST': _text(icms, 'pICMSST'),
+                'vICMSST': _text(icms, 'vICMSST'),
+                'vICMSUFDest': _text(imposto, 'ICMSUFDest/vICMSUFDest'),
+                'vFCPUFDest': _text(imposto, 'ICMSUFDest/vFCPUFDest'),
+                'CST_IPI': _text(ipi_group, 'CST') or _text(ipi, 'IPINT/CST'),
+                'vBCIPI': _text(ipi_group, 'vBC'),
+                'pIPI': _text(ipi_group, 'pIPI'),
+                'vIPI': _text(ipi_group, 'vIPI'),
+                'vIPIDevol': _text(det, 'impostoDevol/IPI/vIPIDevol'),
+                'CST_PIS': _text(pis, 'CST'),
+                'vBCPIS': _text(pis, 'vBC'),
+                'pPIS': _text(pis, 'pPIS'),
+                'vPIS': _text(pis, 'vPIS'),
+                'CST_COFINS': _text(cofins, 'CST'),
+                'vBCCOFINS': _text(cofins, 'vBC'),
+                'pCOFINS': _text(cofins, 'pCOFINS'),
+                'vCOFINS': _text(cofins, 'vCOFINS'),
+            }
+        )
+
+        item_text = (
+            f'O item {item.get("nItem", "")} {item.get("xProd", "sem descrição")} '
+            f'(NCM: {item.get("NCM", "não informado")}, CFOP: {item.get("CFOP", "não informado")}) '
+            f'da nota {item.get("chNFe", "sem chave")} possui valor de {item.get("vProd", "0.00")}. '
+            f'ICMS CST/CSOSN {item.get("CST_CSOSN", "não informado")} com base {item.get("vBCICMS", "0.00")}, '
+            f'alíquota {item.get("pICMS", "0.00")} e valor {item.get("vICMS", "0.00")}; '
+            f'IPI {item.get("vIPI", "0.00")}, PIS {item.get("vPIS", "0.00")} e COFINS {item.get("vCOFINS", "0.00")}.'
+        )
+
+        chunks.append(PayloadDataModel(text=item_text, metadata=item).model_dump())
+
+    return chunks
+
+
+def _parse_cte(inf_cte: ET.Element) -> list[PayloadDataModel]:
+    """Mapeia um elemento infCte para um único chunk com os dados do conhecimento de transporte."""
+    icms = _first_child(inf_cte, 'imp/ICMS')
+
+    metadata = _compact(
+        {
+            'document_type': 'CT-e',
+            'chunk_type': 'header',
+            'chCTe': _access_key(inf_cte, 'CTe'),
+            'CNPJ_Emitente': _text(inf_cte, 'emit/CNPJ'),
+            'CNPJ_Remetente': _text(inf_cte, 'rem/CNPJ') or _text(inf_cte, 'rem/CPF'),
+            'CNPJ_Destinatario': _text(inf_cte, 'dest/CNPJ')
+            or _text(inf_cte, 'dest/CPF'),
+            'dhEmi': _text(inf_cte, 'ide/dhEmi'),
+            'natOp': _text(inf_cte, 'ide/natOp'),
+            'CFOP': _text(inf_cte, 'ide/CFOP'),
+            'vTPrest': _text(inf_cte, 'vPrest/vTPrest'),
+            'vRec': _text(inf_cte, 'vPrest/vRec'),
+            'CST_CSOSN': _text(icms, 'CST') or _text(icms, 'CSOSN'),
+            'vBCICMS': _text(icms, 'vBC'),
+            'pICMS': _text(icms, 'pICMS'),
+            'vICMS': _text(icms, 'vICMS'),
+            'infCpl': _text(inf_cte, 'compl/xObs'),
+        }
+    )
+
+    text = (
+        f'Conhecimento de transporte {metadata.get("chCTe", "sem chave")} emitido em {metadata.get("dhEmi", "data não informada")} '
+        f'pelo CNPJ {metadata.get("CNPJ_Emitente", "não informado")}, remetente {metadata.get("CNPJ_Remetente", "não informado")} '
+        f'e destinatário {metadata.get("CNPJ_Destinatario", "não informado")}, CFOP {metadata.get("CFOP", "não informado")}, '
+        f'valor da prestação {metadata.get("vTPrest", "0.00")} com ICMS CST {metadata.get("CST_CSOSN", "não informado")} '
+        f'de valor {metadata.get("vICMS", "0.00")}.'
+    )
+
+    return [PayloadDataModel(text=text, metadata=metadata).model_dump()]
+
+
+def iter_fiscal_documents(
+    source: BytesIO | str | Path,
+) -> Iterator[list[PayloadDataModel]]:
+    """Percorre o XML em streaming (iterparse), retornando os chunks de cada documento fiscal encontrado.
+
+    Args:
+        source (BytesIO | str | Path): Arquivo XML em memória ou caminho no disco.
+
+    Yields:
+        chunks (list[PayloadDataModel]): Chunks de um documento (cabeçalho e itens).
+    """
+    parsers = {NFE_ROOT: _parse_nfe, CTE_ROOT: _parse_cte}
+
+    for _, element in ET.iterparse(source, events=('end',)):
+        parser = parsers.get(element.tag.rsplit('}', 1)[-1])
+
+        if parser:
+            yield parser(element)
+            # Libera o documento processado para manter a memória constante em lotes
+            element.clear()
+
+
+def parse_fiscal_xml(source: BytesIO | str | Path) -> list[PayloadDataModel]:
+    """Extrai os campos fiscais de NF-e e CT-e em chunks prontos para o Vector Store.
+
+    Args:
+        source (BytesIO | str | Path): Arquivo XML em memória ou caminho no disco.
+
+    Returns:
+        chunks (list[PayloadDataModel]): Lista de chunks, vazia quando o XML não é um documento fiscal conhecido ou está malformado.
+    """
+    chunks = []
+
+    try:
+        for document_chunks in iter_fiscal_documents(source):
+            chunks.extend(document_chunks)
+    except ET.ParseError as exc:
+        print(f'\t>> Failed to parse XML as a fiscal document: {exc}')
+        return []
+
+    return chunks
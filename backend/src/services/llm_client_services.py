@@ -0,0 +1,159 @@
+"""Pool de clientes HTTP compartilhados entre os agentes, identificados pelo provedor e pela chave de API."""
+
+from dataclasses import dataclass, field
+
+import httpx
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from src.settings import settings
+
+# Provedores com clientes HTTP (httpx) injetáveis no LangChain
+HTTPX_PROVIDERS = ('groq', 'openai')
+
+
+@dataclass(slots=True)
+class PooledClient:
+    provider: str
+    owners: set[str] = field(default_factory=set)
+    http_client: httpx.Client | None = None
+    http_async_client: httpx.AsyncClient | None = None
+    # Modelos do Gemini não aceitam um cliente httpx, as instâncias são compartilhadas
+    models: dict[tuple, ChatGoogleGenerativeAI] = field(default_factory=dict)
+
+    async def close(self) -> None:
+        if self.http_client is not None:
+            self.http_client.close()
+
+        if self.http_async_client is not None:
+            await self.http_async_client.aclose()
+
+        self.models.clear()
+
+
+class LLMClientPool:
+    """Registro de clientes por (provedor, chave de API), com contagem de referências por sessão.
+
+    Todos os agentes de todas as sessões que usam a mesma chave compartilham as conexões (HTTP/2 e keep-alive), os clientes são fechados quando a última sessão que os usa é removida.
+    """
+
+    def __init__(self):
+        self._clients: dict[tuple[str, str], PooledClient] = {}
+        # Chave registrada por sessão para cada provedor
+        self._owners: dict[str, dict[str, str]] = {}
+
+    @staticmethod
+    def _create_http_clients() -> tuple[httpx.Client, httpx.AsyncClient]:
+        options = {
+            'limits': httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_keepalive_connections,
+                keepalive_expiry=30,
+            ),
+            'timeout': httpx.Timeout(120, connect=10),
+        }
+
+        try:
+            return httpx.Client(http2=True, **options), httpx.AsyncClient(
+                http2=True, **options
+            )
+        except ImportError:
+            # HTTP/2 depende do pacote h2, sem ele as conexões HTTP/1.1 ainda são reaproveitadas
+            print('\t>> h2 package not available, LLM clients will use HTTP/1.1.')
+
+            return httpx.Client(**options), httpx.AsyncClient(**options)
+
+    async def acquire(self, owner: str, provider: str, api_key: str) -> None:
+        """Registra a sessão como usuária dos clientes da chave, liberando a chave anterior do mesmo provedor.
+
+        Args:
+            owner (str): Identificador da sessão.
+            provider (str): Provedor da chave ('groq', 'google' ou 'openai').
+            api_key (str): Chave de API recebida.
+        """
+        owner_keys = self._owners.setdefault(owner, {})
+        previous_key = owner_keys.get(provider)
+
+        if previous_key == api_key:
+            return
+
+        if previous_key is not None:
+            await self._release(owner, provider, previous_key)
+
+        pooled = self._clients.get((provider, api_key))
+
+        if pooled is None:
+            pooled = PooledClient(provider=provider)
+
+            if provider in HTTPX_PROVIDERS:
+                pooled.http_client, pooled.http_async_client = (
+                    self._create_http_clients()
+                )
+
+            self._clients[(provider, api_key)] = pooled
+
+        pooled.owners.add(owner)
+        owner_keys[provider] = api_key
+
+    async def _release(self, owner: str, provider: str, api_key: str) -> None:
+        pooled = self._clients.get((provider, api_key))
+
+        if pooled is None:
+            return
+
+        pooled.owners.discard(owner)
+
+        if not pooled.owners:
+            del self._clients[(provider, api_key)]
+            await pooled.close()
+
+    async def release_owner(self, owner: str) -> None:
+        """Libera todos os clientes usados pela sessão, fechando os que não possuem outras sessões."""
+        for provider, api_key in self._owners.pop(owner, {}).items():
+            await self._release(owner, provider, api_key)
+
+    def get_http_clients(self, provider: str, api_key: str) -> dict[str, httpx.Client]:
+        """Retorna os clientes compartilhados no formato aceito pelo ChatGroq e ChatOpenAI.
+
+        Chaves não registradas retornam um dicionário vazio, mantendo os clientes próprios do modelo.
+        """
+        pooled = self._clients.get((provider, api_key))
+
+        if pooled is None or pooled.http_client is None:
+            return {}
+
+        return {
+            'http_client': pooled.http_client,
+            'http_async_client': pooled.http_async_client,
+        }
+
+    def get_gemini_model(
+        self, api_key: str, model_name: str, **kwargs
+    ) -> ChatGoogleGenerativeAI:
+        """Retorna uma instância compartilhada do modelo Gemini para a chave, criando no primeiro uso."""
+        pooled = self._clients.get(('google', api_key))
+
+        def create_model():
+            return ChatGoogleGenerativeAI(
+                model=model_name, google_api_key=api_key, **kwargs
+            )
+
+        if pooled is None:
+            return create_model()
+
+        key = (model_name, tuple(sorted(kwargs.items())))
+
+        if key not in pooled.models:
+            pooled.models[key] = create_model()
+
+        return pooled.models[key]
+
+    async def close(self) -> None:
+        """Fecha todos os clientes, usado no encerramento da aplicação."""
+        for pooled in self._clients.values():
+            await pooled.close()
+
+        self._clients.clear()
+        self._owners.clear()
+
+
+llm_client_pool = LLMClientPool()
@@ -0,0 +1,124 @@
+"""Métricas em memória da aplicação (contadores e tempos), expostas pela rota `/metrics`."""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from time import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+
+@dataclass(slots=True)
+class Timing:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            'count': self.count,
+            'avg': round(self.total / self.count, 4) if self.count else 0.0,
+            'max': round(self.max, 4),
+        }
+
+
+class Metrics:
+    """Registro simples de métricas do processo, sem dependências externas."""
+
+    def __init__(self):
+        self.started_at = time()
+        self.counters: dict[str, float] = defaultdict(float)
+        self.timings: dict[str, Timing] = defaultdict(Timing)
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Incrementa o contador informado."""
+        self.counters[name] += value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Registra a duração de uma operação, em segundos."""
+        timing = self.timings[name]
+        timing.count += 1
+        timing.total += seconds
+        timing.max = max(timing.max, seconds)
+
+    def ratio(self, hits: str, misses: str) -> float:
+        """Calcula a taxa de acerto entre dois contadores."""
+        total = self.counters[hits] + self.counters[misses]
+
+        return round(self.counters[hits] / total, 4) if total else 0.0
+
+    def snapshot(self) -> dict:
+        """Retorna todas as métricas registradas até o momento."""
+        return {
+            'uptime_seconds': round(time() - self.started_at),
+            'counters': dict(self.counters),
+            'timings': {
+                name: timing.to_dict() for name, timing in self.timings.items()
+            },
+        }
+
+
+metrics = Metrics()
+
+
+class LLMUsageCallback(BaseCallbackHandler):
+    """Soma o uso de tokens das chamadas aos LLMs de uma requisição, incluindo os sub-agentes, e os tokens lidos do cache de prompt do provedor."""
+
+    # Apenas soma valores, pode ser executado diretamente no loop de eventos
+    run_inline = True
+
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.cached_tokens = 0
+        self.output_tokens = 0
+
+    def on_llm_end(self, response: LLMResult, **kwargs) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, 'message', None)
+                usage = getattr(message, 'usage_metadata', None)
+
+                if not usage:
+                    continue
+
+                self.calls += 1
+                self.input_tokens += usage.get('input_tokens', 0)
+                self.output_tokens += usage.get('output_tokens', 0)
+                # Provedores sem cache de prompt (ou sem o detalhe no retorno) não informam o campo
+                details = usage.get('input_token_details') or {}
+                self.cached_tokens += details.get('cache_read') or 0
+
+    def report(self, session_id: str) -> dict[str, int | float]:
+        """Registra o uso da requisição nas métricas globais e o imprime no log.
+
+        Returns:
+            dict[str, int | float]: Chamadas, tokens de entrada (total e em cache), tokens de saída e a taxa de tokens em cache.
+        """
+        cached_ratio = (
+            round(self.cached_tokens / self.input_tokens, 4)
+            if self.input_tokens
+            else 0.0
+        )
+
+        metrics.increment('llm.calls', self.calls)
+        metrics.increment('llm.input_tokens', self.input_tokens)
+        metrics.increment('llm.cached_input_tokens', self.cached_tokens)
+        metrics.increment(
+            'llm.uncached_input_tokens', self.input_tokens - self.cached_tokens
+        )
+        metrics.increment('llm.output_tokens', self.output_tokens)
+
+        print(
+            f'\t>> LLM usage for session {session_id}: {self.calls} calls, '
+            f'{self.input_tokens} input tokens ({self.cached_tokens} cached, {cached_ratio:.0%}), '
+            f'{self.output_tokens} output tokens'
+        )
+
+        return {
+            'calls': self.calls,
+            'input_tokens': self.input_tokens,
+            'cached_input_tokens': self.cached_tokens,
+            'output_tokens': self.output_tokens,
+            'cached_ratio': cached_ratio,
+        }
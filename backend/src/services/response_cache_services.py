@@ -0,0 +1,265 @@
+"""Cache semântico de respostas do Supervisor, identificado pelos dados da sessão e pelo embedding da pergunta."""
+
+import asyncio
+import copy
+import json
+import re
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from time import time
+from uuid import uuid4
+
+import numpy as np
+
+from src.services.metrics_services import metrics
+from src.services.vector_store_services import QdrantStore
+from src.settings import settings
+
+# Siglas das UFs, valores que mudam a resposta e precisam ser iguais entre as perguntas
+UF_CODES = frozenset(
+    'AC AL AM AP BA CE DF ES GO MA MG MS MT PA PB PE PI PR RJ RN RO RR RS SC SE SP TO'.split()
+)
+# Siglas que também são palavras comuns ('se', 'es', 'to'), reconhecidas apenas em maiúsculas
+UF_COMMON_WORDS = frozenset({'AL', 'AM', 'ES', 'MA', 'PA', 'SE', 'TO'})
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normaliza a pergunta para comparação: minúsculas, sem acentos, pontuação e espaços extras."""
+    text = unicodedata.normalize('NFKD', prompt.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    text = re.sub(r'[^\w\s]', ' ', text)
+
+    return ' '.join(text.split())
+
+
+def exact_terms(user_input: str, prompt: str, columns) -> tuple[str, ...]:
+    """Termos da pergunta que precisam ser iguais para reaproveitar a resposta, já que perguntas que diferem apenas neles têm embeddings quase idênticos.
+
+    Args:
+        user_input (str): Pergunta original, usada para reconhecer as siglas de UF em maiúsculas.
+        prompt (str): Pergunta normalizada.
+        columns (Iterable): Colunas do DataFrame da sessão.
+
+    Returns:
+        tuple[str, ...]: Números (ex.: "top 5", CFOP 5102), siglas de UF e colunas citadas (ex.: vNF e vProd).
+    """
+    numbers = re.findall(r'\d+', prompt)
+    ufs = set(re.findall(r'\b[A-Z]{2}\b', user_input)) & UF_CODES
+    ufs |= {word.upper() for word in prompt.split()} & (UF_CODES - UF_COMMON_WORDS)
+    padded = f' {prompt} '
+    cited_columns = {
+        column
+        for column in map(normalize_prompt, map(str, columns))
+        if column and f' {column} ' in padded
+    }
+
+    return (*numbers, *sorted(ufs), *sorted(cited_columns))
+
+
+@dataclass(slots=True)
+class CacheQuery:
+    """Pergunta preparada em `lookup` e reaproveitada em `store`. O embedding é calculado apenas quando necessário."""
+
+    prompt: str
+    terms: tuple[str, ...]
+    embedding: np.ndarray | None = None
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    session_id: str
+    fingerprint: str
+    # Modelos dos agentes da sessão, respostas de outro modelo não são reaproveitadas
+    model: str
+    prompt: str
+    terms: tuple[str, ...]
+    embedding: np.ndarray
+    output: str
+    content: dict
+    size: int
+    created_at: float = field(default_factory=time)
+
+
+class ResponseCache:
+    """Cache de respostas por sessão com busca por similaridade, expiração (TTL) e remoção LRU limitada por bytes.
+
+    Respostas só são reaproveitadas quando os dados da sessão (DataFrame e documentos) são os mesmos da resposta original.
+    """
+
+    def __init__(
+        self,
+        threshold: float | None = None,
+        ttl: int | None = None,
+        max_bytes: int | None = None,
+    ):
+        self.threshold = threshold or settings.response_cache_similarity
+        self.ttl = ttl or settings.response_cache_ttl
+        self.max_bytes = max_bytes or settings.response_cache_max_bytes
+        self.current_bytes = 0
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._sessions: dict[str, set[str]] = {}
+
+    @staticmethod
+    def _embed(prompt: str) -> np.ndarray:
+        embedding = np.asarray(next(iter(QdrantStore.embedder.embed([prompt]))))
+
+        return embedding / (np.linalg.norm(embedding) or 1.0)
+
+    def _remove(self, entry_id: str) -> None:
+        entry = self._entries.pop(entry_id)
+        self.current_bytes -= entry.size
+        self._sessions[entry.session_id].discard(entry_id)
+
+    async def _embed_query(self, query: CacheQuery) -> np.ndarray:
+        if query.embedding is None:
+            query.embedding = await asyncio.to_thread(self._embed, query.prompt)
+
+        return query.embedding
+
+    def _candidates(
+        self, session_id: str, fingerprint: str, model: str, query: CacheQuery
+    ) -> list[tuple[str, CachedResponse]]:
+        """Entradas da sessão com os mesmos dados, modelo e termos exatos, removendo entradas expiradas."""
+        time_now = time()
+        candidates = []
+
+        for entry_id in list(self._sessions.get(session_id, ())):
+            entry = self._entries[entry_id]
+
+            if time_now - entry.created_at > self.ttl:
+                self._remove(entry_id)
+                continue
+
+            if (
+                entry.fingerprint == fingerprint
+                and entry.model == model
+                and entry.terms == query.terms
+            ):
+                candidates.append((entry_id, entry))
+
+        return candidates
+
+    async def _find(
+        self, session_id: str, fingerprint: str, model: str, query: CacheQuery
+    ) -> tuple[str, float] | None:
+        """Busca a entrada mais similar entre as candidatas. A pergunta só é convertida em embedding quando não há uma candidata idêntica."""
+        candidates = self._candidates(session_id, fingerprint, model, query)
+
+        if not candidates:
+            return None
+
+        for entry_id, entry in candidates:
+            if entry.prompt == query.prompt:
+                return entry_id, 1.0
+
+        embedding = await self._embed_query(query)
+        best_id, best_score = None, self.threshold
+
+        for entry_id, entry in candidates:
+            score = float(entry.embedding @ embedding)
+
+            if score >= best_score:
+                best_id, best_score = entry_id, score
+
+        return (best_id, best_score) if best_id else None
+
+    async def lookup(
+        self,
+        session_id: str,
+        fingerprint: str,
+        model: str,
+        user_input: str,
+        columns=(),
+    ) -> tuple[CachedResponse | None, CacheQuery]:
+        """Procura uma resposta para uma pergunta equivalente sobre os mesmos dados.
+
+        Args:
+            session_id (str): Identificador da sessão atual.
+            fingerprint (str): Identidade dos dados da sessão.
+            model (str): Identificação dos modelos dos agentes da sessão.
+            user_input (str): Pergunta do usuário.
+            columns (Iterable, optional): Colunas do DataFrame da sessão, citadas na pergunta devem ser iguais.
+
+        Returns:
+            tuple[CachedResponse | None, CacheQuery]: Resposta em cache, se encontrada, e a pergunta preparada (termos e embedding, quando calculado), reaproveitada em `store`.
+        """
+        prompt = normalize_prompt(user_input)
+        query = CacheQuery(prompt, exact_terms(user_input, prompt, columns))
+        # Sem entradas candidatas na sessão, a falha é registrada sem calcular o embedding
+        match = await self._find(session_id, fingerprint, model, query)
+
+        if match is None:
+            metrics.increment('response_cache.misses')
+
+            return None, query
+
+        entry_id, score = match
+        self._entries.move_to_end(entry_id)
+        metrics.increment('response_cache.hits')
+        print(
+            f'\t>> Response cache hit for session {session_id} (similarity {score:.3f})'
+        )
+
+        return self._entries[entry_id], query
+
+    async def store(
+        self,
+        session_id: str,
+        fingerprint: str,
+        model: str,
+        query: CacheQuery,
+        output: str,
+        content: dict,
+    ) -> None:
+        """Armazena a resposta, removendo as entradas menos usadas quando o limite de bytes é excedido.
+
+        Args:
+            session_id (str): Identificador da sessão atual.
+            fingerprint (str): Identidade dos dados usados na resposta.
+            model (str): Identificação dos modelos dos agentes que geraram a resposta.
+            query (CacheQuery): Pergunta preparada, retornada por `lookup`.
+            output (str): Resposta original do Supervisor, registrada no histórico da conversa em acertos.
+            content (dict): Resposta validada enviada ao usuário.
+        """
+        embedding = await self._embed_query(query)
+        size = (
+            len(json.dumps(content, ensure_ascii=False).encode())
+            + len(output.encode())
+            + embedding.nbytes
+        )
+
+        if size > self.max_bytes:
+            return
+
+        entry = CachedResponse(
+            session_id=session_id,
+            fingerprint=fingerprint,
+            model=model,
+            prompt=query.prompt,
+            terms=query.terms,
+            embedding=embedding,
+            output=output,
+            content=copy.deepcopy(content),
+            size=size,
+        )
+        entry_id = uuid4().hex
+
+        self._entries[entry_id] = entry
+        self._sessions.setdefault(session_id, set()).add(entry_id)
+        self.current_bytes += size
+
+        while self.current_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            metrics.increment('response_cache.evictions')
+
+        metrics.increment('response_cache.stores')
+
+    def release_session(self, session_id: str) -> None:
+        """Remove as respostas em cache da sessão."""
+        for entry_id in list(self._sessions.pop(session_id, ())):
+            entry = self._entries.pop(entry_id)
+            self.current_bytes -= entry.size
+
+
+response_cache = ResponseCache()
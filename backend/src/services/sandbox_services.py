@@ -0,0 +1,282 @@
+"""Pool de processos pré-iniciados e isolados para executar o código Python escrito pelos agentes.
+
+Cada worker possui limites de recursos (tempo de CPU e espaço de endereçamento) e é finalizado quando excede o tempo limite da execução, sem afetar o processo da API. O DataFrame da sessão é lido da memória compartilhada e o resultado retorna por um protocolo simples de mensagens no pipe.
+"""
+
+import asyncio
+import math
+import multiprocessing
+import signal
+import uuid
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+
+from src.services.shared_memory_services import SharedFrame
+from src.settings import settings
+
+try:
+    import resource
+except ImportError:
+    # Limites de recursos dependem de um sistema POSIX
+    resource = None
+
+# Tempo para o worker importar as bibliotecas e sinalizar que está pronto, em segundos
+STARTUP_TIMEOUT = 60
+READY_MESSAGE = 'ready'
+
+
+class CPUTimeExceeded(Exception):
+    """Levantada no worker quando a execução excede o limite de tempo de CPU."""
+
+
+def _raise_cpu_exceeded(signum, frame):
+    raise CPUTimeExceeded('CPU time limit exceeded.')
+
+
+def _vm_size() -> int:
+    """Espaço de endereçamento atual do processo em bytes (Linux)."""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError):
+        return 0
+
+
+def _set_limits(cpu_seconds: int, memory_bytes: int) -> None:
+    """Define os limites (soft) da próxima execução, somados ao uso já existente do worker.
+
+    Os limites hard não são reduzidos para que possam ser restaurados ao fim da execução.
+    """
+    if resource is None:
+        return
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_used = math.ceil(usage.ru_utime + usage.ru_stime)
+    _, cpu_hard = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_used + cpu_seconds, cpu_hard))
+
+    vm_size = _vm_size()
+
+    if vm_size:
+        _, as_hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (vm_size + memory_bytes, as_hard))
+
+
+def _reset_limits() -> None:
+    if resource is None:
+        return
+
+    for limit in (resource.RLIMIT_CPU, resource.RLIMIT_AS):
+        _, hard = resource.getrlimit(limit)
+        resource.setrlimit(limit, (hard, hard))
+
+
+def _sandbox_worker(conn: Connection, cpu_seconds: int, memory_bytes: int) -> None:
+    """Loop do processo worker: recebe o código e a referência ao DataFrame, executa e retorna a saída.
+
+    Protocolo:
+        Recebe `{'code': str, 'frame': SharedFrame | None}` ou `None` para encerrar.
+        Responde `{'output': str, 'graphs': list[tuple[str, str, str]]}`, com os gráficos (graph_id, JSON e metadados) salvos pela API.
+    """
+    import pandas as pd
+    import plotly.express as px
+    from langchain_experimental.tools import PythonAstREPLTool
+
+    from src.services.shared_memory_services import (
+        WORKER_FRAME_CACHE,
+        AttachedFrames,
+        enable_copy_on_write,
+    )
+
+    enable_copy_on_write()
+
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _raise_cpu_exceeded)
+
+    # Interrupções (Ctrl+C) são tratadas pelo processo da API
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    frames = AttachedFrames(WORKER_FRAME_CACHE)
+    conn.send(READY_MESSAGE)
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+
+        if message is None:
+            break
+
+        graphs = []
+
+        def _save_graph_to_db(fig, metadata: str) -> str:
+            graph_id = str(uuid.uuid4())
+            graphs.append((graph_id, fig.to_json(), metadata))
+
+            return graph_id
+
+        frame: SharedFrame | None = message['frame']
+        df = frames.get(frame) if frame is not None else None
+
+        python_executor = PythonAstREPLTool(
+            locals={
+                '_save_graph_to_db': _save_graph_to_db,
+                'pd': pd,
+                'px': px,
+                'df': df,
+            }
+        )
+
+        _set_limits(cpu_seconds, memory_bytes)
+
+        try:
+            output = python_executor.run(message['code'])
+        except (CPUTimeExceeded, MemoryError) as exc:
+            output = f'{type(exc).__name__}: {exc}'
+        finally:
+            _reset_limits()
+
+        del python_executor, df
+        conn.send({'output': str(output), 'graphs': graphs})
+
+    frames.clear()
+
+
+@dataclass(slots=True, eq=False)
+class SandboxWorker:
+    process: BaseProcess
+    conn: Connection
+    ready: bool = False
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class SandboxPool:
+    """Workers pré-iniciados (contexto 'spawn') para a ferramenta `execute_python_code`.
+
+    Cada execução ocupa um worker, execuções que excedem o tempo limite ou finalizam o processo têm o worker substituído.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        timeout: float | None = None,
+        cpu_seconds: int | None = None,
+        memory_limit_mb: int | None = None,
+    ):
+        self.workers = workers or settings.sandbox_workers
+        self.timeout = timeout or settings.sandbox_timeout
+        self.cpu_seconds = cpu_seconds or settings.sandbox_cpu_seconds
+        self.memory_bytes = (memory_limit_mb or settings.sandbox_memory_limit_mb) * (
+            1024**2
+        )
+        self._context = multiprocessing.get_context('spawn')
+        self._idle: asyncio.Queue[SandboxWorker] | None = None
+        self._all: set[SandboxWorker] = set()
+
+    def _spawn(self) -> SandboxWorker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_sandbox_worker,
+            args=(child_conn, self.cpu_seconds, self.memory_bytes),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+
+        worker = SandboxWorker(process, parent_conn)
+        self._all.add(worker)
+
+        return worker
+
+    def start(self) -> None:
+        """Inicia os workers, chamado na inicialização da aplicação para que a importação das bibliotecas ocorra antes da primeira execução."""
+        if self._idle is not None:
+            return
+
+        self._idle = asyncio.Queue()
+
+        for _ in range(self.workers):
+            self._idle.put_nowait(self._spawn())
+
+    def _replace(self, worker: SandboxWorker) -> SandboxWorker:
+        worker.kill()
+        self._all.discard(worker)
+
+        return self._spawn()
+
+    @staticmethod
+    def _receive(conn: Connection, timeout: float):
+        if not conn.poll(timeout):
+            raise TimeoutError
+
+        return conn.recv()
+
+    async def run(self, code: str, frame: SharedFrame | None = None) -> dict:
+        """Executa o código em um worker livre.
+
+        Args:
+            code (str): Código Python escrito pelo agente.
+            frame (SharedFrame | None, optional): DataFrame da sessão publicado na memória compartilhada, disponível como `df`.
+
+        Returns:
+            dict: Saída da execução (`output`) e os gráficos gerados (`graphs`) para gravação no banco de dados.
+        """
+        self.start()
+        worker = await self._idle.get()
+
+        try:
+            if not worker.ready:
+                await asyncio.to_thread(self._receive, worker.conn, STARTUP_TIMEOUT)
+                worker.ready = True
+
+            worker.conn.send({'code': code, 'frame': frame})
+
+            return await asyncio.to_thread(self._receive, worker.conn, self.timeout)
+        except TimeoutError:
+            print(f'\t>> Sandbox worker {worker.process.pid} timed out, replacing it.')
+            worker = self._replace(worker)
+
+            return {
+                'output': f'TimeoutError: Execution exceeded the limit of {self.timeout:g} seconds. Simplify the code or work on a smaller portion of the data.',
+                'graphs': [],
+            }
+        except asyncio.CancelledError:
+            # O worker pode continuar executando o código cancelado
+            worker = self._replace(worker)
+            raise
+        except (EOFError, OSError):
+            # Worker finalizado durante a execução (ex.: pelo sistema, por falta de memória)
+            print(f'\t>> Sandbox worker {worker.process.pid} died, replacing it.')
+            worker = self._replace(worker)
+
+            return {
+                'output': 'Error: The execution process was terminated, probably due to excessive memory usage.',
+                'graphs': [],
+            }
+        finally:
+            self._idle.put_nowait(worker)
+
+    def shutdown(self) -> None:
+        """Finaliza todos os workers, usado no encerramento da aplicação."""
+        for worker in self._all:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+
+            worker.process.join(timeout=1)
+
+            if worker.process.is_alive():
+                worker.kill()
+
+        self._all.clear()
+        self._idle = None
+
+
+sandbox_pool = SandboxPool()
@@ -0,0 +1,197 @@
+"""Publicação de DataFrames em memória compartilhada (Arrow IPC), lidos pelos processos workers sem cópia pelo pipe."""
+
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+
+import pandas as pd
+import pyarrow as pa
+
+# Formatos do conteúdo do segmento
+ARROW_FORMAT = 'arrow'
+PICKLE_FORMAT = 'pickle'
+# DataFrames anexados mantidos em cada worker, segmentos já substituídos permanecem em memória até serem removidos do cache
+WORKER_FRAME_CACHE = 2
+
+
+@dataclass(frozen=True, slots=True)
+class SharedFrame:
+    """Referência serializável a um DataFrame publicado, enviada aos workers no lugar dos dados."""
+
+    name: str
+    size: int
+    fingerprint: str
+    format: str = ARROW_FORMAT
+
+
+def _write_stream(sink, table: pa.Table) -> None:
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def write_frame(df: pd.DataFrame, fingerprint: str) -> tuple[SharedFrame, SharedMemory]:
+    """Serializa o DataFrame como um stream Arrow IPC diretamente em um novo segmento de memória compartilhada.
+
+    Colunas de objetos com tipos mistos não são representáveis no Arrow, nesse caso o DataFrame é serializado com pickle (protocolo 5) para manter os valores originais.
+
+    Args:
+        df (pd.DataFrame): DataFrame a ser publicado.
+        fingerprint (str): Identidade dos dados, usada pelos workers para reaproveitar o DataFrame já lido.
+
+    Returns:
+        tuple[SharedFrame, SharedMemory]: Referência enviada aos workers e o segmento, que deve ser liberado pelo processo que o criou.
+    """
+    try:
+        table = pa.Table.from_pandas(df)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        payload = pickle.dumps(df, protocol=5)
+        shm = SharedMemory(create=True, size=max(len(payload), 1))
+        shm.buf[: len(payload)] = payload
+
+        return SharedFrame(shm.name, len(payload), fingerprint, PICKLE_FORMAT), shm
+
+    # O tamanho do stream é calculado antes, evitando uma cópia intermediária do DataFrame serializado
+    mock = pa.MockOutputStream()
+    _write_stream(mock, table)
+    size = mock.size()
+
+    shm = SharedMemory(create=True, size=max(size, 1))
+    target = pa.py_buffer(shm.buf)
+    _write_stream(pa.FixedSizeBufferWriter(target), table)
+    # Libera a referência à memória do segmento, permitindo fechá-lo depois
+    del target
+
+    return SharedFrame(shm.name, size, fingerprint), shm
+
+
+def read_frame(frame: SharedFrame) -> tuple[pd.DataFrame, SharedMemory]:
+    """Anexa o segmento e reconstrói o DataFrame.
+
+    Colunas numéricas sem nulos referenciam diretamente a memória compartilhada, o segmento deve continuar aberto enquanto o DataFrame for usado.
+
+    Args:
+        frame (SharedFrame): Referência recebida do processo da API.
+
+    Returns:
+        tuple[pd.DataFrame, SharedMemory]: DataFrame (somente leitura, com copy-on-write) e o segmento anexado.
+    """
+    shm = SharedMemory(name=frame.name)
+    buffer = shm.buf[: frame.size]
+
+    if frame.format == PICKLE_FORMAT:
+        return pickle.loads(buffer), shm
+
+    table = pa.ipc.open_stream(pa.py_buffer(buffer)).read_all()
+
+    return table.to_pandas(split_blocks=True), shm
+
+
+def enable_copy_on_write() -> None:
+    """Ativa o copy-on-write do pandas nos workers: escritas em colunas compartilhadas criam cópias, sem alterar o segmento.
+
+    A partir do pandas 3 o comportamento é o padrão.
+    """
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option('mode.copy_on_write', True)
+
+
+class AttachedFrames:
+    """DataFrames anexados em um processo worker, reaproveitados entre execuções (LRU)."""
+
+    def __init__(self, max_frames: int):
+        self.max_frames = max_frames
+        self._frames: OrderedDict[str, tuple[pd.DataFrame, SharedMemory]] = (
+            OrderedDict()
+        )
+
+    def get(self, frame: SharedFrame) -> pd.DataFrame:
+        """Retorna uma cópia rasa do DataFrame publicado, anexando o segmento no primeiro uso.
+
+        A cópia rasa permite que o código altere o DataFrame sem afetar as próximas execuções.
+        """
+        if frame.name in self._frames:
+            self._frames.move_to_end(frame.name)
+        else:
+            while len(self._frames) >= self.max_frames:
+                self._evict()
+
+            self._frames[frame.name] = read_frame(frame)
+
+        return self._frames[frame.name][0].copy(deep=False)
+
+    def _evict(self) -> None:
+        _, (_, shm) = self._frames.popitem(last=False)
+
+        try:
+            shm.close()
+        except BufferError:
+            # Ainda referenciado por objetos da execução, liberado pelo coletor de lixo
+            pass
+
+    def clear(self) -> None:
+        while self._frames:
+            self._evict()
+
+
+class SharedFrameStore:
+    """Mantém o DataFrame publicado de cada sessão, republicando apenas quando os dados mudam."""
+
+    def __init__(self):
+        self._frames: dict[str, tuple[SharedFrame, SharedMemory]] = {}
+        # A publicação ocorre em threads (asyncio.to_thread)
+        self._lock = threading.Lock()
+
+    def publish(
+        self, session_id: str, fingerprint: str, df: pd.DataFrame
+    ) -> SharedFrame:
+        """Publica o DataFrame da sessão, reaproveitando o segmento se a identidade dos dados não mudou.
+
+        Args:
+            session_id (str): Identificador da sessão atual.
+            fingerprint (str): Identidade dos dados da sessão.
+            df (pd.DataFrame): DataFrame da sessão.
+
+        Returns:
+            SharedFrame: Referência ao segmento com os dados.
+        """
+        with self._lock:
+            published = self._frames.get(session_id)
+
+            if published is not None and published[0].fingerprint == fingerprint:
+                return published[0]
+
+            frame, shm = write_frame(df, fingerprint)
+            self._frames[session_id] = (frame, shm)
+
+        if published is not None:
+            self._unlink(published[1])
+
+        return frame
+
+    @staticmethod
+    def _unlink(shm: SharedMemory) -> None:
+        # Workers que ainda mantêm o segmento anexado continuam com acesso até fechá-lo
+        shm.close()
+
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def release(self, session_id: str) -> None:
+        """Remove o DataFrame publicado da sessão."""
+        with self._lock:
+            published = self._frames.pop(session_id, None)
+
+        if published is not None:
+            self._unlink(published[1])
+
+    def close(self) -> None:
+        """Remove todos os segmentos, usado no encerramento da aplicação."""
+        for session_id in list(self._frames):
+            self.release(session_id)
+
+
+shared_frames = SharedFrameStore()
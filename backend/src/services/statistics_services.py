@@ -0,0 +1,462 @@
+"""Estatísticas vetorizadas sobre o DataFrame da sessão: agregações por grupos, tabelas dinâmicas, séries temporais, janelas móveis e percentis.
+
+As agregações combináveis (contagem, soma, média, mínimo, máximo, desvio padrão e variância) são calculadas em blocos de linhas e combinadas ao final, limitando a memória intermediária em grandes volumes.
+"""
+
+import re
+import warnings
+from collections.abc import Callable, Iterator
+
+import numpy as np
+import pandas as pd
+
+# Linhas processadas por bloco nas agregações combináveis
+STATS_CHUNK_ROWS = 1_000_000
+COMBINABLE_AGGREGATIONS = ('count', 'sum', 'mean', 'min', 'max', 'std', 'var')
+# Agregações que dependem de todos os valores do grupo, calculadas em uma única passada
+HOLISTIC_AGGREGATIONS = ('median', 'nunique')
+ROLLING_STATISTICS = ('mean', 'sum', 'min', 'max', 'std', 'median')
+DEFAULT_PERCENTILES = (0.25, 0.5, 0.75, 0.9, 0.95, 0.99)
+PIVOT_MAX_COLUMNS = 50
+FREQUENCIES = {
+    'd': 'D',
+    'day': 'D',
+    'daily': 'D',
+    'w': 'W',
+    'week': 'W',
+    'weekly': 'W',
+    'm': 'M',
+    'month': 'M',
+    'monthly': 'M',
+    'q': 'Q',
+    'quarter': 'Q',
+    'quarterly': 'Q',
+    'y': 'Y',
+    'year': 'Y',
+    'yearly': 'Y',
+    'annual': 'Y',
+}
+# Prefixos de data em texto (ISO e dia/mês/ano) e o formato de cada um
+DATE_PREFIXES = (
+    (re.compile(r'\d{4}-\d{2}-\d{2}'), '%Y-%m-%d'),
+    (re.compile(r'\d{2}/\d{2}/\d{4}'), '%d/%m/%Y'),
+)
+EMPTY_DATA = 'DataFrame empty, no data to analyse.'
+
+
+def _validate_columns(
+    df: pd.DataFrame, columns: list[str], numeric: list[str] | None = None
+) -> str | None:
+    """Retorna a mensagem de erro para colunas inexistentes ou não numéricas, ou None."""
+    missing = [column for column in columns if column not in df.columns]
+
+    if missing:
+        return f'Error: Column(s) {missing} not found in the dataset.'
+
+    non_numeric = [
+        column
+        for column in numeric or []
+        if not pd.api.types.is_numeric_dtype(df[column])
+    ]
+
+    if non_numeric:
+        return f'Error: Column(s) {non_numeric} must be numeric.'
+
+    return None
+
+
+def _chunks(df: pd.DataFrame) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(df), STATS_CHUNK_ROWS):
+        yield df.iloc[start : start + STATS_CHUNK_ROWS]
+
+
+def _partial_stats(values: pd.DataFrame, keys: list[pd.Series]) -> dict:
+    """Estatísticas parciais de um bloco, com a soma dos quadrados dos desvios (M2) para combinar variâncias de forma estável."""
+    grouped = values.groupby(keys, observed=True, sort=False)
+    count = grouped.count()
+
+    return {
+        'rows': grouped.size(),
+        'count': count,
+        'sum': grouped.sum(),
+        'mean': grouped.mean(),
+        'm2': grouped.var(ddof=0) * count,
+        'min': grouped.min(),
+        'max': grouped.max(),
+    }
+
+
+def _combine_stats(partials: list[dict]) -> dict:
+    """Combina as estatísticas parciais dos blocos (algoritmo paralelo de Chan para a variância)."""
+    if len(partials) == 1:
+        return partials[0]
+
+    def stack(name: str):
+        return pd.concat([partial[name] for partial in partials])
+
+    levels = list(range(partials[0]['rows'].index.nlevels))
+    counts = stack('count')
+    means = stack('mean').fillna(0)
+
+    count = counts.groupby(level=levels).sum()
+    mean = (means * counts).groupby(level=levels).sum() / count
+    deviation = (means - mean.reindex(means.index)) ** 2 * counts
+    m2 = (stack('m2').fillna(0) + deviation.fillna(0)).groupby(level=levels).sum()
+
+    return {
+        'rows': stack('rows').groupby(level=levels).sum(),
+        'count': count,
+        'sum': stack('sum').groupby(level=levels).sum(),
+        'mean': mean,
+        'm2': m2,
+        'min': stack('min').groupby(level=levels).min(),
+        'max': stack('max').groupby(level=levels).max(),
+    }
+
+
+def _finalize_stats(stats: dict, aggregation: str) -> pd.DataFrame:
+    if aggregation in ('count', 'sum', 'mean', 'min', 'max'):
+        return stats[aggregation]
+
+    variance = (stats['m2'] / (stats['count'] - 1)).where(stats['count'] > 1)
+
+    return np.sqrt(variance) if aggregation == 'std' else variance
+
+
+def _streaming_aggregate(
+    df: pd.DataFrame,
+    value_columns: list[str],
+    aggregations: list[str],
+    build_keys: Callable[[pd.DataFrame], list[pd.Series]],
+) -> pd.DataFrame | None:
+    """Agrega as colunas por blocos de linhas, com as chaves de agrupamento geradas por bloco.
+
+    Args:
+        df (pd.DataFrame): DataFrame da sessão.
+        value_columns (list[str]): Colunas agregadas.
+        aggregations (list[str]): Agregações combináveis (`COMBINABLE_AGGREGATIONS`).
+        build_keys (Callable): Gera as chaves de agrupamento do bloco, valores nulos são descartados.
+
+    Returns:
+        pd.DataFrame | None: Uma linha por grupo com a quantidade de linhas (`rows`) e as colunas `<coluna>_<agregação>`, ou None sem grupos válidos.
+    """
+    partials = [
+        _partial_stats(chunk[value_columns], build_keys(chunk)) for chunk in _chunks(df)
+    ]
+    partials = [partial for partial in partials if len(partial['rows'])]
+
+    if not partials:
+        return None
+
+    stats = _combine_stats(partials)
+    results = {'rows': stats['rows']}
+
+    for aggregation in aggregations:
+        finalized = _finalize_stats(stats, aggregation)
+
+        for column in value_columns:
+            results[f'{column}_{aggregation}'] = finalized[column]
+
+    result = pd.DataFrame(results)
+    ordered = ['rows'] + [
+        f'{column}_{aggregation}'
+        for column in value_columns
+        for aggregation in aggregations
+    ]
+
+    return result[ordered].sort_index()
+
+
+def group_aggregate(
+    df: pd.DataFrame,
+    group_by: list[str],
+    value_columns: list[str],
+    aggregations: list[str],
+    sort_by: str | None = None,
+    ascending: bool = False,
+    limit: int | None = None,
+) -> pd.DataFrame | str:
+    """Agrega colunas numéricas por uma ou mais chaves (ex.: soma do vNF por UF e CFOP)."""
+    if df is None or df.empty:
+        return EMPTY_DATA
+
+    unknown = sorted(
+        set(aggregations) - set(COMBINABLE_AGGREGATIONS) - set(HOLISTIC_AGGREGATIONS)
+    )
+
+    if unknown:
+        return f'Error: Unsupported aggregation(s) {unknown}. Use {list(COMBINABLE_AGGREGATIONS + HOLISTIC_AGGREGATIONS)}.'
+
+    if error := _validate_columns(df, group_by + value_columns, value_columns):
+        return error
+
+    combinable = [agg for agg in aggregations if agg in COMBINABLE_AGGREGATIONS]
+    holistic = [agg for agg in aggregations if agg in HOLISTIC_AGGREGATIONS]
+
+    result = _streaming_aggregate(
+        df,
+        value_columns,
+        combinable,
+        lambda chunk: [chunk[column] for column in group_by],
+    )
+
+    if result is None:
+        return 'No groups found, the group columns have only null values.'
+
+    if holistic:
+        grouped = df[value_columns].groupby(
+            [df[column] for column in group_by], observed=True
+        )
+        extra = grouped.agg(holistic)
+        extra.columns = [f'{column}_{aggregation}' for column, aggregation in extra]
+        result = result.join(extra)
+        result = result[
+            ['rows']
+            + [
+                f'{column}_{aggregation}'
+                for column in value_columns
+                for aggregation in aggregations
+            ]
+        ]
+
+    if sort_by:
+        if sort_by not in result.columns:
+            return f'Error: sort_by must be one of {result.columns.tolist()}.'
+
+        result = result.sort_values(sort_by, ascending=ascending)
+
+    if limit:
+        result = result.head(limit)
+
+    return result.reset_index()
+
+
+def pivot_table(
+    df: pd.DataFrame,
+    index: list[str],
+    columns: str,
+    values: str,
+    aggregation: str = 'sum',
+) -> pd.DataFrame | str:
+    """Tabela dinâmica com as categorias de `columns` nas colunas (ex.: vNF mensal por UF)."""
+    if df is None or df.empty:
+        return EMPTY_DATA
+
+    if aggregation not in COMBINABLE_AGGREGATIONS:
+        return f'Error: Unsupported aggregation "{aggregation}". Use {list(COMBINABLE_AGGREGATIONS)}.'
+
+    if error := _validate_columns(df, index + [columns, values], [values]):
+        return error
+
+    n_columns = df[columns].nunique()
+
+    if n_columns > PIVOT_MAX_COLUMNS:
+        return f'Error: Column "{columns}" has {n_columns} categories (limit {PIVOT_MAX_COLUMNS}). Use group_aggregate instead.'
+
+    result = _streaming_aggregate(
+        df,
+        [values],
+        [aggregation],
+        lambda chunk: [chunk[column] for column in index + [columns]],
+    )
+
+    if result is None:
+        return 'No groups found, the index and column values are null.'
+
+    table = result[f'{values}_{aggregation}'].unstack(columns)
+
+    if aggregation in ('sum', 'count'):
+        table = table.fillna(0)
+
+    table.columns = table.columns.astype(str)
+
+    return table.reset_index()
+
+
+def _to_dates(series: pd.Series) -> pd.Series:
+    """Converte a coluna de datas, aceitando datas no formato brasileiro (dia/mês/ano) e ISO com fuso horário (ex.: dhEmi da NF-e).
+
+    Os períodos têm no mínimo um dia, então textos nos formatos conhecidos têm apenas a data interpretada. As datas se repetem entre as linhas e são convertidas uma única vez pelo cache do `pd.to_datetime`, evitando a conversão lenta de horários com fuso.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        parsed = series
+    else:
+        valid = series.notna()
+        sample = series.iloc[valid.argmax()] if valid.any() else None
+
+        for pattern, date_format in DATE_PREFIXES:
+            if isinstance(sample, str) and pattern.match(sample):
+                return pd.to_datetime(
+                    series.str.slice(0, 10), format=date_format, errors='coerce'
+                )
+
+        # O formato é inferido do primeiro valor, com dayfirst datas iniciadas pelo ano seriam lidas como ano/dia/mês
+        dayfirst = not (isinstance(sample, str) and re.match(r'\d{4}', sample))
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            parsed = pd.to_datetime(series, errors='coerce', dayfirst=dayfirst)
+
+            if not pd.api.types.is_datetime64_any_dtype(parsed):
+                # Fusos horários diferentes na mesma coluna
+                parsed = pd.to_datetime(
+                    series, errors='coerce', dayfirst=dayfirst, utc=True
+                )
+
+    if isinstance(parsed.dtype, pd.DatetimeTZDtype):
+        # Mantém o horário local da emissão
+        parsed = parsed.dt.tz_localize(None)
+
+    return parsed
+
+
+def _resample(
+    df: pd.DataFrame,
+    date_column: str,
+    value_columns: list[str],
+    frequency: str,
+    aggregations: list[str],
+    group_by: list[str],
+) -> pd.DataFrame | str:
+    period = FREQUENCIES.get(frequency.strip().lower())
+
+    if period is None:
+        return f'Error: Unsupported frequency "{frequency}". Use day, week, month, quarter or year.'
+
+    unknown = sorted(set(aggregations) - set(COMBINABLE_AGGREGATIONS))
+
+    if unknown:
+        return f'Error: Unsupported aggregation(s) {unknown}. Use {list(COMBINABLE_AGGREGATIONS)}.'
+
+    if error := _validate_columns(
+        df, [date_column] + value_columns + group_by, value_columns
+    ):
+        return error
+
+    def build_keys(chunk: pd.DataFrame) -> list[pd.Series]:
+        dates = _to_dates(chunk[date_column])
+
+        return [dates.dt.to_period(period).rename('period')] + [
+            chunk[column] for column in group_by
+        ]
+
+    result = _streaming_aggregate(df, value_columns, aggregations, build_keys)
+
+    if result is None:
+        return f'Error: Column "{date_column}" has no valid dates.'
+
+    if not group_by:
+        # Períodos sem registros aparecem na série com contagem e soma zeradas
+        result = result.reindex(
+            pd.period_range(result.index.min(), result.index.max(), freq=period)
+        )
+        zero_columns = ['rows'] + [
+            column for column in result.columns if column.endswith(('_count', '_sum'))
+        ]
+        result[zero_columns] = result[zero_columns].fillna(0)
+        count_columns = ['rows'] + [
+            column for column in result.columns if column.endswith('_count')
+        ]
+        result[count_columns] = result[count_columns].astype('int64')
+        result.index.name = 'period'
+
+    result = result.reset_index()
+    result['period'] = result['period'].astype(str)
+
+    return result
+
+
+def resample_time_series(
+    df: pd.DataFrame,
+    date_column: str,
+    value_columns: list[str],
+    frequency: str = 'month',
+    aggregations: list[str] | None = None,
+    group_by: list[str] | None = None,
+) -> pd.DataFrame | str:
+    """Agrega as colunas por período (ex.: total diário ou mensal do vNF), opcionalmente por grupos."""
+    if df is None or df.empty:
+        return EMPTY_DATA
+
+    return _resample(
+        df,
+        date_column,
+        value_columns,
+        frequency,
+        aggregations or ['sum'],
+        group_by or [],
+    )
+
+
+def rolling_window(
+    df: pd.DataFrame,
+    date_column: str,
+    value_column: str,
+    window: int,
+    frequency: str = 'day',
+    aggregation: str = 'sum',
+    statistic: str = 'mean',
+) -> pd.DataFrame | str:
+    """Janela móvel sobre a série agregada por período (ex.: média móvel de 3 meses do total mensal do vNF)."""
+    if df is None or df.empty:
+        return EMPTY_DATA
+
+    if window <= 0:
+        return f'Error: window must be a positive number of periods, received {window}.'
+
+    if statistic not in ROLLING_STATISTICS:
+        return f'Error: Unsupported statistic "{statistic}". Use {list(ROLLING_STATISTICS)}.'
+
+    series = _resample(df, date_column, [value_column], frequency, [aggregation], [])
+
+    if isinstance(series, str):
+        return series
+
+    value = f'{value_column}_{aggregation}'
+    series[f'{value}_rolling_{statistic}_{window}'] = (
+        series[value].rolling(window, min_periods=1).agg(statistic)
+    )
+
+    return series.drop(columns='rows')
+
+
+def compute_percentiles(
+    df: pd.DataFrame,
+    columns: list[str],
+    percentiles: list[float] | None = None,
+    group_by: list[str] | None = None,
+) -> pd.DataFrame | str:
+    """Percentis exatos das colunas numéricas, por grupos ou no total. Aceita percentis em fração (0.9) ou percentual (90), a unidade é a mesma para toda a lista."""
+    if df is None or df.empty:
+        return EMPTY_DATA
+
+    group_by = group_by or []
+    quantiles = list(percentiles or DEFAULT_PERCENTILES)
+
+    # Com algum valor acima de 1 a lista está em percentual: [1, 5, 50] são p1, p5 e p50, não p100
+    if any(q > 1 for q in quantiles):
+        quantiles = [q / 100 for q in quantiles]
+
+    if any(q < 0 or q > 1 for q in quantiles):
+        return 'Error: Percentiles must be between 0 and 100.'
+
+    if error := _validate_columns(df, columns + group_by, columns):
+        return error
+
+    labels = {q: f'p{q * 100:g}' for q in quantiles}
+
+    if not group_by:
+        result = df[columns].quantile(quantiles)
+        result.index = [labels[q] for q in result.index]
+
+        return result
+
+    result = (
+        df[columns]
+        .groupby([df[column] for column in group_by], observed=True)
+        .quantile(quantiles)
+        .unstack(level=-1)
+    )
+    result.columns = [f'{column}_{labels[q]}' for column, q in result.columns]
+
+    return result.reset_index()
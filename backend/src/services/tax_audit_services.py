@@ -0,0 +1,287 @@
+"""Auditoria fiscal em lote do DataFrame da sessão (exportações de itens de NF-e em CSV/XLSX) com o motor de regras vetorizado."""
+
+import asyncio
+import math
+import re
+import unicodedata
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from src.controllers.websocket_controller import manager
+from src.data import StatusUpdate
+from src.services.data_processing_services import session_manager
+from src.services.file_reader_services import get_ingestion_pool
+from src.services.metrics_services import metrics
+from src.services.tax_rules_services import (
+    ITEM_CODE_FIELDS,
+    ITEM_VALUE_FIELDS,
+    NOTE_HEADER_COMPONENTS,
+    TAX_RULES,
+    audit_chunk,
+    skipped_rules,
+)
+from src.settings import settings
+from src.utils.exceptions import AuditColumnsNotFoundException, DataNotFoundException
+
+# Nomes comuns de colunas em exportações de ERPs, já normalizados (minúsculas, sem acentos e separadores)
+COLUMN_ALIASES = {
+    'chave': 'chNFe',
+    'chaveacesso': 'chNFe',
+    'chavedeacesso': 'chNFe',
+    'chavenfe': 'chNFe',
+    'item': 'nItem',
+    'numeroitem': 'nItem',
+    'cst': 'CST_CSOSN',
+    'csticms': 'CST_CSOSN',
+    'csosn': 'CST_CSOSN',
+    'valorproduto': 'vProd',
+    'valorprodutos': 'vProd',
+    'baseicms': 'vBCICMS',
+    'bcicms': 'vBCICMS',
+    'aliquotaicms': 'pICMS',
+    'valoricms': 'vICMS',
+    'valoricmsst': 'vICMSST',
+    'baseipi': 'vBCIPI',
+    'bcipi': 'vBCIPI',
+    'aliquotaipi': 'pIPI',
+    'valoripi': 'vIPI',
+    'basepis': 'vBCPIS',
+    'bcpis': 'vBCPIS',
+    'aliquotapis': 'pPIS',
+    'valorpis': 'vPIS',
+    'basecofins': 'vBCCOFINS',
+    'bccofins': 'vBCCOFINS',
+    'aliquotacofins': 'pCOFINS',
+    'valorcofins': 'vCOFINS',
+    'valortotalnota': 'vNF',
+    'valornota': 'vNF',
+    'regimetributario': 'CRT',
+}
+# Campos reconhecidos diretamente pelo nome normalizado (ex.: 'v_icms' -> 'vICMS')
+AUDIT_FIELDS = (
+    'chNFe',
+    'nItem',
+    'CRT',
+    'indTot',
+    'vNF',
+    *ITEM_CODE_FIELDS,
+    *ITEM_VALUE_FIELDS,
+    *NOTE_HEADER_COMPONENTS,
+)
+FIELD_NAMES = {re.sub(r'[^a-z0-9]', '', field.lower()): field for field in AUDIT_FIELDS}
+
+
+def _normalize_column(column) -> str:
+    text = unicodedata.normalize('NFKD', str(column).lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+
+    return re.sub(r'[^a-z0-9]', '', text)
+
+
+def map_audit_columns(columns: pd.Index) -> dict[str, str]:
+    """Relaciona as colunas do DataFrame aos campos usados pelas regras fiscais.
+
+    Args:
+        columns (pd.Index): Colunas do DataFrame da sessão.
+
+    Returns:
+        dict[str, str]: Mapeamento da coluna original para o campo (ex.: `{'Valor ICMS': 'vICMS'}`), o primeiro match de cada campo é mantido.
+    """
+    mapping = {}
+
+    for column in columns:
+        normalized = _normalize_column(column)
+        field = FIELD_NAMES.get(normalized) or COLUMN_ALIASES.get(normalized)
+
+        if field and field not in mapping.values():
+            mapping[column] = field
+
+    return mapping
+
+
+def _split_chunks(df: pd.DataFrame, chunk_rows: int) -> list[pd.DataFrame]:
+    """Divide as linhas em blocos, mantendo todos os itens de uma nota no mesmo bloco para a conferência do total."""
+    n_chunks = max(1, math.ceil(len(df) / chunk_rows))
+
+    if n_chunks == 1:
+        return [df]
+
+    if 'chNFe' in df:
+        codes, _ = pd.factorize(df['chNFe'])
+        chunk_ids = codes % n_chunks
+    else:
+        chunk_ids = np.arange(len(df)) // chunk_rows
+
+    return [chunk for _, chunk in df.groupby(chunk_ids, sort=False)]
+
+
+class TaxAuditService:
+    """Executa a auditoria fiscal do DataFrame da sessão em blocos paralelos no pool de processos de ingestão e guarda o resultado na sessão."""
+
+    def __init__(self, chunk_rows: int | None = None):
+        self.chunk_rows = chunk_rows or settings.tax_audit_chunk_rows
+
+    @staticmethod
+    def _summarize(
+        df: pd.DataFrame,
+        findings: pd.DataFrame,
+        mismatches: pd.DataFrame | None,
+        skipped: list[dict],
+        elapsed: float,
+        chunks: int,
+    ) -> dict:
+        difference = (findings['found'] - findings['expected']).abs()
+
+        return {
+            'rows_audited': len(df),
+            'invoices': int(df['chNFe'].nunique()) if 'chNFe' in df else None,
+            'flagged_rows': int(findings['row'].nunique()),
+            'inconsistencies': len(findings),
+            'by_tax': findings['tax'].value_counts().to_dict(),
+            'by_error_type': findings['error_type'].value_counts().to_dict(),
+            'tax_difference': round(float(difference.sum()), 2),
+            'tax_difference_by_tax': difference.groupby(findings['tax'])
+            .sum()
+            .round(2)
+            .to_dict(),
+            'note_total_mismatches': None if mismatches is None else len(mismatches),
+            # Regras não avaliadas por falta de colunas, sem achados presumidos com valores zerados
+            'skipped_rules': skipped,
+            'elapsed_seconds': round(elapsed, 3),
+            'chunks': chunks,
+        }
+
+    async def audit_session(
+        self,
+        session_id: str,
+        *,
+        is_simples_nacional: bool = False,
+        rates_as_percentage: bool = True,
+    ) -> dict:
+        """Audita todos os itens do DataFrame da sessão e armazena as linhas sinalizadas e o resumo no SessionManager.
+
+        Args:
+            session_id (str): Identificador da sessão atual.
+            is_simples_nacional (bool, optional): Regime do emitente quando a planilha não possui a coluna CRT.
+            rates_as_percentage (bool, optional): Se as alíquotas estão em percentual (18.00) ou em decimal (0.18).
+
+        Raises:
+            DataNotFoundException: Quando a sessão não possui um DataFrame.
+            AuditColumnsNotFoundException: Quando as colunas reconhecidas não permitem avaliar nenhuma regra nem o total das notas.
+
+        Returns:
+            dict: Resumo da auditoria e o mapeamento de colunas usado.
+        """
+        df = await session_manager.get_df(session_id)
+
+        if df is None or df.empty:
+            raise DataNotFoundException
+
+        mapping = map_audit_columns(df.columns)
+        skipped = skipped_rules(set(mapping.values()))
+        checks_totals = {'chNFe', 'vNF'} <= set(mapping.values())
+
+        if len(skipped) == len(TAX_RULES) and not checks_totals:
+            raise AuditColumnsNotFoundException
+
+        await manager.send_status_update(session_id, StatusUpdate.TAX_AUDIT_INIT)
+        start = perf_counter()
+
+        source = df[list(mapping)].rename(columns=mapping)
+        source.insert(0, 'row', np.arange(len(source)))
+        chunks = _split_chunks(source, self.chunk_rows)
+
+        if len(chunks) == 1:
+            results = [
+                await asyncio.to_thread(
+                    audit_chunk, chunks[0], is_simples_nacional, rates_as_percentage
+                )
+            ]
+        else:
+            loop = asyncio.get_running_loop()
+            pool = get_ingestion_pool()
+            results = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        pool,
+                        audit_chunk,
+                        chunk,
+                        is_simples_nacional,
+                        rates_as_percentage,
+                    )
+                    for chunk in chunks
+                )
+            )
+
+        findings = pd.concat([result[0] for result in results], ignore_index=True)
+        findings = findings.sort_values('row', kind='stable', ignore_index=True)
+
+        mismatches = None
+        totals = [result[1] for result in results if result[1] is not None]
+
+        if totals:
+            totals = pd.concat(totals)
+            mismatches = totals[totals['is_mismatch']].reset_index()
+
+        elapsed = perf_counter() - start
+        summary = self._summarize(
+            source, findings, mismatches, skipped, elapsed, len(chunks)
+        )
+
+        session_manager.insert_audit(
+            session_id,
+            {
+                'summary': summary,
+                'columns': mapping,
+                'findings': findings,
+                'note_totals': mismatches,
+            },
+        )
+        metrics.observe('tax_audit.latency', elapsed)
+        metrics.increment('tax_audit.rows', len(source))
+
+        await manager.send_status_update(session_id, StatusUpdate.TAX_AUDIT_FINISH)
+
+        return {'summary': summary, 'columns': mapping}
+
+    @staticmethod
+    def get_results(
+        session_id: str, offset: int = 0, limit: int | None = None
+    ) -> dict | None:
+        """Retorna o resumo e uma página das linhas sinalizadas na última auditoria da sessão.
+
+        Args:
+            session_id (str): Identificador da sessão atual.
+            offset (int, optional): Primeira inconsistência retornada.
+            limit (int | None, optional): Quantidade de inconsistências retornadas. Padrão é `settings.tax_audit_preview_rows`.
+
+        Returns:
+            dict | None: Resumo, página de inconsistências, notas com total divergente e se o DataFrame mudou desde a auditoria, ou None sem auditoria.
+        """
+        audit = session_manager.get_audit(session_id)
+
+        if audit is None:
+            return None
+
+        limit = limit or settings.tax_audit_preview_rows
+        findings: pd.DataFrame = audit['findings']
+        mismatches: pd.DataFrame | None = audit['note_totals']
+
+        return {
+            'summary': audit['summary'],
+            'is_outdated': audit['fingerprint']
+            != session_manager.get_fingerprint(session_id),
+            'offset': offset,
+            'total': len(findings),
+            'inconsistencies': findings.iloc[offset : offset + limit]
+            .round({'expected': 2, 'found': 2})
+            .to_dict(orient='records'),
+            'note_total_mismatches': []
+            if mismatches is None
+            else mismatches.head(limit).to_dict(orient='records'),
+        }
+
+
+tax_audit_service = TaxAuditService()
@@ -0,0 +1,647 @@
+"""Motor de regras fiscais (ICMS, IPI, PIS, COFINS e total da nota) orientado a tabelas e executado de forma vetorizada sobre DataFrames de itens."""
+
+from collections.abc import Collection
+from dataclasses import dataclass
+from itertools import groupby
+
+import numpy as np
+import pandas as pd
+
+# Tolerância de casas decimais para erros em cálculo de impostos
+TOLERANCE = 0.01
+# Margem para o ruído de ponto flutuante na comparação com a tolerância
+FLOAT_EPSILON = 1e-9
+
+# Tipos de verificação das regras
+CALCULATION = 'calculation'  # valor destacado diferente de base x alíquota
+HIGHLIGHTED_CALCULATION = 'highlighted_calculation'  # idem, apenas quando há destaque
+HIGHLIGHT = 'highlight'  # destaque proibido
+HIGHLIGHT_OR_BASE = 'highlight_or_base'  # destaque ou base de cálculo proibidos
+
+# Regimes em que a regra se aplica
+SIMPLES_NACIONAL = 'simples_nacional'
+ANY_REGIME = 'any'
+
+# Campos de cada tributo nos itens, com os nomes do payload de NF-e: (código, base, alíquota, valor)
+TAX_FIELDS = {
+    'ICMS': ('CST_CSOSN', 'vBCICMS', 'pICMS', 'vICMS'),
+    'IPI': ('CST_IPI', 'vBCIPI', 'pIPI', 'vIPI'),
+    'PIS': ('CST_PIS', 'vBCPIS', 'pPIS', 'vPIS'),
+    'COFINS': ('CST_COFINS', 'vBCCOFINS', 'pCOFINS', 'vCOFINS'),
+}
+ITEM_VALUE_FIELDS = (
+    'vProd',
+    'vICMSST',
+    'vIPIDevol',
+    *(field for fields in TAX_FIELDS.values() for field in fields[1:]),
+)
+ITEM_CODE_FIELDS = tuple(fields[0] for fields in TAX_FIELDS.values())
+ITEM_RATE_FIELDS = tuple(fields[2] for fields in TAX_FIELDS.values())
+# Regimes tributários (CRT) do Simples Nacional e MEI
+SIMPLES_NACIONAL_CRTS = ('1', '4')
+# CSOSN do Simples Nacional que permitem destaque de ICMS
+SN_ICMS_CREDIT_CSOSNS = ('101', '201', '900')
+
+# Componentes do valor total da nota (vNF) e seus sinais, somados dos itens ou lidos do cabeçalho
+NOTE_ITEM_COMPONENTS = {'vProd': 1, 'vIPI': 1, 'vICMSST': 1, 'vIPIDevol': 1}
+NOTE_HEADER_COMPONENTS = {'vFrete': 1, 'vSeg': 1, 'vOutro': 1, 'vDesc': -1}
+
+FINDING_COLUMNS = ['tax', 'code', 'error_type', 'detail', 'expected', 'found']
+
+
+@dataclass(frozen=True, slots=True)
+class TaxRule:
+    """Regra fiscal aplicada aos itens do tributo.
+
+    Regras do mesmo tributo e etapa são avaliadas em conjunto. Com `claims`, os itens em que a regra se aplica (com ou sem erro) não seguem para as etapas seguintes, com `stops` apenas os itens com erro.
+    """
+
+    tax: str
+    error_type: str
+    detail: str
+    check: str
+    codes: tuple[str, ...] | None = None
+    exclude_codes: tuple[str, ...] = ()
+    regime: str = ANY_REGIME
+    group: str = ''
+    stage: int = 0
+    claims: bool = False
+    stops: bool = False
+    tolerance: float = TOLERANCE
+
+
+TAX_RULES = (
+    # ICMS no Simples Nacional: destaque proibido, exceto nos CSOSN com crédito
+    TaxRule(
+        'ICMS',
+        'SN_TAX_HIGHLIGHT_ERROR',
+        'Undue ICMS highlight for the tax regime.',
+        HIGHLIGHT,
+        exclude_codes=SN_ICMS_CREDIT_CSOSNS,
+        regime=SIMPLES_NACIONAL,
+        group='ICMS',
+        claims=True,
+    ),
+    TaxRule(
+        'ICMS',
+        'CALCULATION_INCONSISTENCY',
+        'Calculated ICMS diverges from the highlighted value.',
+        CALCULATION,
+        codes=('00',),
+        group='ICMS',
+        stage=1,
+    ),
+    TaxRule(
+        'ICMS',
+        'UNDUE_TAX_ERROR',
+        'ICMS highlight in an exempt/non-taxable operation.',
+        HIGHLIGHT_OR_BASE,
+        codes=('40', '41', '50', '51'),
+        group='ICMS',
+        stage=1,
+    ),
+    TaxRule(
+        'ICMS',
+        'ICMS_ST_ERROR',
+        'Undue ICMS highlight (previously charged via ST).',
+        HIGHLIGHT,
+        codes=('60',),
+        group='ICMS',
+        stage=1,
+    ),
+    # Demais CSTs (10, 20, 30, 70, 90) exigem base reduzida ou ST, apenas a base x alíquota é conferida
+    TaxRule(
+        'ICMS',
+        'ATTENTION_CALCULATION',
+        'ICMS calculation requires verification of Reduced Base/ST.',
+        HIGHLIGHTED_CALCULATION,
+        exclude_codes=('00', '40', '41', '50', '51', '60'),
+        group='ICMS',
+        stage=1,
+    ),
+    # Tributos federais no Simples Nacional: itens com destaque indevido não seguem para as demais regras
+    *(
+        TaxRule(
+            tax,
+            f'{tax}_ERROR',
+            f'Undue {tax} highlight for Simples Nacional.',
+            HIGHLIGHT,
+            regime=SIMPLES_NACIONAL,
+            group='FEDERAL',
+            stops=True,
+        )
+        for tax in ('IPI', 'PIS', 'COFINS')
+    ),
+    TaxRule(
+        'IPI',
+        'IPI_INCONSISTENCY',
+        'IPI calculation diverges from expected.',
+        CALCULATION,
+        codes=('50',),
+        group='FEDERAL',
+        stage=1,
+    ),
+    *(
+        TaxRule(
+            tax,
+            f'{tax}_INCONSISTENCY',
+            f'{tax} calculation diverges from expected.',
+            CALCULATION,
+            codes=('01',),
+            group='FEDERAL',
+            stage=1,
+        )
+        for tax in ('PIS', 'COFINS')
+    ),
+    *(
+        TaxRule(
+            tax,
+            f'{tax}_ERROR',
+            f'{tax} highlight in an Exempt operation (CST 04).',
+            HIGHLIGHT,
+            codes=('04',),
+            group='FEDERAL',
+            stage=1,
+        )
+        for tax in ('PIS', 'COFINS')
+    ),
+)
+
+
+def _compile_rules(
+    rules: tuple[TaxRule, ...],
+) -> dict[str, list[list[TaxRule]]]:
+    """Organiza as regras por grupo e etapa, na ordem de avaliação."""
+    plan = {}
+
+    for group, group_rules in groupby(
+        sorted(rules, key=lambda rule: rule.group), key=lambda rule: rule.group
+    ):
+        group_rules = sorted(group_rules, key=lambda rule: rule.stage)
+        plan[group] = [
+            list(stage_rules)
+            for _, stage_rules in groupby(group_rules, key=lambda rule: rule.stage)
+        ]
+
+    return plan
+
+
+RULE_PLAN = _compile_rules(TAX_RULES)
+
+
+def rule_fields(rule: TaxRule) -> tuple[str, ...]:
+    """Campos dos itens lidos pela regra: código (quando filtra por CST/CSOSN), valor destacado e, conforme a verificação, base e alíquota."""
+    code_field, base_field, rate_field, value_field = TAX_FIELDS[rule.tax]
+    fields = [value_field]
+
+    if rule.codes is not None or rule.exclude_codes:
+        fields.insert(0, code_field)
+
+    if rule.check in (CALCULATION, HIGHLIGHTED_CALCULATION):
+        fields += [base_field, rate_field]
+    elif rule.check == HIGHLIGHT_OR_BASE:
+        fields.append(base_field)
+
+    return tuple(fields)
+
+
+def skipped_rules(fields: Collection[str]) -> list[dict]:
+    """Lista as regras que não podem ser avaliadas com os campos disponíveis.
+
+    Args:
+        fields (Collection[str]): Campos presentes nos itens (ex.: colunas mapeadas de uma planilha).
+
+    Returns:
+        list[dict]: Tributo, tipo de erro e campos ausentes de cada regra ignorada.
+    """
+    skipped = []
+
+    for rule in TAX_RULES:
+        missing = [field for field in rule_fields(rule) if field not in fields]
+
+        if missing:
+            skipped.append(
+                {
+                    'tax': rule.tax,
+                    'error_type': rule.error_type,
+                    'missing_fields': missing,
+                }
+            )
+
+    return skipped
+
+
+def prepare_items(
+    items: list[dict] | pd.DataFrame,
+    *,
+    is_simples_nacional: bool = False,
+    rates_as_percentage: bool = True,
+) -> pd.DataFrame:
+    """Converte os itens em um DataFrame com valores numéricos, códigos normalizados e alíquotas em decimal.
+
+    Args:
+        items (list[dict] | pd.DataFrame): Itens com os campos do payload de NF-e (nItem, CST_CSOSN, vBCICMS, pICMS, vICMS, ...), também aceita DataFrames com tipos do Arrow.
+        is_simples_nacional (bool, optional): Regime do emitente, ignorado quando os itens possuem o campo CRT.
+        rates_as_percentage (bool, optional): Se as alíquotas estão em percentual (18.00), como no XML, ou em decimal (0.18).
+
+    Returns:
+        pd.DataFrame: Cópia dos itens pronta para a avaliação das regras.
+    """
+    frame = pd.DataFrame(items).reset_index(drop=True)
+
+    if 'nItem' not in frame:
+        frame['nItem'] = np.arange(1, len(frame) + 1)
+
+    values = frame.reindex(columns=list(ITEM_VALUE_FIELDS))
+    values = values.apply(pd.to_numeric, errors='coerce').astype('float64')
+    frame[list(ITEM_VALUE_FIELDS)] = values.fillna(0.0)
+
+    if rates_as_percentage:
+        frame[list(ITEM_RATE_FIELDS)] = frame[list(ITEM_RATE_FIELDS)] / 100
+
+    for field in ITEM_CODE_FIELDS:
+        codes = frame.get(field, pd.Series('', index=frame.index))
+        codes = codes.astype(object).where(codes.notna(), '').astype(str).str.strip()
+        # Códigos numéricos perdem o zero à esquerda ('0' -> '00')
+        frame[field] = codes.mask(codes.str.len() == 1, codes.str.zfill(2))
+
+    # O regime pode vir por item (CRT do emitente em notas diferentes) ou para todo o lote
+    if 'CRT' in frame:
+        frame['is_simples_nacional'] = (
+            frame['CRT'].astype(str).str.strip().isin(SIMPLES_NACIONAL_CRTS)
+        )
+    else:
+        frame['is_simples_nacional'] = is_simples_nacional
+
+    return frame
+
+
+def _check_values(rule: TaxRule, value, base, rate):
+    """Aplica a verificação da regra aos valores do tributo, aceitando tanto Series (itens em lote) quanto números (um único item).
+
+    Returns:
+        tuple: Indicador de erro e valor esperado do tributo.
+    """
+    highlighted = value > rule.tolerance
+
+    if rule.check in (CALCULATION, HIGHLIGHTED_CALCULATION):
+        # Mesmo arredondamento para Series e números, os dois caminhos devem ter o mesmo resultado
+        expected = np.round(base * rate, 2)
+        # Meio centavo pode ser arredondado para cima (106,695 -> 106,70), uma diferença de exatamente um centavo continua válida
+        failed = abs(value - expected) > rule.tolerance + FLOAT_EPSILON
+
+        if rule.check == HIGHLIGHTED_CALCULATION:
+            failed = failed & highlighted
+
+        return failed, expected
+
+    if rule.check == HIGHLIGHT_OR_BASE:
+        return highlighted | (base > rule.tolerance), 0.0
+
+    return highlighted, 0.0
+
+
+def _evaluate_rule(
+    rule: TaxRule, frame: pd.DataFrame, applicable: pd.Series
+) -> tuple[pd.Series, pd.Series, pd.Series]:
+    """Calcula as máscaras da regra sobre todos os itens.
+
+    Returns:
+        tuple[pd.Series, pd.Series, pd.Series]: Itens em que a regra se aplica, itens com erro e valores esperados.
+    """
+    code_field, base_field, rate_field, value_field = TAX_FIELDS[rule.tax]
+    codes = frame[code_field]
+
+    if rule.codes is not None:
+        applicable = applicable & codes.isin(rule.codes)
+
+    if rule.exclude_codes:
+        applicable = applicable & ~codes.isin(rule.exclude_codes)
+
+    if rule.regime == SIMPLES_NACIONAL:
+        applicable = applicable & frame['is_simples_nacional']
+
+    failed, expected = _check_values(
+        rule, frame[value_field], frame[base_field], frame[rate_field]
+    )
+
+    return applicable, applicable & failed, pd.Series(expected, index=frame.index)
+
+
+def evaluate_items(
+    frame: pd.DataFrame,
+    groups: tuple[str, ...] | None = None,
+    fields: Collection[str] | None = None,
+):
+    """Aplica as regras da tabela em todos os itens de uma vez.
+
+    Args:
+        frame (pd.DataFrame): Itens preparados por `prepare_items`.
+        groups (tuple[str, ...] | None, optional): Grupos de regras avaliados ('ICMS', 'FEDERAL'), por padrão todos.
+        fields (Collection[str] | None, optional): Campos presentes nos itens originais. Regras que dependem de campos ausentes não são avaliadas, em vez de considerar os valores preenchidos com zero por `prepare_items`. Por padrão todos os campos estão presentes.
+
+    Returns:
+        pd.DataFrame: Uma linha por inconsistência, com a chave da nota (se presente), item, tributo, código, tipo de erro, valor esperado e destacado, na ordem dos itens.
+    """
+    key_columns = [column for column in ('chNFe', 'nItem') if column in frame]
+    findings = []
+
+    for group, stages in RULE_PLAN.items():
+        if groups is not None and group not in groups:
+            continue
+
+        open_items = pd.Series(True, index=frame.index)
+
+        for stage in stages:
+            closed = pd.Series(False, index=frame.index)
+
+            for rule in stage:
+                if fields is not None and not set(rule_fields(rule)) <= set(fields):
+                    continue
+
+                applicable, failed, expected = _evaluate_rule(rule, frame, open_items)
+
+                if rule.claims:
+                    closed |= applicable
+                elif rule.stops:
+                    closed |= failed
+
+                if not failed.any():
+                    continue
+
+                value_field = TAX_FIELDS[rule.tax][3]
+                findings.append(
+                    frame.loc[failed, key_columns].assign(
+                        tax=rule.tax,
+                        code=frame.loc[failed, TAX_FIELDS[rule.tax][0]],
+                        error_type=rule.error_type,
+                        detail=rule.detail,
+                        expected=expected[failed],
+                        found=frame.loc[failed, value_field],
+                        regime=rule.regime,
+                    )
+                )
+
+            open_items &= ~closed
+
+    if not findings:
+        return pd.DataFrame(columns=[*key_columns, *FINDING_COLUMNS, 'regime'])
+
+    # Índice dos itens mantém a ordem original, empates seguem a ordem das regras
+    return pd.concat(findings).sort_index(kind='stable')
+
+
+def _normalize_code(value) -> str:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ''
+
+    code = str(value).strip()
+
+    return code.zfill(2) if len(code) == 1 else code
+
+
+def _to_float(value) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+    return 0.0 if np.isnan(number) else number
+
+
+def evaluate_item(
+    item: dict,
+    *,
+    is_simples_nacional: bool = False,
+    rates_as_percentage: bool = True,
+    groups: tuple[str, ...] | None = None,
+) -> list[dict]:
+    """Aplica as regras da tabela a um único item, sem o custo de montar um DataFrame. Usado pelas ferramentas chamadas por item.
+
+    Args:
+        item (dict): Item com os campos do payload de NF-e.
+        is_simples_nacional (bool, optional): Regime do emitente.
+        rates_as_percentage (bool, optional): Se as alíquotas estão em percentual (18.00) ou em decimal (0.18).
+        groups (tuple[str, ...] | None, optional): Grupos de regras avaliados ('ICMS', 'FEDERAL'), por padrão todos.
+
+    Returns:
+        list[dict]: Inconsistências encontradas, com os mesmos campos de `evaluate_items`.
+    """
+    findings = []
+
+    for group, stages in RULE_PLAN.items():
+        if groups is not None and group not in groups:
+            continue
+
+        for stage in stages:
+            closed = False
+
+            for rule in stage:
+                code_field, base_field, rate_field, value_field = TAX_FIELDS[rule.tax]
+                code = _normalize_code(item.get(code_field))
+                rate = _to_float(item.get(rate_field))
+
+                applicable = (
+                    (rule.codes is None or code in rule.codes)
+                    and code not in rule.exclude_codes
+                    and (rule.regime != SIMPLES_NACIONAL or is_simples_nacional)
+                )
+
+                if not applicable:
+                    continue
+
+                value = _to_float(item.get(value_field))
+                failed, expected = _check_values(
+                    rule,
+                    value,
+                    _to_float(item.get(base_field)),
+                    rate / 100 if rates_as_percentage else rate,
+                )
+
+                closed = closed or rule.claims or (rule.stops and failed)
+
+                if failed:
+                    findings.append(
+                        {
+                            'nItem': item.get('nItem'),
+                            'tax': rule.tax,
+                            'code': code,
+                            'error_type': rule.error_type,
+                            'detail': rule.detail,
+                            'expected': float(expected),
+                            'found': value,
+                            'regime': rule.regime,
+                        }
+                    )
+
+            if closed:
+                break
+
+    return findings
+
+
+def check_note_totals(
+    frame: pd.DataFrame, headers: pd.DataFrame | None = None
+) -> pd.DataFrame:
+    """Confere o valor total (vNF) de cada nota com a soma dos itens e os totais de frete, seguro, outras despesas e desconto.
+
+    Args:
+        frame (pd.DataFrame): Itens preparados por `prepare_items`, agrupados pela coluna `chNFe` quando presente.
+        headers (pd.DataFrame | None, optional): Cabeçalhos das notas indexados pela chave, com `vNF` e os totais do cabeçalho. Sem cabeçalhos, os totais dos itens são usados (colunas repetidas por item em exportações).
+
+    Returns:
+        pd.DataFrame: Uma linha por nota com o valor declarado, o calculado, a diferença e se há divergência.
+    """
+    key = frame['chNFe'] if 'chNFe' in frame else pd.Series('', index=frame.index)
+    # Itens com indTot = 0 não compõem o valor total da nota
+    in_total = frame.get('indTot', pd.Series('1', index=frame.index))
+    in_total = in_total.astype(str) != '0'
+
+    signs = pd.Series(NOTE_ITEM_COMPONENTS)
+    item_totals = (
+        frame.loc[in_total, list(signs.index)].mul(signs).sum(axis=1).groupby(key).sum()
+    )
+
+    if headers is None:
+        header_columns = ['vNF', *NOTE_HEADER_COMPONENTS]
+        headers = frame.reindex(columns=header_columns).groupby(key).first()
+
+    headers = headers.reindex(item_totals.index)
+    header_signs = pd.Series(NOTE_HEADER_COMPONENTS)
+    header_values = headers.reindex(columns=list(header_signs.index)).apply(
+        pd.to_numeric, errors='coerce'
+    )
+
+    totals = pd.DataFrame(
+        {
+            'v_nf_declared': pd.to_numeric(headers.get('vNF'), errors='coerce'),
+            'v_nf_calculated': (
+                item_totals + header_values.fillna(0.0).mul(header_signs).sum(axis=1)
+            ).round(2),
+        }
+    )
+    totals['difference'] = (totals['v_nf_declared'] - totals['v_nf_calculated']).round(
+        2
+    )
+    totals['is_mismatch'] = totals['difference'].abs() > TOLERANCE
+
+    return totals
+
+
+def _note_total_status(
+    v_nf_declared: float, v_nf_calculated: float, difference: float
+) -> dict:
+    """Formata a conferência do total de uma nota no retorno das ferramentas."""
+    if abs(difference) <= TOLERANCE:
+        return {'status': 'COMPLIANT', 'v_nf': v_nf_declared}
+
+    return {
+        'status': 'TOTAL MISMATCH DETECTED',
+        'v_nf_calculated': v_nf_calculated,
+        'v_nf_declared': v_nf_declared,
+        'is_mismatch': True,
+        'details': f'Difference of R$ {abs(difference):.2f}',
+    }
+
+
+def check_note_total(v_nf_declared: float, components: dict[str, float]) -> dict:
+    """Confere o valor total de uma única nota a partir dos totais consolidados.
+
+    Args:
+        v_nf_declared (float): Valor total declarado da nota (vNF).
+        components (dict[str, float]): Totais da nota por campo (vProd, vIPI, vICMSST, vFrete, vSeg, vOutro, vDesc, ...).
+
+    Returns:
+        dict: Status da conferência, com os valores calculado e declarado quando divergentes.
+    """
+    signs = {**NOTE_ITEM_COMPONENTS, **NOTE_HEADER_COMPONENTS}
+    v_nf_calculated = round(
+        sum(sign * _to_float(components.get(field)) for field, sign in signs.items()),
+        2,
+    )
+
+    return _note_total_status(
+        v_nf_declared, v_nf_calculated, round(v_nf_declared - v_nf_calculated, 2)
+    )
+
+
+def validate_items(
+    items: list[dict] | pd.DataFrame,
+    *,
+    is_simples_nacional: bool = False,
+    rates_as_percentage: bool = True,
+    v_nf_declared: float | None = None,
+    header: dict | None = None,
+) -> dict:
+    """Valida todos os itens de uma nota fiscal, retornando um relatório apenas com os itens não conformes.
+
+    Args:
+        items (list[dict] | pd.DataFrame): Itens com os campos do payload de NF-e.
+        is_simples_nacional (bool, optional): Regime do emitente, ignorado quando os itens possuem o campo CRT.
+        rates_as_percentage (bool, optional): Se as alíquotas estão em percentual (18.00) ou em decimal (0.18).
+        v_nf_declared (float | None, optional): Valor total declarado da nota, a conferência do total é feita quando informado.
+        header (dict | None, optional): Cabeçalho da nota com os totais de frete, seguro, outras despesas e desconto.
+
+    Returns:
+        dict: Relatório compacto com a contagem de itens e as inconsistências encontradas.
+    """
+    frame = prepare_items(
+        items,
+        is_simples_nacional=is_simples_nacional,
+        rates_as_percentage=rates_as_percentage,
+    )
+    findings = evaluate_items(frame)
+
+    report = {
+        'status': 'NON_COMPLIANT' if len(findings) else 'VALID',
+        'items_checked': len(frame),
+        'non_compliant_items': int(findings['nItem'].nunique()),
+        'inconsistencies': findings.drop(columns='regime')
+        .round({'expected': 2, 'found': 2})
+        .to_dict(orient='records'),
+    }
+
+    if v_nf_declared is not None:
+        # Os itens são tratados como uma única nota, com os totais do cabeçalho recebido
+        headers = pd.DataFrame([{**(header or {}), 'vNF': v_nf_declared}], index=[''])
+        totals = check_note_totals(frame.assign(chNFe=''), headers)
+        total = totals.iloc[0]
+        report['total_note_check'] = _note_total_status(
+            v_nf_declared, float(total['v_nf_calculated']), float(total['difference'])
+        )
+
+        if report['total_note_check']['status'] != 'COMPLIANT':
+            report['status'] = 'NON_COMPLIANT'
+
+    return report
+
+
+def audit_chunk(
+    chunk: pd.DataFrame, is_simples_nacional: bool, rates_as_percentage: bool
+) -> tuple[pd.DataFrame, pd.DataFrame | None]:
+    """Ponto de entrada dos workers da auditoria em lote: aplica as regras fiscais a um bloco de linhas com notas completas.
+
+    Args:
+        chunk (pd.DataFrame): Linhas com as colunas já renomeadas e a posição original em `row`.
+        is_simples_nacional (bool): Regime padrão, quando o bloco não possui a coluna CRT.
+        rates_as_percentage (bool): Se as alíquotas estão em percentual (18.00) ou em decimal (0.18).
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame | None]: Inconsistências dos itens e a conferência do total de cada nota, quando as colunas de chave e vNF existem.
+    """
+    # Apenas as regras com todos os campos nas colunas do bloco são avaliadas, campos ausentes não valem zero
+    fields = set(chunk.columns)
+    frame = prepare_items(
+        chunk,
+        is_simples_nacional=is_simples_nacional,
+        rates_as_percentage=rates_as_percentage,
+    )
+    findings = evaluate_items(frame, fields=fields).drop(columns='regime')
+    findings.insert(0, 'row', frame.loc[findings.index, 'row'].to_numpy())
+
+    totals = None
+
+    if 'chNFe' in frame and 'vNF' in frame:
+        totals = check_note_totals(frame)
+
+    return findings.reset_index(drop=True), totals
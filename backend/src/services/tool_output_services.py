@@ -0,0 +1,219 @@
+"""Controle do tamanho das respostas de ferramentas enviadas aos agentes, com paginação de resultados grandes."""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+from uuid import uuid4
+
+import pandas as pd
+
+from src.settings import settings
+from src.utils.tokens import count_tokens, split_to_tokens, truncate_to_tokens
+
+# Linhas usadas para estimar o custo em tokens de cada linha de uma tabela
+SAMPLE_ROWS = 20
+
+
+@dataclass(slots=True)
+class StoredOutput:
+    """Resultado completo de uma ferramenta, lido por páginas. Tabelas são renderizadas sob demanda."""
+
+    pages: list[str] | None = None
+    frame: pd.DataFrame | None = None
+    rows_per_page: int = 0
+
+    @property
+    def page_count(self) -> int:
+        if self.frame is not None:
+            return max(-(-len(self.frame) // self.rows_per_page), 1)
+
+        return len(self.pages)
+
+    def get_page(self, page: int) -> str:
+        if self.frame is None:
+            return self.pages[page - 1]
+
+        start = (page - 1) * self.rows_per_page
+
+        return self.frame.iloc[start : start + self.rows_per_page].to_string()
+
+
+class ToolOutputGovernor:
+    """Limita as respostas das ferramentas ao orçamento de tokens, mantendo o resultado completo em um identificador paginável.
+
+    Respostas grandes ocupam o contexto de todas as chamadas seguintes do agente, aqui o agente recebe uma prévia estruturada (dimensões, colunas e primeiras linhas) e lê o restante apenas se necessário.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int | None = None,
+        page_tokens: int | None = None,
+        max_handles: int | None = None,
+    ):
+        self.max_tokens = max_tokens or settings.tool_output_max_tokens
+        self.page_tokens = page_tokens or settings.tool_output_page_tokens
+        self.max_handles = max_handles or settings.tool_output_max_handles
+        self._outputs: dict[str, OrderedDict[str, StoredOutput]] = {}
+
+    def _store(self, session_id: str, output: StoredOutput) -> str:
+        handles = self._outputs.setdefault(session_id, OrderedDict())
+        handle = f'out_{uuid4().hex[:8]}'
+        handles[handle] = output
+
+        if len(handles) > self.max_handles:
+            handles.popitem(last=False)
+
+        return handle
+
+    @staticmethod
+    def _paging_hint(handle: str, page_count: int, next_page: int) -> str:
+        return (
+            f'[Output truncated. Full result stored under handle "{handle}" '
+            f'({page_count} pages). Call read_tool_output(handle="{handle}", page={next_page}) to read more.]'
+        )
+
+    def _split_pages(self, text: str) -> list[str]:
+        """Divide o texto em páginas dentro do orçamento, quebrando apenas as linhas maiores que uma página."""
+        pages, lines, tokens = [], [], 0
+
+        for line in text.splitlines():
+            # Linhas longas (metadados, dicionários e JSON impressos) ocupam páginas inteiras, sem perda de conteúdo
+            if count_tokens(line) + 1 > self.page_tokens:
+                parts = split_to_tokens(line, max(self.page_tokens - 1, 1))
+            else:
+                parts = [line]
+
+            for index, part in enumerate(parts):
+                part_tokens = count_tokens(part) + 1
+
+                # Partes de uma mesma linha ficam em páginas separadas, sem quebras de linha inexistentes
+                if lines and (index > 0 or tokens + part_tokens > self.page_tokens):
+                    pages.append('\n'.join(lines))
+                    lines, tokens = [], 0
+
+                lines.append(part)
+                tokens += part_tokens
+
+        pages.append('\n'.join(lines))
+
+        return pages
+
+    def _govern_text(self, session_id: str, text: str) -> str:
+        if count_tokens(text) <= self.max_tokens:
+            return text
+
+        pages = self._split_pages(text)
+        preview, next_page = pages[0], 2
+
+        # Com páginas maiores que o orçamento da resposta, a prévia é cortada e a leitura começa pela primeira página
+        if count_tokens(preview) > self.max_tokens:
+            preview, next_page = truncate_to_tokens(preview, self.max_tokens), 1
+        elif len(pages) == 1:
+            return preview
+
+        handle = self._store(session_id, StoredOutput(pages=pages))
+
+        return f'{preview}\n{self._paging_hint(handle, len(pages), next_page)}'
+
+    def _govern_frame(self, session_id: str, frame: pd.DataFrame) -> str:
+        sample = frame.head(SAMPLE_ROWS).to_string()
+        sample_tokens = count_tokens(sample)
+
+        # Estimativa do custo por linha a partir da amostra, evitando renderizar a tabela inteira
+        row_tokens = max(sample_tokens / max(min(len(frame), SAMPLE_ROWS), 1), 1)
+
+        # Tabelas dentro do orçamento são enviadas inteiras, sem ocupar um identificador
+        if row_tokens * len(frame) <= self.max_tokens:
+            if len(frame) <= SAMPLE_ROWS:
+                full, full_tokens = sample, sample_tokens
+            else:
+                full = frame.to_string()
+                full_tokens = count_tokens(full)
+
+            if full_tokens <= self.max_tokens:
+                return full
+
+        rows_per_page = max(int(self.page_tokens // row_tokens), 1)
+        preview_rows = max(int(self.max_tokens * 0.8 // row_tokens), 1)
+
+        output = StoredOutput(frame=frame, rows_per_page=rows_per_page)
+        handle = self._store(session_id, output)
+
+        columns = ', '.join(map(str, frame.columns[:50]))
+
+        if len(frame.columns) > 50:
+            columns += f', ... (+{len(frame.columns) - 50} columns)'
+
+        preview = truncate_to_tokens(
+            frame.head(preview_rows).to_string(), self.max_tokens
+        )
+
+        return (
+            f'Table with {len(frame)} rows x {len(frame.columns)} columns.\n'
+            f'Columns: {columns}\n'
+            f'First {min(preview_rows, len(frame))} rows:\n{preview}\n'
+            f'[Output truncated. Full table stored under handle "{handle}" '
+            f'({output.page_count} pages of {rows_per_page} rows). '
+            f'Call read_tool_output(handle="{handle}", page=1) to read it.]'
+        )
+
+    def govern(self, session_id: str, output: Any) -> Any:
+        """Aplica o orçamento de tokens à resposta de uma ferramenta.
+
+        Args:
+            session_id (str): Identificador da sessão, os resultados completos ficam restritos a ela.
+            output (Any): Resposta da ferramenta. Tabelas (DataFrame ou Series) e textos são limitados, dicionários têm cada valor limitado.
+
+        Returns:
+            Any: Resposta dentro do orçamento, com o identificador para leitura do resultado completo quando truncada.
+        """
+        if isinstance(output, dict):
+            return {
+                key: self.govern(session_id, value) for key, value in output.items()
+            }
+
+        if isinstance(output, pd.Series):
+            output = output.to_frame()
+
+        if isinstance(output, pd.DataFrame):
+            return self._govern_frame(session_id, output)
+
+        if isinstance(output, str):
+            return self._govern_text(session_id, output)
+
+        return output
+
+    def read(self, session_id: str, handle: str, page: int = 1) -> str:
+        """Retorna uma página de um resultado armazenado.
+
+        Args:
+            session_id (str): Identificador da sessão.
+            handle (str): Identificador retornado na resposta truncada.
+            page (int, optional): Número da página, começando em 1.
+
+        Returns:
+            str: Conteúdo da página ou mensagem de erro para o agente.
+        """
+        output = self._outputs.get(session_id, {}).get(handle)
+
+        if output is None:
+            return f'Error: Handle "{handle}" not found or expired, run the original tool again.'
+
+        if not 1 <= page <= output.page_count:
+            return f'Error: Page must be between 1 and {output.page_count}.'
+
+        content = output.get_page(page)
+
+        if page < output.page_count:
+            content += f'\n[Page {page}/{output.page_count}. Call read_tool_output(handle="{handle}", page={page + 1}) for the next page.]'
+        else:
+            content += f'\n[Page {page}/{output.page_count}, end of output.]'
+
+        return content
+
+    def release_session(self, session_id: str) -> None:
+        """Remove os resultados armazenados da sessão."""
+        self._outputs.pop(session_id, None)
+
+
+tool_output_governor = ToolOutputGovernor()
@@ -0,0 +1,260 @@
+"""Serviço para uploads em partes (chunked) e retomáveis, gravados em disco conforme chegam."""
+
+import asyncio
+import hashlib
+import mimetypes
+import os
+import shutil
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import time
+from uuid import uuid4
+
+from src.settings import settings
+from src.utils.exceptions import (
+    ChunkChecksumException,
+    MaxFileSizeException,
+    UploadNotFoundException,
+    UploadOffsetMismatchException,
+)
+
+
+@dataclass(slots=True)
+class ChunkedUpload:
+    upload_id: str
+    session_id: str
+    filename: str
+    content_type: str
+    size: int
+    path: Path
+    read_options: dict = field(default_factory=dict)
+    offset: int = 0
+    timestamp: float = field(default_factory=time)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def to_dict(self) -> dict[str, str | int]:
+        return {
+            'upload_id': self.upload_id,
+            'filename': self.filename,
+            'size': self.size,
+            'offset': self.offset,
+            'chunk_size': settings.upload_chunk_size,
+            'complete': self.offset == self.size,
+        }
+
+
+class UploadManager:
+    """Gerenciador de uploads em partes, mantendo o progresso de cada arquivo para retomada após falhas de conexão."""
+
+    def __init__(self, upload_dir: str | None = None):
+        self.upload_dir = Path(upload_dir or settings.upload_dir)
+        self.uploads: dict[str, ChunkedUpload] = {}
+
+    def _get_upload(self, upload_id: str) -> ChunkedUpload:
+        upload = self.uploads.get(upload_id)
+
+        if upload is None:
+            raise UploadNotFoundException(
+                f'Upload {upload_id} not found, it may have expired. Please start a new upload.'
+            )
+
+        upload.timestamp = time()
+
+        return upload
+
+    async def init_upload(
+        self,
+        session_id: str,
+        filename: str,
+        content_type: str | None,
+        size: int,
+        read_options: dict | None = None,
+    ) -> dict[str, str | int]:
+        """Registra um novo upload e reserva o arquivo de destino no disco.
+
+        Args:
+            session_id (str): Identificador da sessão atual.
+            filename (str): Nome do arquivo enviado.
+            content_type (str | None): Tipo MIME do arquivo, usado na leitura ao finalizar. Inferido pela extensão quando ausente.
+            size (int): Tamanho total do arquivo em bytes.
+            read_options (dict | None, optional): Opções de leitura aplicadas ao finalizar (separador, aba e colunas).
+
+        Raises:
+            MaxFileSizeException: Quando o arquivo excede o tamanho máximo para uploads em partes.
+
+        Returns:
+            dict[str, str | int]: Estado do upload, com o `upload_id` e o tamanho de cada parte.
+        """
+        if size > settings.max_chunked_upload_size:
+            raise MaxFileSizeException(
+                f'Max file size exceeded: {settings.max_chunked_upload_size / 1048576} MB.!'
+            )
+
+        upload_id = str(uuid4())
+        # Apenas o nome base é usado, evitando caminhos enviados pelo cliente
+        path = self.upload_dir / upload_id / Path(filename).name
+
+        def create_file():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+
+        await asyncio.to_thread(create_file)
+
+        upload = ChunkedUpload(
+            upload_id=upload_id,
+            session_id=session_id,
+            filename=path.name,
+            content_type=content_type
+            or mimetypes.guess_type(path.name)[0]
+            or 'application/octet-stream',
+            size=size,
+            path=path,
+            read_options=read_options or {},
+        )
+        self.uploads[upload_id] = upload
+
+        print(
+            f'\t>> Chunked upload {upload_id} initialized for {path.name} ({size} bytes)'
+        )
+
+        return upload.to_dict()
+
+    async def append_chunk(
+        self,
+        upload_id: str,
+        offset: int,
+        checksum: str,
+        stream: AsyncIterator[bytes],
+    ) -> dict[str, str | int]:
+        """Grava uma parte do arquivo no disco conforme os bytes chegam, sem mantê-la em memória.
+
+        A parte só é confirmada (avançando o offset) quando o SHA-256 recebido confere com o conteúdo gravado, uma parte corrompida pode ser reenviada no mesmo offset.
+
+        Args:
+            upload_id (str): Identificador do upload.
+            offset (int): Posição da parte no arquivo, deve ser igual ao offset atual do upload.
+            checksum (str): SHA-256 em hexadecimal do conteúdo da parte.
+            stream (AsyncIterator[bytes]): Corpo da requisição com o conteúdo da parte.
+
+        Raises:
+            UploadNotFoundException: Quando o upload não existe ou expirou.
+            UploadOffsetMismatchException: Quando o offset não corresponde ao progresso do upload.
+            ChunkChecksumException: Quando o checksum não confere ou a parte excede o tamanho permitido.
+
+        Returns:
+            dict[str, str | int]: Estado atualizado do upload.
+        """
+        upload = self._get_upload(upload_id)
+
+        async with upload.lock:
+            if offset != upload.offset:
+                raise UploadOffsetMismatchException(
+                    f'Expected offset {upload.offset} for upload {upload_id}, received {offset}.'
+                )
+
+            digest = hashlib.sha256()
+            written = 0
+            max_chunk = min(settings.upload_chunk_size, upload.size - offset)
+            file = await asyncio.to_thread(open, upload.path, 'r+b')
+
+            try:
+                file.seek(offset)
+
+                async for data in stream:
+                    written += len(data)
+
+                    if written > max_chunk:
+                        raise ChunkChecksumException(
+                            f'Chunk exceeds the maximum size of {max_chunk} bytes for this offset.'
+                        )
+
+                    digest.update(data)
+                    await asyncio.to_thread(file.write, data)
+
+                await asyncio.to_thread(file.flush)
+            finally:
+                await asyncio.to_thread(file.close)
+
+            if digest.hexdigest() != checksum.lower():
+                raise ChunkChecksumException()
+
+            upload.offset += written
+
+        return upload.to_dict()
+
+    async def get_status(self, upload_id: str) -> dict[str, str | int]:
+        """Retorna o progresso do upload, usado pelo cliente para retomar a partir do último offset confirmado."""
+        return self._get_upload(upload_id).to_dict()
+
+    async def finalize(self, upload_id: str) -> ChunkedUpload:
+        """Valida que todas as partes foram recebidas e retira o upload do gerenciador para leitura.
+
+        Raises:
+            UploadNotFoundException: Quando o upload não existe ou expirou.
+            UploadOffsetMismatchException: Quando ainda existem partes pendentes.
+
+        Returns:
+            ChunkedUpload: Upload completo, com o caminho do arquivo no disco.
+        """
+        upload = self._get_upload(upload_id)
+
+        async with upload.lock:
+            if upload.offset != upload.size:
+                raise UploadOffsetMismatchException(
+                    f'Upload {upload_id} is incomplete: {upload.offset} of {upload.size} bytes received.'
+                )
+
+            del self.uploads[upload_id]
+
+        return upload
+
+    async def discard(self, upload: ChunkedUpload | str) -> None:
+        """Remove o upload e o seu diretório temporário do disco."""
+        if isinstance(upload, str):
+            upload = self.uploads.pop(upload, None)
+
+            if upload is None:
+                return
+
+        await asyncio.to_thread(shutil.rmtree, upload.path.parent, True)
+
+    async def cleanup_task(self, interval: int = 600, ttl: int = 86400):
+        """Função de limpeza para uploads abandonados, removendo os arquivos parciais do disco.
+
+        Args:
+            interval (int, optional): Intervalo de tempo para checar os uploads, em segundos.
+            ttl (int, optional): Tempo máximo sem novas partes antes de descartar o upload, em segundos.
+        """
+        print(
+            f'\t>> Initializing cleanup task for uploads. Checking for expired uploads (last chunk > {ttl}s) with intervals of {interval}s.'
+        )
+
+        # Diretórios que sobraram de execuções anteriores não podem mais ser retomados
+        if self.upload_dir.exists():
+            for entry in os.scandir(self.upload_dir):
+                if entry.is_dir() and entry.name not in self.uploads:
+                    await asyncio.to_thread(shutil.rmtree, entry.path, True)
+
+        while True:
+            try:
+                await asyncio.sleep(interval)
+
+                time_now = time()
+                expired = [
+                    upload_id
+                    for upload_id, upload in self.uploads.items()
+                    if time_now - upload.timestamp > ttl
+                ]
+
+                if expired:
+                    print(f'\t>> Cleaning expired uploads: {len(expired)} in total')
+
+                    for upload_id in expired:
+                        await self.discard(upload_id)
+
+            except Exception as exc:
+                print(f'\t>> Error in upload cleanup task: {exc}')
+
+
+upload_manager = UploadManager()
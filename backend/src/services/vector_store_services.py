@@ -1,5 +1,6 @@
 import asyncio
-from uuid import uuid4
+import hashlib
+from uuid import NAMESPACE_URL, uuid5
 
 from qdrant_client import AsyncQdrantClient, models
 
@@ -8,6 +9,14 @@ from src.schemas import PayloadDataModel
 from src.settings import settings
 from src.utils.exceptions import VectorStoreConnectionException
 
+# Campos do metadata que identificam um documento fiscal, usados na deduplicação
+DEDUP_KEY_FIELDS = ('chNFe', 'chCTe', 'nItem', 'CNPJ_Emitente', 'dhEmi', 'vNF', 'vProd')
+# Namespace fixo para que o mesmo conteúdo gere sempre o mesmo ID de ponto
+POINT_ID_NAMESPACE = uuid5(NAMESPACE_URL, 'smart_financial_solutions/qdrant')
+# Campos do metadata usados em buscas exatas, indexados na coleção de dados dos usuários
+FILTER_INDEX_FIELDS = ('chNFe',)
+SCROLL_PAGE_SIZE = 256
+
 
 class QdrantStore:
     """Classe para inicialização e manipulação da vector store."""
@@ -19,6 +28,50 @@ class QdrantStore:
     def __init__(self):
         self.client = AsyncQdrantClient(url=self.STORE_URL)
 
+    @staticmethod
+    def _normalize(value) -> str:
+        """Normaliza um valor para comparação, ignorando caixa e espaços extras."""
+        return ' '.join(str(value).lower().split())
+
+    @classmethod
+    def make_point_id(cls, chunk: PayloadDataModel) -> str:
+        """Gera um ID determinístico para o chunk a partir do tenant, texto normalizado e campos chave.
+
+        Args:
+            chunk (PayloadDataModel): Chunk de dados com 'text' e 'metadata'.
+
+        Returns:
+            point_id (str): UUID derivado do hash do conteúdo, igual para chunks repetidos.
+        """
+        metadata = chunk.get('metadata') or {}
+        key_fields = [
+            f'{field}={cls._normalize(metadata[field])}'
+            for field in DEDUP_KEY_FIELDS
+            if metadata.get(field) not in (None, '')
+        ]
+
+        content = '|'.join(
+            [
+                str(metadata.get('user_id', '')),
+                cls._normalize(chunk['text']),
+                *key_fields,
+            ]
+        )
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+        return str(uuid5(POINT_ID_NAMESPACE, digest))
+
+    async def _get_existing_ids(self, collection_name: str, ids: list[str]) -> set[str]:
+        """Retorna os IDs que já existem na coleção, sem carregar payload ou vetores."""
+        if not ids:
+            return set()
+
+        records = await self.client.retrieve(
+            collection_name, ids=ids, with_payload=False, with_vectors=False
+        )
+
+        return {str(record.id) for record in records}
+
     async def _check_connection(self):
         """Verifica se conexão existe e retorna um booliano a partir desta proposição.
 
@@ -50,6 +103,14 @@ class QdrantStore:
                     hnsw_config=models.HnswConfigDiff(m=0, payload_m=16),
                     tenant_index=True,
                 )
+
+                # Criação idempotente, coleções existentes também recebem os índices
+                for field in FILTER_INDEX_FIELDS:
+                    await self.client.create_payload_index(
+                        collection_name=collection_name,
+                        field_name=f'metadata.{field}',
+                        field_schema=models.PayloadSchemaType.KEYWORD,
+                    )
             else:
                 await self.create_collection(collection_name)
 
@@ -113,10 +174,15 @@ class QdrantStore:
     ):
         """Função para gerar embeddings e armazenar dados no Vector Store.
 
+        Os IDs dos pontos são determinísticos (ver `make_point_id`), chunks já armazenados ou repetidos no mesmo lote são ignorados antes da geração de embeddings.
+
         Args:
             collection_name (str): Sessão para inserir os dados
             data_chunks (list[dict]): Lista de dicionários, onde cada item deve conter 'texto' e 'metadados' para o payload.
             map_func (any): Função para mapear os valores de data_chunks para o padrão desejado.
+
+        Returns:
+            ids (list[str]): IDs dos pontos inseridos, excluindo os duplicados.
         """
 
         if not await self._check_connection():
@@ -128,15 +194,35 @@ class QdrantStore:
             except Exception as exc:
                 print(f'Mapping function in Data Chunks failed: {exc}')
 
-        texts_to_embed = [chunk['text'] for chunk in data_chunks]
+        # Remove duplicados do próprio lote mantendo a ordem original
+        unique_chunks = {self.make_point_id(chunk): chunk for chunk in data_chunks}
+
+        # Verificação antes do embedding, pontos existentes não são processados novamente
+        existing_ids = await self._get_existing_ids(
+            collection_name, list(unique_chunks)
+        )
+        new_chunks = {
+            point_id: chunk
+            for point_id, chunk in unique_chunks.items()
+            if point_id not in existing_ids
+        }
+
+        skipped = len(data_chunks) - len(new_chunks)
+        if skipped:
+            print(f'\t>> {skipped} duplicated chunks skipped in {collection_name}.')
+
+        if not new_chunks:
+            return []
+
+        texts_to_embed = [chunk['text'] for chunk in new_chunks.values()]
 
         # Gerando vetores de embeddings do modelo padrão em thread separada
         embeddings_gen = await asyncio.to_thread(self.embedder.embed, texts_to_embed)
 
         # Pontos são estruturas com vetores e payload (metadados) no Vector Store
         points = [
-            models.PointStruct(id=str(uuid4()), vector=vector.tolist(), payload=chunk)
-            for vector, chunk in zip(embeddings_gen, data_chunks)
+            models.PointStruct(id=point_id, vector=vector.tolist(), payload=chunk)
+            for vector, (point_id, chunk) in zip(embeddings_gen, new_chunks.items())
         ]
 
         await self.client.upsert(collection_name, wait=True, points=points)
@@ -175,16 +261,61 @@ class QdrantStore:
         return results
 
     async def search_filtered_documents(
-        self, collection_name: str, id: str, filter: str
-    ):
-        """Função para buscar em documentos do usuário com base no filtro.
+        self,
+        collection_name: str,
+        id: str,
+        filters: dict[str, str],
+        limit: int | None = None,
+    ) -> list[dict]:
+        """Função para buscar todos os documentos do usuário com campos do metadata iguais aos do filtro, sem busca vetorial.
 
         Args:
           collection_name (str): Nome da coleção para manipular.
           id (str): Identificador para o dado do usuário na coleção.
-          filter (str): String para filtrar os dados por metadata.
+          filters (dict[str, str]): Campos do metadata e valores esperados (ex.: `{'chNFe': '3525...'}`).
+          limit (int | None, optional): Máximo de documentos retornados, por padrão retorna todos.
+
+        Returns:
+            payloads (list[dict]): Payloads dos pontos encontrados, sem o identificador do usuário.
         """
-        return NotImplemented
+
+        if not await self._check_connection():
+            raise VectorStoreConnectionException
+
+        scroll_filter = models.Filter(
+            must=[
+                models.FieldCondition(
+                    key='metadata.user_id', match=models.MatchValue(value=id)
+                ),
+                *(
+                    models.FieldCondition(
+                        key=f'metadata.{field}', match=models.MatchValue(value=value)
+                    )
+                    for field, value in filters.items()
+                ),
+            ]
+        )
+
+        payloads, offset = [], None
+
+        # Percorre a coleção em páginas até esgotar os pontos do filtro
+        while True:
+            records, offset = await self.client.scroll(
+                collection_name,
+                scroll_filter=scroll_filter,
+                limit=SCROLL_PAGE_SIZE,
+                offset=offset,
+                with_payload=models.PayloadSelectorExclude(
+                    exclude=['metadata.user_id']
+                ),
+                with_vectors=False,
+            )
+            payloads.extend(record.payload for record in records)
+
+            if offset is None or (limit and len(payloads) >= limit):
+                break
+
+        return payloads[:limit] if limit else payloads
 
     async def delete_collection(self, collection_name: str):
         """Função para deleção de coleções no Vector Store.
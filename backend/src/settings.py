@@ -1,3 +1,6 @@
+import tempfile
+from pathlib import Path
+
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,6 +15,35 @@ class Settings(BaseSettings):
     sender_email: str | None = None
     sender_password: str | None = None
     qdrant_url: str = 'http://localhost:6333'
+    ingestion_workers: int = 4
+    excel_engine: str = 'calamine'
+    csv_engine: str = 'pyarrow'
+    upload_dir: str = str(Path(tempfile.gettempdir()) / 'smart_financial_uploads')
+    upload_chunk_size: int = 8 * 1024 * 1024
+    max_chunked_upload_size: int = 5 * 1024 * 1024 * 1024
+    ocr_workers: int = 2
+    ocr_cache_size: int = 128
+    ocr_max_side: int = 2400
+    llm_max_connections: int = 50
+    llm_max_keepalive_connections: int = 20
+    conversation_buffer_size: int = 50
+    conversation_flush_interval: float = 2.0
+    memory_token_budget: int = 4000
+    memory_message_max_tokens: int = 1000
+    tool_output_max_tokens: int = 1500
+    tool_output_page_tokens: int = 1500
+    tool_output_max_handles: int = 20
+    response_cache_similarity: float = 0.95
+    response_cache_ttl: int = 1800
+    response_cache_max_bytes: int = 32 * 1024 * 1024
+    supervisor_max_parallel_agents: int = 3
+    tax_audit_chunk_rows: int = 50_000
+    tax_audit_preview_rows: int = 50
+    compute_workers: int = 4
+    sandbox_workers: int = 2
+    sandbox_timeout: float = 30.0
+    sandbox_cpu_seconds: int = 20
+    sandbox_memory_limit_mb: int = 2048
 
     model_config = SettingsConfigDict(
         env_file='.env',
@@ -32,6 +32,40 @@ class DataExtractionTools:
 
         return join_session_id
 
+    async def insert_chunks(self, data_chunks: list[PayloadDataModel]) -> list[str]:
+        """Insere chunks de dados no Vector Store, vinculados à sessão atual.
+
+        Args:
+            data_chunks (list[PayloadDataModel]): Lista de chunks com 'text' e 'metadata'.
+
+        Raises:
+            VectorStoreConnectionException: Quando não há conexão com o Vector Store.
+
+        Returns:
+            ids (list[str]): IDs dos pontos inseridos, duplicados são ignorados.
+        """
+        return await qdrant_store.store_data(
+            self.data_collection_name,
+            data_chunks,
+            map_func=self._add_session_to_data(self.session_id),
+        )
+
+    async def get_document_chunks(self, access_key: str) -> list[dict]:
+        """Retorna todos os chunks armazenados de um documento fiscal (cabeçalho e itens) pela chave de acesso.
+
+        Args:
+            access_key (str): Chave de acesso de 44 dígitos da NF-e.
+
+        Raises:
+            VectorStoreConnectionException: Quando não há conexão com o Vector Store.
+
+        Returns:
+            chunks (list[dict]): Payloads com 'text' e 'metadata' de cada chunk do documento.
+        """
+        return await qdrant_store.search_filtered_documents(
+            self.data_collection_name, self.session_id, {'chNFe': access_key}
+        )
+
     async def create_data_extraction_tools(self):
         """Função para criar e retornar as ferramentas de extração do agente.
 
@@ -55,15 +89,18 @@ class DataExtractionTools:
                 "O item COLECAO SPE EF1 4ANO VOL 1 AL (NCM: 49019900, CFOP: 2949) possui valor de 522.50. Foi aplicado ICMS 41 (Não Tributada) e IPI/PIS/COFINS 0.00. Operacao amparada por Imunidade Tributaria de acordo com Art.150 da Constituicao Federal e inciso I do caput do art. 3 do RICMS/2017-PR"
             """
             try:
-                await qdrant_store.store_data(
-                    self.data_collection_name,
-                    data,
-                    map_func=self._add_session_to_data(self.session_id),
-                )
+                inserted_ids = await self.insert_chunks(data)
             except VectorStoreConnectionException:
                 return {'error': 'Falha na conexão com o banco de dados vetorial.'}
 
-            return {'results': 'Data was inserted into the vector store successfully!'}
+            if not inserted_ids:
+                return {
+                    'results': 'All chunks received were already stored in the vector store, nothing new was inserted.'
+                }
+
+            return {
+                'results': f'Data was inserted into the vector store successfully! {len(inserted_ids)} new chunks stored, {len(data) - len(inserted_ids)} duplicates skipped.'
+            }
 
         @tool('extract_structured_data')
         async def extract_data(query: str):
@@ -15,6 +15,7 @@ from markdown_pdf import MarkdownPdf, Section
 
 from src.agents.base_agent import BaseAgent
 from src.services.db_services import get_graph_db
+from src.services.tax_audit_services import tax_audit_service
 from src.settings import settings
 
 
@@ -170,11 +171,12 @@ async def _create_and_send_report(filename: str, content: str, recipient_email:
         return {'error': 'Failed to generate the PDF document'}
 
 
-def create_report_tools(current_session: dict[str, BaseAgent | str]):
+def create_report_tools(current_session: dict[str, BaseAgent | str], session_id: str):
     """Função para criação das ferramentas com injeção de dependências.
 
     Args:
         current_session (dict[str, BaseAgent | str]): Sessão do usuário atual.
+        session_id (str): Identificador da sessão atual.
 
     Returns:
         list (Tool): Lista de ferramentas do agente.
@@ -188,4 +190,14 @@ def create_report_tools(current_session: dict[str, BaseAgent | str]):
 
         return await _create_and_send_report(filename, content, recipient_email)
 
-    return [create_and_send_report]
+    @tool('get_tax_audit_results')
+    def get_tax_audit_results(offset: int = 0, limit: int | None = None):
+        """Returns the results of the last bulk tax audit of the user's data: the summary (inconsistencies by tax and error type, total tax difference), a page of flagged rows and the invoices with mismatched totals. Use `offset` and `limit` to page through the flagged rows when writing a validation_audit report."""
+        results = tax_audit_service.get_results(session_id, offset, limit)
+
+        if results is None:
+            return {'error': 'No tax audit found for the session.'}
+
+        return results
+
+    return [create_and_send_report, get_tax_audit_results]
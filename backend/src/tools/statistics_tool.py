@@ -0,0 +1,170 @@
+"""Ferramentas de estatísticas vetorizadas para o agente de análise de dados"""
+
+from langchain.tools import tool
+
+from src.services import statistics_services
+from src.tools.data_analysis_tool import run_analysis
+
+
+def get_statistics_tools(session_id: str) -> list:
+    """
+    Factory Method para criar as ferramentas de estatísticas (agregações, tabelas dinâmicas,
+    séries temporais, janelas móveis e percentis) executadas nos workers de cálculo.
+
+    Args:
+        session_id (str): Identificador da sessão atual.
+
+    Returns:
+        list (Tool): Lista de ferramentas do agente.
+    """
+
+    @tool('group_aggregate')
+    async def group_aggregate(
+        group_by: list[str],
+        value_columns: list[str],
+        aggregations: list[str] | None = None,
+        sort_by: str | None = None,
+        ascending: bool = False,
+        limit: int | None = None,
+    ):
+        """
+        Aggregates numeric columns grouped by one or more key columns (e.g.: total vNF by UF and CFOP).
+
+        Args:
+            group_by (list[str]): Key columns of the groups.
+            value_columns (list[str]): Numeric columns to aggregate.
+            aggregations (list[str] | None): Any of count, sum, mean, min, max, std, var, median, nunique. Defaults to ['sum'].
+            sort_by (str | None): Output column used to sort the groups, named '<column>_<aggregation>' (e.g.: 'vNF_sum') or 'rows'.
+            ascending (bool): Sort order. Defaults to descending.
+            limit (int | None): Maximum number of groups returned after sorting (e.g.: top 10).
+
+        Returns one row per group with the number of rows ('rows') and a column per aggregation.
+        """
+
+        return await run_analysis(
+            session_id,
+            statistics_services.group_aggregate,
+            group_by,
+            value_columns,
+            aggregations or ['sum'],
+            sort_by,
+            ascending,
+            limit,
+        )
+
+    @tool('pivot_table')
+    async def pivot_table(
+        index: list[str], columns: str, values: str, aggregation: str = 'sum'
+    ):
+        """
+        Builds a pivot table with the categories of one column spread as columns (e.g.: vNF sum with UF as rows and CFOP as columns).
+
+        Args:
+            index (list[str]): Columns used as rows.
+            columns (str): Categorical column spread as columns, limited to 50 categories.
+            values (str): Numeric column aggregated in the cells.
+            aggregation (str): One of count, sum, mean, min, max, std, var. Defaults to 'sum'.
+        """
+
+        return await run_analysis(
+            session_id,
+            statistics_services.pivot_table,
+            index,
+            columns,
+            values,
+            aggregation,
+        )
+
+    @tool('resample_time_series')
+    async def resample_time_series(
+        date_column: str,
+        value_columns: list[str],
+        frequency: str = 'month',
+        aggregations: list[str] | None = None,
+        group_by: list[str] | None = None,
+    ):
+        """
+        Aggregates numeric columns by time period, e.g.: daily or monthly totals of vNF.
+
+        Args:
+            date_column (str): Date column (e.g.: dhEmi). Dates as text are parsed (dd/mm/yyyy or ISO).
+            value_columns (list[str]): Numeric columns to aggregate.
+            frequency (str): day, week, month, quarter or year. Defaults to 'month'.
+            aggregations (list[str] | None): Any of count, sum, mean, min, max, std, var. Defaults to ['sum'].
+            group_by (list[str] | None): Optional key columns to split each period (e.g.: ['UF']).
+
+        Without group_by, periods with no records are included with zero totals.
+        """
+
+        return await run_analysis(
+            session_id,
+            statistics_services.resample_time_series,
+            date_column,
+            value_columns,
+            frequency,
+            aggregations,
+            group_by,
+        )
+
+    @tool('rolling_window')
+    async def rolling_window(
+        date_column: str,
+        value_column: str,
+        window: int,
+        frequency: str = 'day',
+        aggregation: str = 'sum',
+        statistic: str = 'mean',
+    ):
+        """
+        Computes a rolling window over the time series of a numeric column, e.g.: the 7-day moving average of the daily vNF total.
+
+        Args:
+            date_column (str): Date column (e.g.: dhEmi).
+            value_column (str): Numeric column.
+            window (int): Window size in periods of the frequency (e.g.: 7 with frequency 'day').
+            frequency (str): day, week, month, quarter or year used to build the series. Defaults to 'day'.
+            aggregation (str): How the values are aggregated per period (count, sum, mean, min, max). Defaults to 'sum'.
+            statistic (str): Rolling statistic: mean, sum, min, max, std or median. Defaults to 'mean'.
+        """
+
+        return await run_analysis(
+            session_id,
+            statistics_services.rolling_window,
+            date_column,
+            value_column,
+            window,
+            frequency,
+            aggregation,
+            statistic,
+        )
+
+    @tool('compute_percentiles')
+    async def compute_percentiles(
+        columns: list[str],
+        percentiles: list[float] | None = None,
+        group_by: list[str] | None = None,
+    ):
+        """
+        Computes exact percentiles of numeric columns, overall or by groups.
+
+        Args:
+            columns (list[str]): Numeric columns.
+            percentiles (list[float] | None): Percentiles as fractions (0.9) or percentages (90), using the same unit for the whole list. Defaults to 25, 50, 75, 90, 95 and 99.
+            group_by (list[str] | None): Optional key columns to compute the percentiles per group.
+        """
+
+        return await run_analysis(
+            session_id,
+            statistics_services.compute_percentiles,
+            columns,
+            percentiles,
+            group_by,
+        )
+
+    return [
+        group_aggregate,
+        pivot_table,
+        resample_time_series,
+        rolling_window,
+        compute_percentiles,
+    ]
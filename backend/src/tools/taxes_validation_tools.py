@@ -1,7 +1,20 @@
 from langchain.tools import tool
 
-# Tolerância de casas decimais para erros em cálculo de impostos
-TOLERANCE = 0.01
+from src.services.tax_audit_services import tax_audit_service
+from src.services.tax_rules_services import (
+    SIMPLES_NACIONAL,
+    SN_ICMS_CREDIT_CSOSNS,
+    TOLERANCE,
+    check_note_total,
+    evaluate_item,
+    validate_items,
+)
+from src.tools.data_extraction_tool import DataExtractionTools
+from src.utils.exceptions import (
+    AuditColumnsNotFoundException,
+    DataNotFoundException,
+    VectorStoreConnectionException,
+)
 
 
 def create_validation_tools(session_id: str):
@@ -79,63 +92,43 @@ def create_validation_tools(session_id: str):
             v_icms: ICMS value highlighted on the invoice (vICMS).
             is_simples_nacional: Flag indicating if the issuer is under the Simples Nacional regime.
         """
-        result = {
-            'item_id': item_id,
-            'status_icms': 'VALIDO',
-            'error_type': None,
-            'expected_v_icms': 0.0,
-        }
+        findings = evaluate_item(
+            {
+                'nItem': item_id,
+                'CST_CSOSN': cst_icms,
+                'vProd': v_prod,
+                'vBCICMS': v_bc_icms,
+                'pICMS': p_icms,
+                'vICMS': v_icms,
+            },
+            is_simples_nacional=is_simples_nacional,
+            rates_as_percentage=False,
+            groups=('ICMS',),
+        )
 
-        # Rule 1: Validation for Simples Nacional (CSOSN)
-        if is_simples_nacional and cst_icms not in ['101', '201', '900']:
-            # For most CSOSN codes, highlighting is prohibited (vICMS must be zero)
-            if v_icms > TOLERANCE:
-                result['status_icms'] = 'SN_TAX_HIGHLIGHT_ERROR'
-                result['error_type'] = 'Undue ICMS highlight for the tax regime.'
-                return result
-            result['status_icms'] = 'EXEMPT_SN_COMPLIANT'
-            return result
-
-        # Rule 2: Fully Taxed ICMS (CST 00)
-        if cst_icms == '00':
-            expected_v_icms = round(v_bc_icms * p_icms, 2)
-            result['expected_v_icms'] = expected_v_icms
-            if abs(v_icms - expected_v_icms) > TOLERANCE:
-                result['status_icms'] = 'CALCULATION_INCONSISTENCY'
-                result['error_type'] = (
-                    'Calculated ICMS diverges from the highlighted value.'
-                )
+        if not findings:
+            # Itens do Simples Nacional sem CSOSN de crédito não seguem as regras do CST
+            sn_exempt = (
+                is_simples_nacional and cst_icms.strip() not in SN_ICMS_CREDIT_CSOSNS
+            )
 
-        # Rule 3: Exempt or Non-Taxable ICMS (CST 40, 41, 50, 51)
-        elif cst_icms in ['40', '41', '50', '51']:
-            if v_icms > TOLERANCE or v_bc_icms > TOLERANCE:
-                result['status_icms'] = 'UNDUE_TAX_ERROR'
-                result['error_type'] = (
-                    'ICMS highlight in an exempt/non-taxable operation.'
-                )
+            return {
+                'item_id': item_id,
+                'status_icms': 'EXEMPT_SN_COMPLIANT' if sn_exempt else 'VALIDO',
+                'error_type': None,
+                'expected_v_icms': round(v_bc_icms * p_icms, 2)
+                if not sn_exempt and v_icms > TOLERANCE
+                else 0.0,
+            }
 
-        # Rule 4: ICMS previously charged via ST (CST 60)
-        elif cst_icms == '60':
-            if v_icms > TOLERANCE:
-                result['status_icms'] = 'ICMS_ST_ERROR'
-                result['error_type'] = (
-                    'Undue ICMS highlight (previously charged via ST).'
-                )
+        finding = findings[0]
 
-        # Rule 5: Other CSTs (10, 20, 30, 70, 90) - Require specific logic for reduced base or ST
-        # For the current scope, we just flag attention if the calculation is not 0.00
-        else:
-            # If it's a CST that implies calculation (10, 70, 90), we validate the basic base/rate
-            if v_icms > TOLERANCE:
-                expected_v_icms = round(v_bc_icms * p_icms, 2)
-                result['expected_v_icms'] = expected_v_icms
-                if abs(v_icms - expected_v_icms) > TOLERANCE:
-                    result['status_icms'] = 'ATTENTION_CALCULATION'
-                    result['error_type'] = (
-                        f'ICMS calculation ({cst_icms}) requires verification of Reduced Base/ST.'
-                    )
-
-        return result
+        return {
+            'item_id': item_id,
+            'status_icms': finding['error_type'],
+            'error_type': finding['detail'],
+            'expected_v_icms': finding['expected'],
+        }
 
     ### 3. Tool for Federal Taxes Validation (PIS, COFINS, and IPI)
 
@@ -165,64 +158,41 @@ def create_validation_tools(session_id: str):
             ... other calculation and highlighted value fields for IPI, PIS, and COFINS.
         """
 
-        inconsistencies = []
-
-        # Rule 1: General Validation - Simples Nacional (Prohibition of highlight)
-        if is_simples_nacional:
-            if v_ipi > TOLERANCE:
-                inconsistencies.append(
-                    'IPI_ERROR: Undue IPI highlight for Simples Nacional.'
-                )
-            if v_pis > TOLERANCE:
-                inconsistencies.append(
-                    'PIS_ERROR: Undue PIS highlight for Simples Nacional.'
-                )
-            if v_cofins > TOLERANCE:
-                inconsistencies.append(
-                    'COFINS_ERROR: Undue COFINS highlight for Simples Nacional.'
-                )
-
-            # If errors were found in SN, verification for this item ends
-            if inconsistencies:
-                return {
-                    'item_id': item_id,
-                    'status_federal': 'SN_NON_COMPLIANT',
-                    'inconsistencies': inconsistencies,
-                }
-
-        # Rule 2: IPI Calculation Validation (CST 50 - Taxed)
-        if cst_ipi == '50':
-            expected_v_ipi = round(v_bc_ipi * p_ipi, 2)
-            if abs(v_ipi - expected_v_ipi) > TOLERANCE:
-                inconsistencies.append(
-                    f'IPI_INCONSISTENCY: IPI calculation (R$ {v_ipi}) diverges from expected (R$ {expected_v_ipi}).'
-                )
-
-        # Rule 3: PIS Calculation Validation (CST 01 - Taxed Basic Rate)
-        if cst_pis == '01':
-            expected_v_pis = round(v_bc_pis * p_pis, 2)
-            if abs(v_pis - expected_v_pis) > TOLERANCE:
-                inconsistencies.append(
-                    f'PIS_INCONSISTENCY: PIS calculation (R$ {v_pis}) diverges from expected (R$ {expected_v_pis}).'
-                )
+        findings = evaluate_item(
+            {
+                'nItem': item_id,
+                'CST_IPI': cst_ipi,
+                'vBCIPI': v_bc_ipi,
+                'pIPI': p_ipi,
+                'vIPI': v_ipi,
+                'CST_PIS': cst_pis,
+                'vBCPIS': v_bc_pis,
+                'pPIS': p_pis,
+                'vPIS': v_pis,
+                'CST_COFINS': cst_cofins,
+                'vBCCOFINS': v_bc_cofins,
+                'pCOFINS': p_cofins,
+                'vCOFINS': v_cofins,
+            },
+            is_simples_nacional=is_simples_nacional,
+            rates_as_percentage=False,
+            groups=('FEDERAL',),
+        )
 
-        # Rule 4: COFINS Calculation Validation (CST 01 - Taxed Basic Rate)
-        if cst_cofins == '01':
-            expected_v_cofins = round(v_bc_cofins * p_cofins, 2)
-            if abs(v_cofins - expected_v_cofins) > TOLERANCE:
-                inconsistencies.append(
-                    f'COFINS_INCONSISTENCY: COFINS calculation (R$ {v_cofins}) diverges from expected (R$ {expected_v_cofins}).'
-                )
+        inconsistencies = [
+            f'{finding["error_type"]}: {finding["detail"]} Highlighted R$ {finding["found"]}, expected R$ {finding["expected"]}.'
+            if finding['error_type'].endswith('_INCONSISTENCY')
+            else f'{finding["error_type"]}: {finding["detail"]}'
+            for finding in findings
+        ]
 
-        # Rule 5: Exemption Validation (CST 04 - PIS/COFINS Exempt)
-        if cst_pis == '04' and v_pis > TOLERANCE:
-            inconsistencies.append(
-                'PIS_ERROR: PIS highlight in an Exempt operation (CST 04).'
-            )
-        if cst_cofins == '04' and v_cofins > TOLERANCE:
-            inconsistencies.append(
-                'COFINS_ERROR: COFINS highlight in an Exempt operation (CST 04).'
-            )
+        # Destaques indevidos no Simples Nacional encerram a verificação do item
+        if any(finding['regime'] == SIMPLES_NACIONAL for finding in findings):
+            return {
+                'item_id': item_id,
+                'status_federal': 'SN_NON_COMPLIANT',
+                'inconsistencies': inconsistencies,
+            }
 
         return {
             'status_federal': 'COMPLIANT'
@@ -255,33 +225,98 @@ def create_validation_tools(session_id: str):
             total_v_descontos: Sum of discounts.
         """
 
-        # Standard formula for vNF calculation (Simplified)
-        v_nf_calculated = (
-            total_v_prod
-            + total_v_ipi
-            + total_v_icms_st
-            + total_v_outras_despesas
-            - total_v_descontos
+        return check_note_total(
+            v_nf_declarado,
+            {
+                'vProd': total_v_prod,
+                'vIPI': total_v_ipi,
+                'vICMSST': total_v_icms_st,
+                'vOutro': total_v_outras_despesas,
+                'vDesc': total_v_descontos,
+            },
         )
 
-        # Rounding to prevent floating point errors, using the defined tolerance
-        v_nf_calculated = round(v_nf_calculated, 2)
+    @tool('validate_invoice_items')
+    async def validate_invoice_items(
+        access_key: str = '',
+        items: list[dict] | None = None,
+        is_simples_nacional: bool = False,
+        v_nf_declared: float | None = None,
+        rates_as_percentage: bool = True,
+    ):
+        """
+        Validates ICMS, IPI, PIS and COFINS of ALL items of an invoice at once, and the Total Note Value (vNF) when available.
+        Prefer this tool over the per-item tools: a single call replaces `validate_icms` and `validate_federal_taxes` for every item.
+        Returns a compact report with only the non-compliant items.
 
-        is_mismatch = abs(v_nf_declarado - v_nf_calculated) > TOLERANCE
+        Args:
+            access_key: The 44 digits nfe access key (chNFe) of an invoice stored in the vector store. Items, tax regime and totals are loaded automatically, no other argument is needed.
+            items: Item rows, used when the invoice is not stored. Each row uses the fields: nItem, CST_CSOSN, vProd, vBCICMS, pICMS, vICMS, vICMSST, CST_IPI, vBCIPI, pIPI, vIPI, CST_PIS, vBCPIS, pPIS, vPIS, CST_COFINS, vBCCOFINS, pCOFINS, vCOFINS.
+            is_simples_nacional: Flag indicating if the issuer is under the Simples Nacional regime, used with `items`.
+            v_nf_declared: Declared Total Note Value (vNF), used with `items` to check the note total.
+            rates_as_percentage: If the rates in `items` are percentages (18.00) as in the XML, or decimals (0.18).
+        """
+        header = None
 
-        if not is_mismatch:
-            return {'status': 'COMPLIANT'}
-        else:
-            {
-                'status': 'TOTAL MISMATCH DETECTED',
-                'v_nf_calculated': v_nf_calculated,
-                'v_nf_declared': v_nf_declarado,
-                'is_mismatch': is_mismatch,
-                'details': f'Difference of R$ {abs(v_nf_declarado - v_nf_calculated):.2f}',
+        if access_key:
+            try:
+                chunks = await DataExtractionTools(session_id).get_document_chunks(
+                    access_key.strip()
+                )
+            except VectorStoreConnectionException:
+                return {'error': 'Failed to connect to the vector store.'}
+
+            metadata = [chunk['metadata'] for chunk in chunks]
+            items = [data for data in metadata if data.get('chunk_type') == 'item']
+            header = next(
+                (data for data in metadata if data.get('chunk_type') == 'header'), {}
+            )
+            rates_as_percentage = True
+
+            if header.get('vNF') is not None:
+                v_nf_declared = float(header['vNF'])
+
+        if not items:
+            return {
+                'error': 'No items found, send the access key of a stored invoice or the item rows.'
             }
 
+        return validate_items(
+            items,
+            is_simples_nacional=is_simples_nacional,
+            rates_as_percentage=rates_as_percentage,
+            v_nf_declared=v_nf_declared,
+            header=header,
+        )
+
+    @tool('audit_session_data')
+    async def audit_session_data(
+        is_simples_nacional: bool = False, rates_as_percentage: bool = True
+    ):
+        """
+        Audits ICMS, IPI, PIS, COFINS and the Total Note Value of ALL item rows of the data uploaded by the user (CSV/XLSX spreadsheet with one invoice item per row) at once.
+        Use it when the user asks to validate or audit the uploaded spreadsheet, instead of validating its rows one by one.
+        Returns a summary (inconsistencies by tax and error type, total tax difference, rules skipped for missing columns) and the first flagged rows, the full results are stored for the report generator.
+
+        Args:
+            is_simples_nacional: Flag indicating if the issuer is under the Simples Nacional regime, used when the data has no CRT column.
+            rates_as_percentage: If the rates in the data are percentages (18.00), or decimals (0.18).
+        """
+        try:
+            await tax_audit_service.audit_session(
+                session_id,
+                is_simples_nacional=is_simples_nacional,
+                rates_as_percentage=rates_as_percentage,
+            )
+        except (DataNotFoundException, AuditColumnsNotFoundException) as exc:
+            return {'error': exc.msg}
+
+        return tax_audit_service.get_results(session_id)
+
     return [
         validate_document_header,
+        validate_invoice_items,
+        audit_session_data,
         validate_federal_taxes,
         validate_icms_compliance,
         validate_total_note_value,
@@ -1,6 +1,9 @@
 """Ferramentas para chamar outros agentes"""
 
+import asyncio
 import json
+from collections.abc import Awaitable, Callable
+from time import perf_counter
 
 from langchain.tools import tool
 
@@ -8,6 +11,8 @@ from src.agents.base_agent import BaseAgent
 from src.controllers.websocket_controller import manager
 from src.data import StatusUpdate
 from src.data.models import ModelTask
+from src.services.metrics_services import metrics
+from src.settings import settings
 
 
 async def _use_data_analyst(
@@ -56,16 +61,54 @@ async def _use_tax_specialist(
     return {'results': response['output']}
 
 
+async def _load_agent(
+    agent_loader: Callable[[ModelTask], Awaitable[BaseAgent]], agent_task: ModelTask
+) -> BaseAgent | None:
+    try:
+        return await agent_loader(agent_task)
+    except Exception as exc:
+        print(f'\t>> Failed to initialize agent for task {agent_task}: {exc}')
+
+        return None
+
+
+async def _run_agent(
+    limiter: asyncio.Semaphore,
+    agent_loader: Callable[[ModelTask], Awaitable[BaseAgent]],
+    agent_task: ModelTask,
+    use_agent: Callable[[BaseAgent, str, str], Awaitable[dict[str, str]]],
+    session_id: str,
+    request: str | dict[str, str],
+    error_message: str,
+) -> dict[str, str]:
+    """Executa o sub-agente respeitando o limite de chamadas simultâneas da sessão.
+
+    Chamadas de ferramentas geradas no mesmo passo do Supervisor são executadas em paralelo pelo `AgentExecutor` (`asyncio.gather`), com os resultados devolvidos na ordem das chamadas.
+    """
+    async with limiter:
+        agent = await _load_agent(agent_loader, agent_task)
+
+        if not agent:
+            return {'error': error_message}
+
+        start = perf_counter()
+
+        try:
+            return await use_agent(agent, session_id, request)
+        finally:
+            metrics.observe(f'agent.{agent_task}.latency', perf_counter() - start)
+
+
 def create_agent_tools(
     session_id: str,
-    current_session: dict[str, BaseAgent | str],
+    agent_loader: Callable[[ModelTask], Awaitable[BaseAgent]],
 ):
-    """Método de fábrica para construção e injeção de dependências no contexto da ferramenta."""
+    """Método de fábrica para construção e injeção de dependências no contexto da ferramenta.
 
-    _data_analyst = current_session.get(ModelTask.DATA_ANALYSIS)
-    _data_engineer = current_session.get(ModelTask.DATA_TREATMENT)
-    _report_gen = current_session.get(ModelTask.REPORT_GENERATION)
-    _tax_specialist = current_session.get(ModelTask.INVOICE_VALIDATION)
+    Os sub-agentes são instanciados apenas no primeiro uso da ferramenta pelo `agent_loader`, que mantém a instância na sessão para as próximas chamadas.
+    Sub-agentes independentes chamados no mesmo passo são executados em paralelo, limitados por `settings.supervisor_max_parallel_agents` (1 mantém a execução em série).
+    """
+    limiter = asyncio.Semaphore(settings.supervisor_max_parallel_agents)
 
     @tool('data_analyst')
     async def use_data_analyst(user_request: str):
@@ -73,19 +116,29 @@ def create_agent_tools(
         bars chart generation, histogram chart generation, line plot generation, scatter plot generation, outliers detection with IQR, cluster locator and plot generation, correlation matrix generation, data summarize, box plot generation, correlation heatmap generation, get rows in data, python code tool for greater analysis).
         """
 
-        if not _data_analyst:
-            return {'error': 'Data Analyst could not be initialized'}
-
-        return await _use_data_analyst(_data_analyst, session_id, user_request)
+        return await _run_agent(
+            limiter,
+            agent_loader,
+            ModelTask.DATA_ANALYSIS,
+            _use_data_analyst,
+            session_id,
+            user_request,
+            'Data Analyst could not be initialized',
+        )
 
     @tool('data_engineer')
     async def use_data_engineer(user_request: str):
         """This tool is used to call the Data Engineer to work on user's requests, mostly about XML documents and invoice documents. This agent is capable of extracting fields from text, perform data treatment and store the results in a Vector Store. It can also, extract from the Vector Store valid information and return it for analysis and validation."""
 
-        if not _data_engineer:
-            return {'error': 'Data Engineer could not be initialized'}
-
-        return await _use_data_engineer(_data_engineer, session_id, user_request)
+        return await _run_agent(
+            limiter,
+            agent_loader,
+            ModelTask.DATA_TREATMENT,
+            _use_data_engineer,
+            session_id,
+            user_request,
+            'Data Engineer could not be initialized',
+        )
 
     @tool('tax_specialist')
     async def use_tax_specialist(request: dict[str, str]):
@@ -96,10 +149,15 @@ def create_agent_tools(
         Returns the results from the document validation, describing if the document is in compliance with Brazil's law.
         """
 
-        if not _tax_specialist:
-            return {'error': 'Tax Specialist could not be initialized.'}
-
-        return await _use_tax_specialist(_tax_specialist, session_id, request)
+        return await _run_agent(
+            limiter,
+            agent_loader,
+            ModelTask.INVOICE_VALIDATION,
+            _use_tax_specialist,
+            session_id,
+            request,
+            'Tax Specialist could not be initialized.',
+        )
 
     @tool('report_gen')
     async def use_report_gen(report_request: dict[str, str]):
@@ -110,9 +168,14 @@ def create_agent_tools(
         Returns a confirmation message if email was sent or the full report string if the user didn't register an email in config page.
         """
 
-        if not _report_gen:
-            return {'error': 'Report Generator could not be initialized.'}
-
-        return await _use_report_gen(_report_gen, session_id, report_request)
+        return await _run_agent(
+            limiter,
+            agent_loader,
+            ModelTask.REPORT_GENERATION,
+            _use_report_gen,
+            session_id,
+            report_request,
+            'Report Generator could not be initialized.',
+        )
 
     return [use_data_analyst, use_data_engineer, use_tax_specialist, use_report_gen]
@@ -95,3 +95,74 @@ class InvalidEmailTypeException(Exception):
     def __init__(self, msg: str = None):
         self.msg = msg or 'Invalid email received, please try again with a valid email.'
         super().__init__(self.msg)
+
+
+class InvalidFileOptionsException(Exception):
+    """Raised when the options received for reading a file don't match its contents."""
+
+    def __init__(self, msg: str = None):
+        self.msg = (
+            msg
+            or 'Invalid options received for the file, please check the sheet and column names.'
+        )
+        super().__init__(self.msg)
+
+
+class UploadNotFoundException(Exception):
+    """Raised when a chunked upload was not found or has expired."""
+
+    def __init__(self, msg: str = None):
+        self.msg = msg or 'Upload not found, please start a new upload.'
+        super().__init__(self.msg)
+
+
+class UploadOffsetMismatchException(Exception):
+    """Raised when a chunk is sent out of order or an incomplete upload is finalized."""
+
+    def __init__(self, msg: str = None):
+        self.msg = (
+            msg
+            or 'Chunk offset does not match the upload progress, check the upload status and resume from its offset.'
+        )
+        super().__init__(self.msg)
+
+
+class ChunkChecksumException(Exception):
+    """Raised when the content of a chunk does not match the checksum received."""
+
+    def __init__(self, msg: str = None):
+        self.msg = (
+            msg
+            or 'Chunk checksum mismatch, the chunk may be corrupted. Please send it again.'
+        )
+        super().__init__(self.msg)
+
+
+class DataNotFoundException(Exception):
+    """Raised when the session has no uploaded data to process."""
+
+    def __init__(self, msg: str = None):
+        self.msg = (
+            msg
+            or 'No data found for the session, please upload a CSV or XLSX file first.'
+        )
+        super().__init__(self.msg)
+
+
+class AuditColumnsNotFoundException(Exception):
+    """Raised when the session data has no columns recognized as invoice item taxes."""
+
+    def __init__(self, msg: str = None):
+        self.msg = (
+            msg
+            or 'No tax columns found in the data, the audit requires invoice item columns such as CST, vBCICMS, pICMS and vICMS.'
+        )
+        super().__init__(self.msg)
+
+
+class AuditNotFoundException(Exception):
+    """Raised when the session has no tax audit results."""
+
+    def __init__(self, msg: str = None):
+        self.msg = msg or 'No tax audit found for the session, run the audit first.'
+        super().__init__(self.msg)
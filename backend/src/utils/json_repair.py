@@ -0,0 +1,136 @@
+"""Reparo determinístico de respostas JSON de LLMs, executado antes de recorrer a um agente de correção."""
+
+import re
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _DecodeError = orjson.JSONDecodeError
+except ImportError:  # pragma: no cover - dependência opcional
+    import json
+
+    _loads = json.loads
+    _DecodeError = json.JSONDecodeError
+
+THINK_PATTERN = re.compile(r'<think>.*?(?:</think>|$)', re.DOTALL | re.IGNORECASE)
+FENCE_PATTERN = re.compile(r'```(?:json|JSON)?\s*(.*?)(?:```|$)', re.DOTALL)
+CLOSING = {'{': '}', '[': ']'}
+# Escapes para caracteres de controle literais dentro de strings
+CONTROL_ESCAPES = {'\n': '\\n', '\r': '\\r', '\t': '\\t'}
+
+
+def strip_wrappers(text: str) -> str:
+    """Remove blocos de raciocínio (<think>) e cercas de markdown ao redor do JSON."""
+    text = THINK_PATTERN.sub('', text).strip()
+    fence = FENCE_PATTERN.search(text)
+
+    if fence and '{' in fence.group(1):
+        text = fence.group(1)
+
+    return text.strip()
+
+
+def _scan_json(text: str, start: int) -> tuple[str, bool]:
+    """Percorre o JSON a partir da primeira chave, removendo vírgulas finais, escapando quebras de linha em strings e fechando estruturas truncadas.
+
+    Returns:
+        tuple[str, bool]: JSON reparado e se a resposta estava truncada (string ou estruturas fechadas pelo reparo).
+    """
+    output, stack = [], []
+    in_string = escaped = False
+
+    for char in text[start:]:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+            elif char in CONTROL_ESCAPES:
+                char = CONTROL_ESCAPES[char]
+
+            output.append(char)
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in CLOSING:
+            stack.append(CLOSING[char])
+        elif char in '}]':
+            # Vírgula antes do fechamento: {"a": 1,}
+            while output and output[-1] in ' \n\r\t':
+                output.pop()
+
+            if output and output[-1] == ',':
+                output.pop()
+
+            if not stack:
+                break
+
+            stack.pop()
+            output.append(char)
+
+            if not stack:
+                break
+
+            continue
+
+        output.append(char)
+
+    # Resposta truncada: fecha a string e as estruturas abertas
+    if in_string:
+        if escaped:
+            output.pop()
+
+        output.append('"')
+
+    if stack:
+        while output and output[-1] in ' \n\r\t,:':
+            output.pop()
+
+        output.extend(reversed(stack))
+
+    return ''.join(output), in_string or bool(stack)
+
+
+def recover_json(text: str) -> tuple[dict | list, bool]:
+    """Extrai e converte o primeiro objeto JSON do texto, corrigindo erros comuns de formatação.
+
+    Args:
+        text (str): Resposta do modelo, podendo conter texto ao redor, cercas de markdown ou raciocínio.
+
+    Raises:
+        ValueError: Quando nenhum JSON válido pode ser recuperado do texto.
+
+    Returns:
+        tuple[dict | list, bool]: Conteúdo JSON convertido e se a resposta estava truncada, com o conteúdo possivelmente incompleto.
+    """
+    text = strip_wrappers(text)
+
+    try:
+        return _loads(text), False
+    except _DecodeError:
+        pass
+
+    start = text.find('{')
+
+    if start == -1:
+        raise ValueError('No JSON object found in the response.')
+
+    repaired, truncated = _scan_json(text, start)
+
+    try:
+        return _loads(repaired), truncated
+    except _DecodeError as exc:
+        raise ValueError(f'Could not repair the JSON response: {exc}') from exc
+
+
+def repair_json(text: str) -> dict | list:
+    """Como `recover_json`, retornando apenas o conteúdo JSON convertido.
+
+    Raises:
+        ValueError: Quando nenhum JSON válido pode ser recuperado do texto.
+    """
+    return recover_json(text)[0]
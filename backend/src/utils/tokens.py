@@ -0,0 +1,181 @@
+"""Contagem e truncamento de tokens para controle do tamanho dos prompts."""
+
+import codecs
+import math
+import threading
+from functools import lru_cache
+from time import monotonic
+
+from langchain_core.messages import BaseMessage, get_buffer_string
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - dependência opcional
+    tiktoken = None
+
+# Média de caracteres por token usada quando não há tokenizador disponível
+CHARS_PER_TOKEN = 4
+# Tokens extras por mensagem (papel e separadores do formato de chat)
+MESSAGE_OVERHEAD = 4
+# Intervalo até uma nova tentativa de carregar um vocabulário após uma falha (ex.: sem rede)
+ENCODING_RETRY_SECONDS = 300
+
+# Vocabulários carregados e horário da última falha de cada um
+_encodings: dict[str, 'tiktoken.Encoding'] = {}
+_failed_at: dict[str, float] = {}
+_load_lock = threading.Lock()
+
+
+@lru_cache(maxsize=32)
+def _encoding_name(model_name: str | None) -> str:
+    try:
+        return tiktoken.encoding_name_for_model(model_name or '')
+    except KeyError:
+        # Modelos fora da OpenAI (Llama, Qwen, Gemini) usam uma aproximação com o vocabulário mais recente
+        return 'o200k_base'
+
+
+def _get_encoding(model_name: str | None, wait: bool = False):
+    """Retorna o tokenizador do modelo, ou None para usar a estimativa por caracteres.
+
+    O vocabulário é baixado no primeiro uso. Sem `wait`, o carregamento é feito em uma thread e a estimativa é usada até sua conclusão, sem bloquear o event loop. Uma falha é tentada novamente após `ENCODING_RETRY_SECONDS`.
+    """
+    if tiktoken is None:
+        return None
+
+    name = _encoding_name(model_name)
+    encoding = _encodings.get(name)
+
+    if encoding is not None:
+        return encoding
+
+    if monotonic() - _failed_at.get(name, -math.inf) < ENCODING_RETRY_SECONDS:
+        return None
+
+    if not wait:
+        if not _load_lock.locked():
+            threading.Thread(
+                target=_get_encoding, args=(model_name, True), daemon=True
+            ).start()
+
+        return None
+
+    _load_lock.acquire()
+
+    try:
+        if name not in _encodings:
+            _encodings[name] = tiktoken.get_encoding(name)
+            _failed_at.pop(name, None)
+    except Exception as exc:
+        _failed_at[name] = monotonic()
+        print(f'\t>> Tokenizer not available, using character estimate: {exc}')
+
+        return None
+    finally:
+        _load_lock.release()
+
+    return _encodings[name]
+
+
+def warm_up_encoding(model_name: str | None = None) -> None:
+    """Carrega o vocabulário do tokenizador, aguardando o download. Executado em uma thread na inicialização da API, antes da primeira requisição."""
+    _get_encoding(model_name, wait=True)
+
+
+def count_tokens(text: str, model_name: str | None = None) -> int:
+    """Conta os tokens do texto com o tokenizador do modelo, ou estima pelo número de caracteres.
+
+    Args:
+        text (str): Texto a ser contado.
+        model_name (str | None, optional): Nome do modelo, usado para escolher o tokenizador.
+
+    Returns:
+        int: Quantidade de tokens.
+    """
+    encoding = _get_encoding(model_name)
+
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(
+    messages: list[BaseMessage], model_name: str | None = None
+) -> int:
+    """Conta os tokens de uma lista de mensagens, incluindo o custo fixo de cada mensagem."""
+    return sum(
+        count_tokens(get_buffer_string([message]), model_name) + MESSAGE_OVERHEAD
+        for message in messages
+    )
+
+
+def truncate_to_tokens(
+    text: str, max_tokens: int, model_name: str | None = None
+) -> str:
+    """Corta o texto no limite de tokens, indicando a quantidade removida.
+
+    Args:
+        text (str): Texto original.
+        max_tokens (int): Quantidade máxima de tokens mantida.
+        model_name (str | None, optional): Nome do modelo, usado para escolher o tokenizador.
+
+    Returns:
+        str: Texto original, se dentro do limite, ou o início do texto seguido de um aviso de truncamento.
+    """
+    encoding = _get_encoding(model_name)
+
+    if encoding is None:
+        max_chars = max_tokens * CHARS_PER_TOKEN
+
+        if len(text) <= max_chars:
+            return text
+
+        removed = math.ceil((len(text) - max_chars) / CHARS_PER_TOKEN)
+
+        return f'{text[:max_chars]}\n[... {removed} tokens truncated]'
+
+    tokens = encoding.encode(text, disallowed_special=())
+
+    if len(tokens) <= max_tokens:
+        return text
+
+    removed = len(tokens) - max_tokens
+
+    return f'{encoding.decode(tokens[:max_tokens])}\n[... {removed} tokens truncated]'
+
+
+def split_to_tokens(
+    text: str, max_tokens: int, model_name: str | None = None
+) -> list[str]:
+    """Divide o texto em partes de até `max_tokens` tokens, sem descartar conteúdo.
+
+    Args:
+        text (str): Texto original.
+        max_tokens (int): Quantidade máxima de tokens de cada parte.
+        model_name (str | None, optional): Nome do modelo, usado para escolher o tokenizador.
+
+    Returns:
+        list[str]: Partes do texto em ordem, que concatenadas reproduzem o texto original.
+    """
+    encoding = _get_encoding(model_name)
+
+    if encoding is None:
+        max_chars = max_tokens * CHARS_PER_TOKEN
+
+        return [
+            text[start : start + max_chars] for start in range(0, len(text), max_chars)
+        ] or ['']
+
+    tokens = encoding.encode(text, disallowed_special=())
+    # Tokens podem conter apenas parte de um caractere, os bytes incompletos seguem para a próxima parte
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    parts = []
+
+    for start in range(0, len(tokens), max_tokens):
+        part = decoder.decode(encoding.decode_bytes(tokens[start : start + max_tokens]))
+
+        if part:
+            parts.append(part)
+
+    return parts or ['']
@@ -0,0 +1,9 @@
+import os
+
+# As configurações exigem o banco de dados, carregadas na importação de `src.services`
+os.environ.setdefault('DATABASE_URI', 'sqlite:///:memory:')
+
+from src.utils.tokens import warm_up_encoding  # noqa: E402
+
+# Contagens de tokens determinísticas: o tokenizador é carregado antes dos testes (ou a estimativa por caracteres, sem rede)
+warm_up_encoding()
@@ -0,0 +1,34 @@
+"""Reparo determinístico das respostas JSON dos agentes."""
+
+import pytest
+
+from src.utils.json_repair import recover_json, repair_json
+
+
+@pytest.mark.parametrize(
+    'text',
+    [
+        '{"response": "ok", "graph_id": ""}',
+        '```json\n{"response": "ok", "graph_id": "",}\n```',
+        '<think>rascunho</think>Resposta: {"response": "ok", "graph_id": ""} fim',
+    ],
+)
+def test_complete_responses_are_not_truncated(text):
+    assert recover_json(text) == ({'response': 'ok', 'graph_id': ''}, False)
+
+
+@pytest.mark.parametrize(
+    'text, expected',
+    [
+        ('{"response": "Total de 10 no', {'response': 'Total de 10 no'}),
+        ('{"response": "ok", "items": [1, 2,', {'response': 'ok', 'items': [1, 2]}),
+    ],
+)
+def test_truncated_responses_are_reported(text, expected):
+    assert recover_json(text) == (expected, True)
+    assert repair_json(text) == expected
+
+
+def test_unrecoverable_response_raises():
+    with pytest.raises(ValueError):
+        recover_json('sem JSON')
@@ -0,0 +1,22 @@
+"""Estatísticas vetorizadas sobre o DataFrame da sessão."""
+
+import pandas as pd
+import pytest
+
+from src.services.statistics_services import compute_percentiles
+
+
+@pytest.mark.parametrize(
+    'percentiles, expected',
+    [
+        ([1, 5, 50], {'p1': 1.99, 'p5': 5.95, 'p50': 50.5}),
+        ([0.01, 0.05, 0.5], {'p1': 1.99, 'p5': 5.95, 'p50': 50.5}),
+        ([0.5, 1], {'p50': 50.5, 'p100': 100.0}),
+    ],
+)
+def test_percentile_unit_is_shared_by_the_list(percentiles, expected):
+    df = pd.DataFrame({'vNF': range(1, 101)})
+
+    result = compute_percentiles(df, ['vNF'], percentiles)
+
+    assert result['vNF'].round(2).to_dict() == expected
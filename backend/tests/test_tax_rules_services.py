@@ -0,0 +1,194 @@
+"""Conferência do motor de regras fiscais com a lógica das antigas ferramentas por item (`validate_icms` e `validate_federal_taxes`)."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services.tax_rules_services import (
+    audit_chunk,
+    evaluate_item,
+    evaluate_items,
+    prepare_items,
+    skipped_rules,
+)
+
+TOLERANCE = 0.01
+
+ICMS_CODES = '00 10 20 40 41 50 51 60 90 101 102 201 900'.split()
+
+
+# Cópia literal das regras das ferramentas por item, retornando apenas os tipos de erro
+def legacy_icms(cst_icms, v_bc_icms, p_icms, v_icms, is_simples_nacional):
+    if is_simples_nacional and cst_icms not in ['101', '201', '900']:
+        if v_icms > TOLERANCE:
+            return {'SN_TAX_HIGHLIGHT_ERROR'}
+        return set()
+
+    if cst_icms == '00':
+        expected_v_icms = round(v_bc_icms * p_icms, 2)
+        if abs(v_icms - expected_v_icms) > TOLERANCE:
+            return {'CALCULATION_INCONSISTENCY'}
+    elif cst_icms in ['40', '41', '50', '51']:
+        if v_icms > TOLERANCE or v_bc_icms > TOLERANCE:
+            return {'UNDUE_TAX_ERROR'}
+    elif cst_icms == '60':
+        if v_icms > TOLERANCE:
+            return {'ICMS_ST_ERROR'}
+    else:
+        if v_icms > TOLERANCE:
+            expected_v_icms = round(v_bc_icms * p_icms, 2)
+            if abs(v_icms - expected_v_icms) > TOLERANCE:
+                return {'ATTENTION_CALCULATION'}
+
+    return set()
+
+
+def legacy_federal(item, is_simples_nacional):
+    inconsistencies = set()
+
+    if is_simples_nacional:
+        for tax in ('IPI', 'PIS', 'COFINS'):
+            if item[f'v{tax}'] > TOLERANCE:
+                inconsistencies.add(f'{tax}_ERROR')
+
+        if inconsistencies:
+            return inconsistencies
+
+    for tax, code in (('IPI', '50'), ('PIS', '01'), ('COFINS', '01')):
+        if item[f'CST_{tax}'] == code:
+            expected = round(item[f'vBC{tax}'] * item[f'p{tax}'], 2)
+            if abs(item[f'v{tax}'] - expected) > TOLERANCE:
+                inconsistencies.add(f'{tax}_INCONSISTENCY')
+
+    for tax in ('PIS', 'COFINS'):
+        if item[f'CST_{tax}'] == '04' and item[f'v{tax}'] > TOLERANCE:
+            inconsistencies.add(f'{tax}_ERROR')
+
+    return inconsistencies
+
+
+def legacy_errors(item: dict) -> set[str]:
+    is_simples_nacional = item['CRT'] == '1'
+
+    return legacy_icms(
+        item['CST_CSOSN'],
+        item['vBCICMS'],
+        item['pICMS'],
+        item['vICMS'],
+        is_simples_nacional,
+    ) | legacy_federal(item, is_simples_nacional)
+
+
+def build_items(size: int, seed: int = 7) -> list[dict]:
+    """Itens com valores calculados como no XML (`round` do Python) ou divergentes em ao menos R$ 0,05."""
+    rng = np.random.default_rng(seed)
+    items = []
+
+    def highlighted(base: float, rate: float) -> float:
+        value = round(base * rate, 2)
+        draw = rng.random()
+
+        if draw < 0.15:
+            return 0.0
+        if draw < 0.3:
+            return round(value + float(rng.choice([0.05, 0.5, 1.0, 10.0])), 2)
+
+        return value
+
+    for number in range(1, size + 1):
+        item = {
+            'nItem': number,
+            'CRT': str(rng.choice(['1', '3'])),
+            'CST_CSOSN': str(rng.choice(ICMS_CODES)),
+            'CST_IPI': str(rng.choice(['50', '99'])),
+            'CST_PIS': str(rng.choice(['01', '04', '99'])),
+            'CST_COFINS': str(rng.choice(['01', '04', '99'])),
+        }
+
+        for tax, rates in (
+            ('ICMS', [0.04, 0.07, 0.12, 0.18]),
+            ('IPI', [0.05, 0.1, 0.15]),
+            ('PIS', [0.0065, 0.0165]),
+            ('COFINS', [0.03, 0.076]),
+        ):
+            base = round(float(rng.uniform(0, 5000)), 2) if rng.random() > 0.1 else 0.0
+            rate = float(rng.choice(rates))
+            item[f'vBC{tax}'] = base
+            item[f'p{tax}'] = rate
+            item[f'v{tax}'] = highlighted(base, rate)
+
+        items.append(item)
+
+    return items
+
+
+def _engine_errors(findings: pd.DataFrame) -> dict[int, set[str]]:
+    return findings.groupby('nItem')['error_type'].agg(set).to_dict()
+
+
+def test_engine_matches_legacy_per_item_rules():
+    items = build_items(20_000)
+    expected = {item['nItem']: legacy_errors(item) for item in items}
+
+    findings = evaluate_items(prepare_items(items, rates_as_percentage=False))
+    found = _engine_errors(findings)
+
+    mismatches = {
+        number: (errors, found.get(number, set()))
+        for number, errors in expected.items()
+        if errors != found.get(number, set())
+    }
+
+    assert not mismatches
+
+
+def test_scalar_evaluation_matches_legacy_per_item_rules():
+    for item in build_items(2_000, seed=11):
+        findings = evaluate_item(
+            item,
+            is_simples_nacional=item['CRT'] == '1',
+            rates_as_percentage=False,
+        )
+
+        assert {finding['error_type'] for finding in findings} == legacy_errors(item)
+
+
+@pytest.mark.parametrize('rates_as_percentage', [False, True])
+def test_half_cent_calculation_is_valid(rates_as_percentage):
+    # 592,75 x 18% = 106,695, o XML destaca 106,69 (arredondamento do valor binário)
+    item = {
+        'nItem': 1,
+        'CST_CSOSN': '00',
+        'vBCICMS': 592.75,
+        'pICMS': 18.0 if rates_as_percentage else 0.18,
+        'vICMS': 106.69,
+    }
+
+    assert evaluate_item(item, rates_as_percentage=rates_as_percentage) == []
+    assert evaluate_items(
+        prepare_items([item], rates_as_percentage=rates_as_percentage)
+    ).empty
+
+
+def test_audit_skips_rules_with_unmapped_fields():
+    # Planilha apenas com CST e valor do ICMS: sem base e alíquota, o cálculo não é conferido
+    chunk = pd.DataFrame(
+        {
+            'row': [0, 1, 2],
+            'CST_CSOSN': ['00', '60', '00'],
+            'vICMS': [18.0, 5.0, 0.0],
+        }
+    )
+
+    findings, totals = audit_chunk(chunk, False, True)
+    skipped = {
+        (rule['tax'], rule['error_type']): rule['missing_fields']
+        for rule in skipped_rules(chunk.columns)
+    }
+
+    assert findings[['row', 'error_type']].to_dict(orient='records') == [
+        {'row': 1, 'error_type': 'ICMS_ST_ERROR'}
+    ]
+    assert totals is None
+    assert skipped[('ICMS', 'CALCULATION_INCONSISTENCY')] == ['vBCICMS', 'pICMS']
+    assert ('ICMS', 'ICMS_ST_ERROR') not in skipped
@@ -0,0 +1,75 @@
+"""Orçamento de tokens das respostas de ferramentas e leitura paginada dos resultados completos."""
+
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+from src.services.tool_output_services import ToolOutputGovernor
+
+SESSION_ID = 'test-session'
+
+
+def read_all(governor: ToolOutputGovernor, handle: str) -> list[str]:
+    pages = []
+    page = 1
+
+    while True:
+        content = governor.read(SESSION_ID, handle, page)
+        assert not content.startswith('Error')
+        content, footer = content.rsplit('\n[Page ', 1)
+        pages.append(content)
+
+        if 'end of output' in footer:
+            return pages
+
+        page += 1
+
+
+def test_single_line_output_is_paged_without_loss():
+    governor = ToolOutputGovernor(max_tokens=500, page_tokens=500)
+    metadata = json.dumps(
+        {f'column_{index}': f'descrição {index} ' * 5 for index in range(800)},
+        ensure_ascii=False,
+    )
+
+    response = governor.govern(SESSION_ID, {'metadata': metadata})['metadata']
+    handle, page = re.search(
+        r'handle="(out_\w+)", page=(\d+)\) to read more', response
+    ).groups()
+    pages = read_all(governor, handle)
+
+    assert page == '2'
+    assert len(pages) > 1
+    assert ''.join(pages) == metadata
+
+
+def test_multiline_output_keeps_lines():
+    governor = ToolOutputGovernor(max_tokens=200, page_tokens=200)
+    text = '\n'.join(f'linha {index}: ' + 'valor ' * 10 for index in range(200))
+
+    response = governor.govern(SESSION_ID, text)
+    handle = re.search(r'handle="(out_\w+)"', response).group(1)
+
+    assert '\n'.join(read_all(governor, handle)) == text
+
+
+def test_table_within_budget_is_returned_whole():
+    governor = ToolOutputGovernor(max_tokens=1500)
+    counts = pd.Series(np.arange(30), index=[f'UF{index}' for index in range(30)])
+
+    assert governor.govern(SESSION_ID, counts) == counts.to_frame().to_string()
+    assert not governor._outputs.get(SESSION_ID)
+
+
+def test_large_table_is_stored_under_handle():
+    governor = ToolOutputGovernor(max_tokens=300, page_tokens=300)
+    frame = pd.DataFrame({'vNF': np.arange(1_000) * 1.5, 'UF': 'SP'})
+
+    response = governor.govern(SESSION_ID, frame)
+    handle = re.search(r'handle="(out_\w+)"', response).group(1)
+    pages = read_all(governor, handle)
+
+    assert response.startswith('Table with 1000 rows x 2 columns.')
+    assert sum(len(page.splitlines()) - 1 for page in pages) == len(frame)
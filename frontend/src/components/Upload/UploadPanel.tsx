@@ -16,11 +16,11 @@ interface Props {
 const UploadPanel = ({ progressValue, handleUpload, setSelectedNav }: Props) => {
   const fileInputRef = useRef<HTMLInputElement>(null);
   const { addToast } = useToastContext();
-  const [separator, setSeparator] = useState(',');
+  const [separator, setSeparator] = useState('auto');
 
   const MAX_FILE_SIZE = 100 * 1024 * 1024; // 100 MB máximos
   const fileSizeLimit = Math.round(MAX_FILE_SIZE / 1048576);
-  const compatibleSeparators = [',', ';', '\\t'];
+  const compatibleSeparators = ['auto', ',', ';', '\\t'];
 
   const buttonClass =
     'text-black px-4 mx-4 mb-4 py-2 border border-dashed border-blue-400 rounded-sm cursor-pointer hover:bg-blue-100';
@@ -67,7 +67,7 @@ const UploadPanel = ({ progressValue, handleUpload, setSelectedNav }: Props) =>
       </div>
 
       <div className="mb-5 text-center">
-        Separador → <span className="inline-block text-center w-5 bg-blue-100">{separator}</span>{' '}
+        Separador → <span className="inline-block text-center min-w-5 px-1 bg-blue-100">{separator}</span>{' '}
       </div>
 
       <div